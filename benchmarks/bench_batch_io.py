@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunked batch-file reading and end-to-end batch throughput
+
+Writes a synthetic customers file (CSV and Parquet), then reports how fast
+read_items turns it into batch items and the peak Python heap while doing
+so, which stays at a few chunks whatever the file size. Finally runs
+process_file on the first rows to report end-to-end rows/s.
+
+Run from the repository root:
+    python benchmarks/bench_batch_io.py [rows] [processed_rows]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+
+from example_usage import create_sample_data
+from src.batch_io import process_file, read_items
+from src.langgraph_agent import TelecomSalesAgent
+
+
+def make_frame(rows):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    row = {"customer_conversation": conversation, "current_plan": json.dumps(current_plan)}
+    row.update({f"target_plan.{k}": json.dumps(v) if isinstance(v, list) else v for k, v in target_plan.items()})
+    row.update({f"usage_data.{k}": json.dumps(v) if isinstance(v, list) else v for k, v in usage_data.items()})
+    frame = pd.DataFrame([row] * rows)
+    frame["usage_data.customer_id"] = [f"cust_{i}" for i in range(rows)]
+    frame["usage_data.data_usage_gb"] = [float(i % 60) for i in range(rows)]
+    return frame
+
+
+def main(rows=50000, processed_rows=2000):
+    with tempfile.TemporaryDirectory() as directory:
+        frame = make_frame(rows)
+        paths = {"csv": os.path.join(directory, "customers.csv"), "parquet": os.path.join(directory, "customers.parquet")}
+        frame.to_csv(paths["csv"], index=False)
+        frame.to_parquet(paths["parquet"], row_group_size=10000)
+        del frame
+
+        print(f"{rows:,} rows: CSV {os.path.getsize(paths['csv']) / 1e6:.1f} MB, "
+              f"Parquet {os.path.getsize(paths['parquet']) / 1e6:.1f} MB")
+        for name, path in paths.items():
+            start = time.perf_counter()
+            count = sum(len(chunk) for chunk in read_items(path, chunksize=1000))
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            for _ in read_items(path, chunksize=1000):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"read {name:8} {count / elapsed:10,.0f} rows/s, peak heap {peak / 1e6:6.1f} MB (chunks of 1000)")
+
+        head = os.path.join(directory, "head.csv")
+        pd.read_csv(paths["csv"], nrows=processed_rows).to_csv(head, index=False)
+        agent = TelecomSalesAgent()
+        progress = process_file(agent, head, os.path.join(directory, "results.parquet"), chunksize=500)
+        assert progress.failed == 0
+        print(f"process_file   {progress.rows_per_second:10,.0f} rows/s end to end ({progress.rows:,} rows, threads)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
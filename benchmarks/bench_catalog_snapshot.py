@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worker catalog load from JSON vs. a memory-mapped catalog snapshot
+
+Every service worker used to parse and validate its own copy of the plan
+catalog. With a snapshot, the catalog is compiled once (publish_snapshot)
+and each worker only maps the file. Reports per-worker load time, the
+Python heap the loaded catalog holds, recommend() latency on both, and the
+time to republish the snapshot.
+
+Run from the repository root:
+    python benchmarks/bench_catalog_snapshot.py [plans]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_plan_recommender import make_plan, make_customer
+from src.agents.plan_recommender import PlanRecommender
+from src.models.catalog_snapshot import CatalogSnapshot, LiveCatalog, publish_snapshot
+
+
+def load(build):
+    """Run `build` and return (result, seconds, bytes of Python heap it keeps)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, held
+
+
+def per_call(recommender, customers, current_plan):
+    start = time.perf_counter()
+    for customer in customers:
+        recommender.recommend(customer, current_plan, k=3)
+    return (time.perf_counter() - start) / len(customers)
+
+
+def main(num_plans=3000):
+    rng = random.Random(7)
+    plans = [make_plan(i, rng).model_dump(mode="json") for i in range(num_plans)]
+    customers = [make_customer(i, rng) for i in range(200)]
+    current_plan = plans[0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "plans.json")
+        snapshot_path = os.path.join(directory, "plans.snapshot")
+        with open(json_path, "w") as handle:
+            json.dump(plans, handle)
+
+        start = time.perf_counter()
+        publish_snapshot(plans, snapshot_path)
+        publish = time.perf_counter() - start
+
+        def from_json():
+            with open(json_path) as handle:
+                return PlanRecommender(json.load(handle))
+
+        from_json_recommender, json_time, json_heap = load(from_json)
+        snapshot_recommender, snapshot_time, snapshot_heap = load(lambda: PlanRecommender(CatalogSnapshot(snapshot_path)))
+
+        for customer in customers[:20]:
+            expected = from_json_recommender.recommend(customer, current_plan, k=3)
+            assert snapshot_recommender.recommend(customer, current_plan, k=3) == expected
+        print("✅ snapshot recommendations equal the JSON catalog's")
+
+        json_call = per_call(from_json_recommender, customers, current_plan)
+        snapshot_call = per_call(snapshot_recommender, customers, current_plan)
+
+        live = LiveCatalog(snapshot_path, check_interval=0)
+        publish_snapshot(plans, snapshot_path)
+        start = time.perf_counter()
+        live.current()
+        swap = time.perf_counter() - start
+        assert live.reloads == 1
+
+        size = os.path.getsize(snapshot_path)
+
+    print(f"\n{num_plans} plans, snapshot file {size / 1024:.0f} KiB (shared by all workers)")
+    print(f"publish snapshot (once):       {publish * 1000:9.1f} ms")
+    print(f"worker load, JSON + validate:  {json_time * 1000:9.1f} ms, {json_heap / 1024:8.0f} KiB heap")
+    print(f"worker load, map snapshot:     {snapshot_time * 1000:9.1f} ms, {snapshot_heap / 1024:8.0f} KiB heap")
+    print(f"recommend, JSON catalog:       {json_call * 1000:9.3f} ms/call")
+    print(f"recommend, snapshot:           {snapshot_call * 1000:9.3f} ms/call")
+    print(f"swap to republished snapshot:  {swap * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CDR aggregation into monthly per-subscriber UsageData
+
+Writes synthetic CDR files (Parquet), then reports events/s when they
+are aggregated in this process and across worker processes, and the peak
+Python heap of a single-process run, which tracks the number of
+subscribers rather than events.
+
+Run from the repository root:
+    python benchmarks/bench_cdr_aggregator.py [events_per_file] [files] [subscribers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+
+from src.cdr_aggregator import aggregate_files
+
+
+def make_events(events, subscribers, seed):
+    rng = np.random.default_rng(seed)
+    start = int(pd.Timestamp("2024-06-01", tz="UTC").timestamp())
+    event_type = rng.choice(np.array(["data", "voice", "sms"]), events, p=[0.6, 0.3, 0.1])
+    return pd.DataFrame({
+        "subscriber_id": rng.integers(0, subscribers, events).astype(str),
+        "timestamp": start + rng.integers(0, 30 * 86400, events),
+        "event_type": event_type,
+        "bytes": np.where(event_type == "data", rng.integers(10_000, 50_000_000, events), 0),
+        "duration_seconds": np.where(event_type == "voice", rng.integers(5, 1800, events), 0),
+        "international": rng.random(events) < 0.01,
+        "roaming": rng.random(events) < 0.005
+    })
+
+
+def main(events_per_file=1_000_000, files=4, subscribers=50_000):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(files):
+            path = os.path.join(directory, f"cdr_{i}.parquet")
+            make_events(events_per_file, subscribers, seed=i).to_parquet(path, row_group_size=250_000)
+            paths.append(path)
+        total = events_per_file * files
+        print(f"{total:,} events in {files} files, {subscribers:,} subscribers")
+
+        for processes in (0, min(files, os.cpu_count() or 1)):
+            start = time.perf_counter()
+            aggregator = aggregate_files(paths, processes=processes, chunksize=250_000)
+            usage = aggregator.usage_frame()
+            elapsed = time.perf_counter() - start
+            label = "in process" if not processes else f"{processes} worker(s)"
+            print(f"{label:14} {total / elapsed:12,.0f} events/s ({len(usage):,} subscriber-months, {elapsed:.2f}s)")
+
+        tracemalloc.start()
+        aggregate_files(paths, processes=0, chunksize=250_000).usage_frame()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"peak heap      {peak / 1e6:12.1f} MB (chunks of 250,000 events)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
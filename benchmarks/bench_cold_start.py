@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start cost of the agent modules
+
+Each sample is a fresh interpreter. Import time is read from
+`python -X importtime` (cumulative microseconds of the top-level module);
+startup time is measured inside the child as import + construction + first
+request. Medians over several runs are reported.
+
+Pass thresholds to use it as a CI gate; the script exits with status 1 if
+any median exceeds its limit:
+    python benchmarks/bench_cold_start.py --runs 5 --max-import-ms 1000 --max-startup-ms 1500
+
+Run from the repository root:
+    python benchmarks/bench_cold_start.py
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+TARGETS = {
+    "src.langgraph_agent": "TelecomSalesAgent('benchmark-key')",
+    "src.deterministic_engine": "DeterministicEngine()",
+}
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+from {module} import {cls}
+from example_usage import create_sample_data
+runner = {constructor}
+conversation, current_plan, target_plan, usage_data = create_sample_data()
+runner.process_customer_sync(conversation, current_plan, target_plan, usage_data)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def import_ms(module):
+    """Cumulative import time of `module` in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in reversed(completed.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def startup_ms(module, constructor):
+    """Import + construction + first request in a fresh interpreter"""
+    # example_usage imports the LangGraph agent, so the sample data is only
+    # imported after the module under test to keep its import cost separate
+    script = STARTUP_SCRIPT.format(module=module, cls=constructor.split("(")[0], constructor=constructor)
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None, help="fail if src.langgraph_agent imports slower")
+    parser.add_argument("--max-startup-ms", type=float, default=None, help="fail if agent startup is slower")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<28} {'import ms':>10} {'startup ms':>11}")
+    for module, constructor in TARGETS.items():
+        imports = statistics.median(import_ms(module) for _ in range(args.runs))
+        startups = statistics.median(startup_ms(module, constructor) for _ in range(args.runs))
+        print(f"{module:<28} {imports:>10.1f} {startups:>11.1f}")
+
+        if module == "src.langgraph_agent":
+            if args.max_import_ms is not None and imports > args.max_import_ms:
+                print(f"❌ import time {imports:.1f} ms exceeds {args.max_import_ms:.1f} ms")
+                failed = True
+            if args.max_startup_ms is not None and startups > args.max_startup_ms:
+                print(f"❌ startup time {startups:.1f} ms exceeds {args.max_startup_ms:.1f} ms")
+                failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LangGraph workflow vs. the rules-only DeterministicEngine
+
+Checks that both runners return identical results (success and error
+paths, JSON and typed state) and reports p50/p99 request latency.
+
+Run from the repository root:
+    python benchmarks/bench_deterministic_engine.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.deterministic_engine import DeterministicEngine
+from src.langgraph_agent import TelecomSalesAgent
+
+
+def measure(runner, request, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        runner.process_customer_sync(**request)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(iterations=1000):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    request = dict(
+        customer_conversation=conversation,
+        current_plan=current_plan,
+        target_plan=target_plan,
+        usage_data=usage_data
+    )
+    error_requests = [
+        dict(request, usage_data={}),
+        dict(request, target_plan=dict(target_plan, price="not a price"))
+    ]
+
+    for typed_state in (False, True):
+        agent = TelecomSalesAgent("benchmark-key", typed_state=typed_state)
+        engine = DeterministicEngine(typed_state=typed_state)
+        for case in [request] + error_requests:
+            assert agent.process_customer_sync(**case) == engine.process_customer_sync(**case)
+    print("✅ engine results match the LangGraph workflow")
+
+    print(f"\n{'runner':<24} {'p50 ms':>8} {'p99 ms':>8}")
+    for typed_state in (False, True):
+        mode = "typed" if typed_state else "json"
+        for name, runner in (("graph", TelecomSalesAgent("benchmark-key", typed_state=typed_state)),
+                             ("engine", DeterministicEngine(typed_state=typed_state))):
+            measure(runner, request, 50)
+            samples = measure(runner, request, iterations)
+            print(f"{name + ' (' + mode + ')':<24} {percentile(samples, 0.5) * 1000:>8.3f} {percentile(samples, 0.99) * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
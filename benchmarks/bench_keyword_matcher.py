@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled keyword matcher vs. the original per-table substring scans
+
+Builds synthetic call transcripts of increasing length, checks that the
+compiled matcher produces exactly the same needs, segment and pain points
+as the original CustomerProfiler logic, and reports the time per profile.
+Transcripts up to KeywordMatcher.single_pass_chars take the single regex
+pass; longer ones take the lazy substring path.
+
+Run from the repository root:
+    python benchmarks/bench_keyword_matcher.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.agents.customer_profiler import (
+    CustomerProfiler, COST_KEYWORDS, DATA_KEYWORDS, VOICE_KEYWORDS, NETWORK_KEYWORDS,
+    INTERNATIONAL_KEYWORDS, FAMILY_NEEDS_KEYWORDS, BUSINESS_NEEDS_KEYWORDS, FLEXIBILITY_KEYWORDS,
+    SEGMENT_KEYWORDS, PAIN_INDICATORS, KEYWORD_MATCHER
+)
+from src.models.customer_profile import CustomerNeeds, Priority, CustomerSegment
+
+
+FILLER = (
+    "so yeah i was calling about my account and the bill this month "
+    "okay let me check that for you one moment please thanks "
+    "my phone works fine most of the time i guess "
+).split()
+
+
+def legacy_profile(conversation):
+    """The original substring-scan implementation, kept for comparison."""
+    conversation_lower = conversation.lower()
+    needs = CustomerNeeds(
+        cost_sensitivity=Priority.MEDIUM,
+        data_priority=Priority.MEDIUM,
+        voice_priority=Priority.MEDIUM,
+        network_quality=Priority.MEDIUM,
+        customer_service=Priority.MEDIUM,
+        flexibility=Priority.MEDIUM
+    )
+    for field, table in [("cost_sensitivity", COST_KEYWORDS), ("data_priority", DATA_KEYWORDS),
+                         ("voice_priority", VOICE_KEYWORDS), ("network_quality", NETWORK_KEYWORDS)]:
+        for priority, keywords in table.items():
+            if any(keyword in conversation_lower for keyword in keywords):
+                setattr(needs, field, priority)
+                break
+    for field, keywords in [("international_needs", INTERNATIONAL_KEYWORDS),
+                            ("family_sharing", FAMILY_NEEDS_KEYWORDS),
+                            ("business_features", BUSINESS_NEEDS_KEYWORDS),
+                            ("flexibility", FLEXIBILITY_KEYWORDS)]:
+        if any(keyword in conversation_lower for keyword in keywords):
+            setattr(needs, field, Priority.HIGH)
+
+    conversation_lower = conversation.lower()
+    segment = CustomerSegment.INDIVIDUAL
+    for candidate, keywords in SEGMENT_KEYWORDS.items():
+        if any(keyword in conversation_lower for keyword in keywords):
+            segment = candidate
+            break
+
+    conversation_lower = conversation.lower()
+    pain_points = [pain_point for pain_point, keywords in PAIN_INDICATORS.items()
+                   if any(keyword in conversation_lower for keyword in keywords)]
+    return needs_fields(needs), segment, pain_points
+
+
+def needs_fields(needs):
+    return {field: getattr(needs, field) for field in
+            ["cost_sensitivity", "data_priority", "voice_priority", "network_quality",
+             "international_needs", "family_sharing", "business_features", "flexibility"]}
+
+
+def compiled_profile(profiler, conversation):
+    scan = KEYWORD_MATCHER.scan(conversation)
+    needs = profiler._extract_needs_from_conversation(conversation, scan)
+    segment = profiler._determine_customer_segment(conversation, {}, scan)
+    pain_points = profiler._extract_pain_points(conversation, scan)
+    return needs_fields(needs), segment, pain_points
+
+
+def make_transcript(words, keyword_rate, rng):
+    """Random filler with a sprinkling of real keywords."""
+    keywords = list(KEYWORD_MATCHER.keywords)
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(keywords) if rng.random() < keyword_rate else rng.choice(FILLER))
+    return " ".join(out)
+
+
+def time_it(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(42)
+    profiler = CustomerProfiler()
+
+    # Correctness: identical output on many small random transcripts
+    for _ in range(2000):
+        text = make_transcript(rng.randint(0, 40), 0.2, rng)
+        assert legacy_profile(text) == compiled_profile(profiler, text), text
+    print("✅ compiled matcher matches the original scans on 2000 random transcripts")
+
+    print(f"\n{'words':>10} {'kw rate':>8} {'path':>7} {'original ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for words in (100, 1_000, 10_000, 100_000, 500_000):
+        for rate in (0.0, 0.001, 0.02):
+            text = make_transcript(words, rate, rng)
+            assert legacy_profile(text) == compiled_profile(profiler, text)
+            repeat = 200 if words <= 100 else 5 if words <= 100_000 else 2
+            path = "regex" if len(text) <= KEYWORD_MATCHER.single_pass_chars else "lazy"
+            legacy = time_it(lambda: legacy_profile(text), repeat)
+            compiled = time_it(lambda: compiled_profile(profiler, text), repeat)
+            print(f"{words:>10} {rate:>8} {path:>7} {legacy * 1000:>12.2f} {compiled * 1000:>12.2f} {legacy / compiled:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: best-of-N offers in one multi-target run vs. N single-target runs
+
+The multi-target workflow profiles the customer once, compares every
+candidate in its own branch and pitches only the winner. The baseline runs
+the whole workflow once per candidate and picks the best suitability.
+
+Run from the repository root:
+    python benchmarks/bench_multi_target.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.deterministic_engine import DeterministicEngine
+from src.langgraph_agent import TelecomSalesAgent
+
+
+def make_candidates(target_plan, count):
+    return [
+        dict(target_plan, plan_id=f"offer_{i}", name=f"Offer {i}", price=40.0 + 7.5 * i,
+             data_allowance="unlimited" if i % 3 == 0 else float(10 + 5 * i))
+        for i in range(count)
+    ]
+
+
+def median_ms(run, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(iterations=100):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    single_request = (conversation, current_plan, target_plan, usage_data)
+
+    for name, runner in (("graph", TelecomSalesAgent("benchmark-key", typed_state=True)),
+                         ("engine", DeterministicEngine(typed_state=True))):
+        one_run = median_ms(lambda: runner.process_customer_sync(*single_request), iterations)
+        print(f"\n{name}: one single-target run {one_run:.3f} ms")
+        print(f"{'N':>4} {'N runs ms':>10} {'fan-out ms':>11} {'fan-out / one run':>18}")
+        for count in (2, 5, 10, 20):
+            candidates = make_candidates(target_plan, count)
+
+            def best_of_runs():
+                results = [runner.process_customer_sync(conversation, current_plan, plan, usage_data) for plan in candidates]
+                return max(results, key=lambda r: r["plan_comparison"]["suitability_score"])
+
+            def fan_out():
+                return runner.process_customer_sync(conversation, current_plan, None, usage_data, target_plans=candidates)
+
+            assert best_of_runs()["plan_comparison"]["suitability_score"] == fan_out()["plan_comparison"]["suitability_score"]
+            repeated = median_ms(best_of_runs, max(10, iterations // count))
+            fanned = median_ms(fan_out, iterations)
+            print(f"{count:>4} {repeated:>10.3f} {fanned:>11.3f} {fanned / one_run:>17.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: node memoization on cold, warm and partially changed requests
+
+"cold" runs every node. "warm" repeats the same request, so every memoized
+node is served from the cache. "plan edit" keeps the customer but changes
+the target plan, so only the comparison and pitch run again.
+
+Run from the repository root:
+    python benchmarks/bench_node_cache.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.deterministic_engine import DeterministicEngine
+from src.node_cache import NodeCache
+
+
+def median_ms(run, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(iterations=500):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    request = (conversation, current_plan, target_plan, usage_data)
+
+    print(f"{'state':>6} {'no cache ms':>12} {'cold ms':>8} {'warm ms':>8} {'plan edit ms':>13}")
+    for typed_state in (False, True):
+        plain = DeterministicEngine(typed_state=typed_state)
+        cache = NodeCache()
+        cached = DeterministicEngine(typed_state=typed_state, node_cache=cache)
+
+        def cold():
+            cache.clear()
+            cached.process_customer_sync(*request)
+
+        prices = iter(range(10 ** 9))
+
+        def plan_edit():
+            edited = dict(target_plan, price=40.0 + next(prices) / 100)
+            cached.process_customer_sync(conversation, current_plan, edited, usage_data)
+
+        baseline = median_ms(lambda: plain.process_customer_sync(*request), iterations)
+        cold_ms = median_ms(cold, iterations)
+        cached.process_customer_sync(*request)
+        warm_ms = median_ms(lambda: cached.process_customer_sync(*request), iterations)
+        edit_ms = median_ms(plan_edit, iterations)
+        label = "typed" if typed_state else "json"
+        print(f"{label:>6} {baseline:>12.3f} {cold_ms:>8.3f} {warm_ms:>8.3f} {edit_ms:>13.3f}")
+        print(f"       {cache.stats()['nodes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-node timings with plan-pair analysis in parallel with profiling
+
+Times every workflow node for the sequential layout (the whole comparison
+after profiling) and the parallel layout (analyze_plan_pair runs in the same
+step as analyze_customer and compare_plans only joins the two). Reports the
+median time of each node, the node-level critical path (sum of the slowest
+node in each step) and the end-to-end request time. The plan pair cache is
+cleared before each request so the plan-only work is really done.
+
+Run from the repository root:
+    python benchmarks/bench_parallel_analysis.py
+"""
+
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.agents.plan_pair_cache import PLAN_PAIR_CACHE
+from src.deterministic_engine import DeterministicEngine
+from src.langgraph_agent import TelecomSalesAgent
+
+NODES = ("_validate_inputs", "_analyze_customer", "_analyze_plan_pair", "_compare_plans", "_generate_pitch")
+
+# Nodes of each step; a step takes as long as its slowest node
+STEPS = (("_validate_inputs",), ("_analyze_customer", "_analyze_plan_pair"), ("_compare_plans",), ("_generate_pitch",))
+
+
+def timed(cls, parallel):
+    """Subclass of `cls` that records per-node durations and uses the given layout"""
+
+    class Timed(cls):
+        shares_workflow = False
+        parallel_plan_analysis = parallel
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.timings = defaultdict(list)
+            for name in NODES:
+                setattr(self, name, self._wrap(name, getattr(self, name)))
+            if cls is DeterministicEngine:
+                # The engine binds its nodes at construction; rebind to the timed ones
+                type(self.app).__init__(self.app, self)
+
+        def _wrap(self, name, node):
+            def run(state):
+                start = time.perf_counter()
+                update = node(state)
+                self.timings[name].append(time.perf_counter() - start)
+                return update
+            return run
+
+    return Timed
+
+
+def report(label, runner, request, iterations):
+    totals = []
+    for _ in range(iterations):
+        PLAN_PAIR_CACHE.clear()
+        start = time.perf_counter()
+        runner.process_customer_sync(**request)
+        totals.append(time.perf_counter() - start)
+
+    medians = {name: statistics.median(samples) * 1000 for name, samples in runner.timings.items()}
+    critical = sum(max(medians.get(name, 0.0) for name in step) for step in STEPS)
+    nodes = "  ".join(f"{name.strip('_')}={medians[name]:.3f}" for name in NODES if name in medians)
+    print(f"{label:<20} critical path {critical:6.3f} ms  request {statistics.median(totals) * 1000:6.3f} ms")
+    print(f"{'':<20} {nodes}")
+
+
+def main(iterations=300):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    request = dict(customer_conversation=conversation, current_plan=current_plan,
+                   target_plan=target_plan, usage_data=usage_data)
+
+    for cls, name in ((TelecomSalesAgent, "graph"), (DeterministicEngine, "engine")):
+        for typed_state in (False, True):
+            for parallel in (False, True):
+                args = ("benchmark-key",) if cls is TelecomSalesAgent else ()
+                runner = timed(cls, parallel)(*args, typed_state=typed_state)
+                runner.process_customer_sync(**request)
+                runner.timings.clear()
+                layout = "parallel" if parallel else "sequential"
+                report(f"{name} {'typed' if typed_state else 'json'} {layout}", runner, request, iterations)
+        print()
+
+
+if __name__ == "__main__":
+    main()
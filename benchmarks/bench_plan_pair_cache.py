@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memoized plan-pair diffs in PlanAnalyzer.compare
+
+Simulates production traffic where a few hundred (current, target) plan
+pairs cover many customers, and compares compare() latency with a cold
+cache (cleared before every call) against the shared warm cache.
+
+Run from the repository root:
+    python benchmarks/bench_plan_pair_cache.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_plan_recommender import make_plan, make_customer
+from src.agents.plan_analyzer import PlanAnalyzer
+from src.agents.plan_pair_cache import PLAN_PAIR_CACHE
+from src.models.plan_record import PlanCatalog
+
+
+def main(requests=20000, num_plans=20):
+    rng = random.Random(5)
+    catalog = PlanCatalog([make_plan(i, rng) for i in range(num_plans)])
+    customers = [make_customer(i, rng) for i in range(2000)]
+    work = [(rng.choice(catalog.records), rng.choice(catalog.records), rng.choice(customers)) for _ in range(requests)]
+    analyzer = PlanAnalyzer()
+
+    start = time.perf_counter()
+    cold_results = []
+    for current, target, customer in work:
+        PLAN_PAIR_CACHE.clear()
+        cold_results.append(analyzer.compare(current, target, customer))
+    cold = (time.perf_counter() - start) / requests
+
+    PLAN_PAIR_CACHE.clear()
+    start = time.perf_counter()
+    warm_results = [analyzer.compare(current, target, customer) for current, target, customer in work]
+    warm = (time.perf_counter() - start) / requests
+
+    assert cold_results == warm_results
+    stats = PLAN_PAIR_CACHE.stats()
+    print(f"{requests} comparisons over {num_plans * num_plans} plan pairs")
+    print(f"cold cache: {cold * 1e6:8.2f} us/compare")
+    print(f"warm cache: {warm * 1e6:8.2f} us/compare ({cold / warm:.2f}x)")
+    print(f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PlanAnalyzer hot paths on prebuilt PlanRecords vs. raw TelecomPlans
+
+PlanRecords are what a catalog holds after loading; passing raw TelecomPlan
+models forces normalization on every call, which is what every comparison
+paid before the catalog was normalized once. Reports time per call.
+
+Run from the repository root:
+    python benchmarks/bench_plan_record.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_plan_recommender import make_plan, make_customer
+from src.agents.plan_analyzer import PlanAnalyzer
+from src.models.plan_record import PlanCatalog
+
+
+def per_call(fn, pairs):
+    start = time.perf_counter()
+    for current, target, customer in pairs:
+        fn(current, target, customer)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def main():
+    rng = random.Random(11)
+    plans = [make_plan(i, rng) for i in range(200)]
+    customers = [make_customer(i, rng) for i in range(200)]
+    catalog = PlanCatalog(plans)
+
+    model_pairs = [(plans[0], plans[i], customers[i]) for i in range(200)] * 25
+    record_pairs = [(catalog[0], catalog[i], customers[i]) for i in range(200)] * 25
+
+    analyzer = PlanAnalyzer()
+    print(f"{'path':<32} {'models us':>10} {'records us':>11}")
+    for name, fn in [("_calculate_suitability", analyzer._calculate_suitability),
+                     ("_identify_improvements", analyzer._identify_improvements),
+                     ("compare (full PlanComparison)", analyzer.compare)]:
+        models = per_call(fn, model_pairs) * 1e6
+        records = per_call(fn, record_pairs) * 1e6
+        print(f"{name:<32} {models:>10.2f} {records:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
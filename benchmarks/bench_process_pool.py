@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scaling of process-pool batch processing across cores
+
+Runs the same campaign list serially and through
+TelecomSalesAgent.process_customers_batch_parallel with 1, 2, 4, ... worker
+processes (up to the CPU count) and prints throughput and speedup for each.
+Worker start-up (imports, agent construction) is included in the timings.
+
+Run from the repository root:
+    python benchmarks/bench_process_pool.py [num_customers] [chunksize]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.langgraph_agent import TelecomSalesAgent
+
+
+def make_items(count):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    items = []
+    for i in range(count):
+        usage = dict(usage_data, customer_id=f"cust_{i}", data_usage_gb=float(5 + i % 60), voice_minutes=100 + (i * 37) % 1500)
+        items.append({
+            "customer_conversation": conversation,
+            "current_plan": current_plan,
+            "target_plan": target_plan,
+            "usage_data": usage
+        })
+    return items
+
+
+def main(count=2000, chunksize=64):
+    agent = TelecomSalesAgent("benchmark-key")
+    items = make_items(count)
+
+    start = time.perf_counter()
+    for item in items:
+        agent.process_customer_sync(**item)
+    serial = time.perf_counter() - start
+    print(f"{count} customers, chunksize={chunksize}, {os.cpu_count()} CPUs")
+    print(f"serial:        {count / serial:8.0f} customers/s")
+
+    processes = 1
+    while processes <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        done = sum(1 for _ in agent.process_customers_batch_parallel(items, processes=processes, chunksize=chunksize))
+        elapsed = time.perf_counter() - start
+        assert done == count
+        print(f"{processes:2d} processes:  {count / elapsed:8.0f} customers/s ({serial / elapsed:.2f}x serial)")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
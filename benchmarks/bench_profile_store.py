@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ProfileStore upserts, point lookups and indexed queries
+
+Fills a file-backed store with synthetic customer profiles in batched
+upserts, then reports point lookup latency (stored and still buffered
+profiles) and the time of indexed segment and contract-end queries.
+
+Run from the repository root:
+    python benchmarks/bench_profile_store.py [profiles] [lookups]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.deterministic_engine import DeterministicEngine
+from src.profile_store import ProfileStore
+
+SEGMENTS = ("individual", "family", "business", "enterprise")
+
+
+def make_profiles(count):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    base = DeterministicEngine().process_customer_sync(conversation, current_plan, target_plan, usage_data)["customer_profile"]
+    rng = random.Random(0)
+    return [
+        dict(base, customer_id=f"cust_{i:07d}", segment=SEGMENTS[i % 4], satisfaction_score=round(rng.uniform(1, 10), 1),
+             contract_end_date=f"202{5 + i % 3}-{1 + i % 12:02d}-01T00:00:00")
+        for i in range(count)
+    ]
+
+
+def main(profiles=100000, lookups=20000):
+    documents = make_profiles(profiles)
+    with tempfile.TemporaryDirectory() as directory:
+        store = ProfileStore(os.path.join(directory, "profiles.db"), batch_size=1000)
+
+        start = time.perf_counter()
+        store.put_many(documents)
+        store.flush()
+        elapsed = time.perf_counter() - start
+        print(f"upsert          {profiles / elapsed:10,.0f} profiles/s ({profiles:,} in batches of 1000)")
+
+        ids = [f"cust_{random.randrange(profiles):07d}" for _ in range(lookups)]
+        start = time.perf_counter()
+        for customer_id in ids:
+            store.get(customer_id)
+        print(f"get (stored)    {(time.perf_counter() - start) / lookups * 1e6:10.1f} µs per lookup")
+
+        store.put_many(documents[:500])
+        start = time.perf_counter()
+        for i in range(lookups):
+            store.get(documents[i % 500]["customer_id"])
+        print(f"get (buffered)  {(time.perf_counter() - start) / lookups * 1e6:10.1f} µs per lookup")
+
+        for label, query in (
+            ("find segment", {"segment": "family", "limit": 100}),
+            ("find renewals", {"contract_end_before": "2025-03-01", "max_satisfaction": 4.0}),
+        ):
+            start = time.perf_counter()
+            found = store.find(**query)
+            print(f"{label:15} {(time.perf_counter() - start) * 1e3:10.2f} ms ({len(found):,} profiles)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
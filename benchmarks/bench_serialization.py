@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialization of tool outputs and API responses
+
+Compares the old `json.dumps(model.dict(), indent=2, default=str)` with
+src.serialization on the installed backend (orjson if available) and on
+the standard json fallback, for a single profile, a full analysis result
+and /batch responses of increasing size. Reports microseconds per dump
+and the encoded size.
+
+Run from the repository root:
+    python benchmarks/bench_serialization.py [repeat]
+"""
+
+import json
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src import serialization
+from src.deterministic_engine import DeterministicEngine
+from src.models.customer_profile import CustomerProfile
+
+
+def legacy_dumps(value):
+    if hasattr(value, "dict"):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            value = value.dict()
+    return json.dumps(value, indent=2, default=str)
+
+
+def timed(function, value, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encoded = function(value)
+    return (time.perf_counter() - start) / repeat * 1e6, len(encoded)
+
+
+def main(repeat=200):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    result = DeterministicEngine(typed_state=True).process_customer_sync(
+        conversation, current_plan, target_plan, usage_data
+    )
+    result.pop("messages")
+    profile = CustomerProfile(**dict(result["customer_profile"], contract_end_date="2025-03-01T00:00:00"))
+    payloads = [("profile model", profile, repeat), ("analysis result", result, repeat)]
+    payloads += [(f"batch of {n:,}", {"results": [result] * n}, max(1, repeat // n)) for n in (100, 1000)]
+
+    backend = serialization.orjson
+    print(f"installed JSON backend: {serialization.JSON_BACKEND}")
+    print(f"{'payload':16} {'legacy':>12} {'json':>12} {serialization.JSON_BACKEND:>12} {'legacy size':>12} {'size':>10}")
+    for name, value, count in payloads:
+        legacy, legacy_size = timed(legacy_dumps, value, count)
+        serialization.orjson = None
+        fallback, _ = timed(serialization.dumps_bytes, value, count)
+        serialization.orjson = backend
+        fast, size = timed(serialization.dumps_bytes, value, count)
+        print(f"{name:16} {legacy:10,.1f}µs {fallback:10,.1f}µs {fast:10,.1f}µs {legacy_size:12,} {size:10,}")
+
+    body = serialization.dumps_bytes({"results": [result] * 1000})
+    start = time.perf_counter()
+    json.loads(body)
+    stdlib = time.perf_counter() - start
+    start = time.perf_counter()
+    serialization.loads(body)
+    print(f"loads batch of 1,000: json {stdlib * 1e3:.1f} ms, {serialization.JSON_BACKEND} "
+          f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a burst of identical concurrent requests with and without coalescing
+
+Models a campaign launch where the same (transcript template, usage bucket,
+plan pair) arrives many times at once. With single-flight, the burst costs
+one workflow run plus a result copy per caller.
+
+Run from the repository root:
+    python benchmarks/bench_single_flight.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.langgraph_agent import TelecomSalesAgent
+from src.single_flight import SingleFlight
+
+
+async def burst(agent, request, size, distinct):
+    requests = [request if i % distinct == 0 else (request[0] + f" #{i % distinct}",) + request[1:] for i in range(size)]
+    start = time.perf_counter()
+    await asyncio.gather(*(agent.process_customer(*r) for r in requests))
+    return (time.perf_counter() - start) * 1000
+
+
+def main(size=200):
+    request = create_sample_data()
+    print(f"{'distinct':>8} {'plain ms':>9} {'coalesced ms':>13} {'coalesce rate':>14}")
+    for distinct in (1, 5, 20, size):
+        flights = SingleFlight()
+        plain = TelecomSalesAgent("benchmark-key", typed_state=True)
+        coalesced = TelecomSalesAgent("benchmark-key", typed_state=True, single_flight=flights)
+        asyncio.run(burst(plain, request, 4, 1))
+        plain_ms = asyncio.run(burst(plain, request, size, distinct))
+        coalesced_ms = asyncio.run(burst(coalesced, request, size, distinct))
+        print(f"{distinct:>8} {plain_ms:>9.1f} {coalesced_ms:>13.1f} {flights.stats()['coalesce_rate']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request cost of the built-in telemetry
+
+Runs the same request with telemetry disabled, fully sampled and sampled at
+10%, then prints where the time goes according to the recorded histograms.
+
+Run from the repository root:
+    python benchmarks/bench_telemetry.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.deterministic_engine import DeterministicEngine
+from src.langgraph_agent import TelecomSalesAgent
+from src.telemetry import TELEMETRY
+
+
+def median_ms(run, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(iterations=1000):
+    request = create_sample_data()
+    settings = (("disabled", False, 1.0), ("sampled 100%", True, 1.0), ("sampled 10%", True, 0.1))
+
+    for name, runner in (("engine", DeterministicEngine()), ("engine typed", DeterministicEngine(typed_state=True)),
+                         ("graph", TelecomSalesAgent("benchmark-key"))):
+        runner.process_customer_sync(*request)
+        timings = []
+        for _, enabled, sample_rate in settings:
+            TELEMETRY.enabled, TELEMETRY.sample_rate = enabled, sample_rate
+            timings.append(median_ms(lambda: runner.process_customer_sync(*request), iterations if name != "graph" else iterations // 5))
+        overheads = "  ".join(
+            f"{label} {ms:.3f} ms ({(ms / timings[0] - 1) * 100:+.1f}%)" for (label, _, _), ms in zip(settings, timings)
+        )
+        print(f"{name:>13}: {overheads}")
+
+    TELEMETRY.enabled, TELEMETRY.sample_rate = True, 1.0
+    TELEMETRY.reset()
+    runner = DeterministicEngine()
+    for _ in range(iterations):
+        runner.process_customer_sync(*request)
+    print("\nengine breakdown (mean wall / cpu ms):")
+    for kind, spans in TELEMETRY.summary().items():
+        for span, stats in spans.items():
+            print(f"  {kind:>13} {span:<28} {stats['wall_mean_ms']:.4f} / {stats['cpu_mean_ms']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
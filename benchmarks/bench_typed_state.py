@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON round-trips vs. typed in-process state in TelecomSalesAgent
+
+Runs the sample customer through the workflow in both modes, checks that the
+results are identical and reports the per-request latency of each.
+
+Run from the repository root:
+    python benchmarks/bench_typed_state.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_usage import create_sample_data
+from src.langgraph_agent import TelecomSalesAgent
+
+
+def measure(agent, request, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        agent.process_customer_sync(**request)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(iterations=300):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    request = dict(
+        customer_conversation=conversation,
+        current_plan=current_plan,
+        target_plan=target_plan,
+        usage_data=usage_data
+    )
+
+    json_agent = TelecomSalesAgent("benchmark-key")
+    typed_agent = TelecomSalesAgent("benchmark-key", typed_state=True)
+
+    json_result = json_agent.process_customer_sync(**request)
+    typed_result = typed_agent.process_customer_sync(**request)
+    assert json_result["success"] and typed_result["success"]
+    for key in ("customer_profile", "plan_comparison", "personalized_pitch", "messages"):
+        assert json_result[key] == typed_result[key], key
+    print("✅ typed-state results match the JSON round-trip results")
+
+    # Warm up both paths before timing
+    measure(json_agent, request, 20)
+    measure(typed_agent, request, 20)
+
+    json_samples = measure(json_agent, request, iterations)
+    typed_samples = measure(typed_agent, request, iterations)
+
+    json_median = statistics.median(json_samples) * 1000
+    typed_median = statistics.median(typed_samples) * 1000
+    print(f"\n{'mode':<12} {'median ms':>10} {'mean ms':>10}")
+    print(f"{'json':<12} {json_median:>10.3f} {statistics.mean(json_samples) * 1000:>10.3f}")
+    print(f"{'typed':<12} {typed_median:>10.3f} {statistics.mean(typed_samples) * 1000:>10.3f}")
+    print(f"\nSaved per request: {json_median - typed_median:.3f} ms ({json_median / typed_median:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Load test: throughput and latency percentiles of the ASGI service
+
+Starts `uvicorn src.service:create_app --factory` on a free local port
+(unless --url points at a running service), fires --requests requests with
+--concurrency in flight and reports throughput, p50/p95/p99 latency and
+non-200 responses. Needs httpx (pip install httpx).
+
+Run from the repository root:
+    python benchmarks/load_test.py --endpoint analyze --requests 2000 --concurrency 32
+    python benchmarks/load_test.py --endpoint batch --batch-size 100 --requests 50
+    python benchmarks/load_test.py --endpoint recommend --processes 0
+    python benchmarks/load_test.py --timeout 0.05 --queue-size 4 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from example_usage import create_sample_data
+
+
+def make_catalog(target_plan, size=50):
+    return [
+        dict(target_plan, plan_id=f"plan_{i}", name=f"Plan {i}", price=25.0 + 2.5 * i,
+             data_allowance="unlimited" if i % 4 == 0 else float(5 + 5 * i))
+        for i in range(size)
+    ]
+
+
+def make_payload(endpoint, batch_size, timeout=None, priority=None):
+    conversation, current_plan, target_plan, usage_data = create_sample_data()
+    item = {
+        "customer_conversation": conversation,
+        "current_plan": current_plan,
+        "target_plan": target_plan,
+        "usage_data": usage_data
+    }
+    if timeout is not None:
+        item["timeout"] = timeout
+    if endpoint == "batch":
+        payload = {"items": [item] * batch_size}
+    elif endpoint == "recommend":
+        payload = {"customer_conversation": conversation, "usage_data": usage_data, "current_plan": current_plan, "k": 3}
+    else:
+        payload = item
+    if priority is not None:
+        payload["priority"] = priority
+    return payload
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(processes, queue_size):
+    """Run the service in a uvicorn subprocess and wait until it is healthy"""
+    _, _, target_plan, _ = create_sample_data()
+    catalog = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    json.dump(make_catalog(target_plan), catalog)
+    catalog.close()
+
+    port = free_port()
+    env = dict(os.environ, TELECOM_PLAN_CATALOG=catalog.name, TELECOM_SERVICE_QUEUE_SIZE=str(queue_size))
+    if processes is not None:
+        env["TELECOM_SERVICE_PROCESSES"] = str(processes)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.service:create_app", "--factory",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            health = httpx.get(f"{url}/health", timeout=1.0).json()
+            print(f"service ready: {health['workers']} worker(s)")
+            return server, url, catalog.name
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("service did not become healthy within 60s")
+
+
+async def run_load(url, endpoint, payload, requests, concurrency):
+    latencies, statuses = [], Counter()
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60.0, limits=limits) as client:
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(f"/{endpoint}", json=payload)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        await client.post(f"/{endpoint}", json=payload)  # warm-up
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Running service to test; by default one is started locally")
+    parser.add_argument("--endpoint", choices=("analyze", "batch", "recommend"), default="analyze")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--processes", type=int, help="Worker processes of the local service")
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--timeout", type=float, help="Per-request deadline in seconds (/analyze and /batch items)")
+    parser.add_argument("--priority", choices=("interactive", "batch"), help="Lane of the requests")
+    args = parser.parse_args()
+
+    server = catalog_path = None
+    url = args.url
+    if url is None:
+        server, url, catalog_path = start_server(args.processes, args.queue_size)
+    try:
+        payload = make_payload(args.endpoint, args.batch_size, args.timeout, args.priority)
+        latencies, statuses, elapsed = asyncio.run(
+            run_load(url, args.endpoint, payload, args.requests, args.concurrency)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            os.unlink(catalog_path)
+
+    latencies.sort()
+    items = args.requests * (args.batch_size if args.endpoint == "batch" else 1)
+    print(f"\n/{args.endpoint}: {args.requests} requests, concurrency {args.concurrency}")
+    print(f"  throughput   {args.requests / elapsed:10.1f} req/s ({items / elapsed:.1f} customers/s)")
+    print(f"  latency p50  {percentile(latencies, 0.50) * 1000:10.2f} ms")
+    print(f"  latency p95  {percentile(latencies, 0.95) * 1000:10.2f} ms")
+    print(f"  latency p99  {percentile(latencies, 0.99) * 1000:10.2f} ms")
+    print(f"  mean         {statistics.mean(latencies) * 1000:10.2f} ms")
+    print(f"  responses    {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
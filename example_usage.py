@@ -254,40 +254,42 @@ def demo_multiple_customers():
         }
     ]
     
-    # Process each scenario
+    # Process all scenarios concurrently; results arrive as each one finishes
     agent = TelecomSalesAgent("placeholder-key")
     
-    for i, scenario in enumerate(scenarios, 1):
-        print(f"\n📱 SCENARIO {i}: {scenario['name']}")
+    # Use the basic current plan for all scenarios
+    _, current_plan, _, _ = create_sample_data()
+    items = [
+        {
+            "customer_conversation": scenario["conversation"],
+            "current_plan": current_plan,
+            "target_plan": scenario["target_plan"],
+            "usage_data": scenario["usage_data"]
+        }
+        for scenario in scenarios
+    ]
+    
+    def report_progress(completed, total):
+        print(f"⏳ Progress: {completed}/{total} scenarios processed")
+    
+    for item in agent.process_customers_batch_sync(items, concurrency=4, progress_callback=report_progress):
+        scenario = scenarios[item.index]
+        result = item.result
+        print(f"\n📱 SCENARIO {item.index + 1}: {scenario['name']}")
         print("-" * 40)
         
-        # Use the basic current plan for all scenarios
-        _, current_plan, _, _ = create_sample_data()
-        
-        try:
-            result = agent.process_customer_sync(
-                customer_conversation=scenario["conversation"],
-                current_plan=current_plan,
-                target_plan=scenario["target_plan"],
-                usage_data=scenario["usage_data"]
-            )
+        if result["success"]:
+            comparison = result["plan_comparison"]
+            pitch = result["personalized_pitch"]
             
-            if result["success"]:
-                profile = result["customer_profile"]
-                comparison = result["plan_comparison"]
-                pitch = result["personalized_pitch"]
-                
-                print(f"✅ {scenario['usage_data']['name']} - Analysis Complete")
-                print(f"🎯 Suitability Score: {comparison['suitability_score']:.1f}/10")
-                print(f"💰 Monthly Impact: ${comparison['monthly_savings']:.2f}")
-                print(f"🗣️  Opening Hook: {pitch['opening_hook'][:100]}...")
-                print(f"🎁 Top Feature: {pitch['feature_highlights'][0] if pitch['feature_highlights'] else 'N/A'}")
-                
-            else:
-                print(f"❌ Error processing {scenario['name']}: {result['error']}")
-                
-        except Exception as e:
-            print(f"💥 Error in scenario {i}: {str(e)}")
+            print(f"✅ {scenario['usage_data']['name']} - Analysis Complete")
+            print(f"🎯 Suitability Score: {comparison['suitability_score']:.1f}/10")
+            print(f"💰 Monthly Impact: ${comparison['monthly_savings']:.2f}")
+            print(f"🗣️  Opening Hook: {pitch['opening_hook'][:100]}...")
+            print(f"🎁 Top Feature: {pitch['feature_highlights'][0] if pitch['feature_highlights'] else 'N/A'}")
+            
+        else:
+            print(f"❌ Error processing {scenario['name']}: {result['error']}")
 
 
 def main():
@@ -36,7 +36,7 @@ def main():
     ]
     
     langgraph_packages = [
-        "langgraph>=0.1.0"
+        "langgraph>=0.2.0"
     ]
     
     other_packages = [
@@ -44,8 +44,9 @@ def main():
         "uvicorn>=0.20.0",
         "pandas>=2.0.0",
         "numpy>=1.24.0",
+        "pyarrow>=7.0.0",
         "plotly>=5.15.0",
-        "streamlit>=1.30.0"
+        "streamlit>=1.37.0"
     ]
     
     print("📦 Installing core packages...")
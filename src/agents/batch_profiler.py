@@ -0,0 +1,97 @@
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from ..models.customer_profile import UsagePattern, CustomerSegment
+from .customer_profiler import (
+    KEYWORD_MATCHER,
+    BUSINESS_DATA_GB, BUSINESS_VOICE_MINUTES,
+    HEAVY_DATA_GB, HEAVY_VOICE_MINUTES,
+    MODERATE_DATA_GB, MODERATE_VOICE_MINUTES
+)
+
+
+# Integer codes used in batch results; index into these tuples to decode
+USAGE_PATTERN_CODES = (UsagePattern.LIGHT, UsagePattern.MODERATE, UsagePattern.HEAVY, UsagePattern.BUSINESS)
+SEGMENT_CODES = (CustomerSegment.INDIVIDUAL, CustomerSegment.FAMILY, CustomerSegment.BUSINESS, CustomerSegment.ENTERPRISE)
+
+_SEGMENT_TO_CODE = {segment: code for code, segment in enumerate(SEGMENT_CODES)}
+
+
+class BatchProfile(NamedTuple):
+    """Columnar profiling result for a batch of subscribers."""
+    usage_pattern_codes: np.ndarray
+    segment_codes: np.ndarray
+
+    def usage_patterns(self) -> List[UsagePattern]:
+        """Decode usage pattern codes into UsagePattern values."""
+        return [USAGE_PATTERN_CODES[code] for code in self.usage_pattern_codes.tolist()]
+
+    def segments(self) -> List[CustomerSegment]:
+        """Decode segment codes into CustomerSegment values."""
+        return [SEGMENT_CODES[code] for code in self.segment_codes.tolist()]
+
+
+def classify_usage_patterns(data_usage_gb, voice_minutes, business_user=None) -> np.ndarray:
+    """
+    Vectorized equivalent of CustomerProfiler._analyze_usage_pattern.
+
+    Returns an int8 array of codes into USAGE_PATTERN_CODES.
+    """
+    data_gb = np.atleast_1d(np.asarray(data_usage_gb, dtype=np.float64))
+    voice = np.atleast_1d(np.asarray(voice_minutes, dtype=np.float64))
+    if data_gb.shape != voice.shape:
+        raise ValueError(f"Column length mismatch: data_usage_gb {data_gb.shape} vs voice_minutes {voice.shape}")
+
+    business = (data_gb > BUSINESS_DATA_GB) & (voice > BUSINESS_VOICE_MINUTES)
+    if business_user is not None:
+        flags = np.atleast_1d(np.asarray(business_user))
+        if flags.shape != data_gb.shape:
+            raise ValueError(f"Column length mismatch: business_user {flags.shape} vs data_usage_gb {data_gb.shape}")
+        business |= flags.astype(bool)
+
+    heavy = (data_gb > HEAVY_DATA_GB) | (voice > HEAVY_VOICE_MINUTES)
+    moderate = (data_gb > MODERATE_DATA_GB) | (voice > MODERATE_VOICE_MINUTES)
+
+    # Same precedence as the scalar if/elif chain: business, heavy, moderate, light
+    return np.select([business, heavy, moderate], [3, 2, 1], default=0).astype(np.int8)
+
+
+def classify_segments(conversations: Optional[Iterable[str]], size: int) -> np.ndarray:
+    """
+    Segment codes for a batch, matching CustomerProfiler._determine_customer_segment.
+
+    Without conversations every subscriber is INDIVIDUAL, as in the scalar path.
+    """
+    codes = np.zeros(size, dtype=np.int8)
+    if conversations is None:
+        return codes
+
+    conversations = list(conversations)
+    if len(conversations) != size:
+        raise ValueError(f"Column length mismatch: {len(conversations)} conversations vs {size} subscribers")
+
+    for i, conversation in enumerate(conversations):
+        if conversation:
+            segment = KEYWORD_MATCHER.scan(conversation).first_match('segment', CustomerSegment.INDIVIDUAL)
+            codes[i] = _SEGMENT_TO_CODE[segment]
+    return codes
+
+
+def profile_batch(data_usage_gb, voice_minutes, business_user=None, conversations: Optional[Iterable[str]] = None) -> BatchProfile:
+    """
+    Classify a whole batch of subscribers from columnar usage data.
+
+    Args:
+        data_usage_gb: Monthly data usage per subscriber (array-like)
+        voice_minutes: Monthly voice minutes per subscriber (array-like)
+        business_user: Optional business flag per subscriber (array-like)
+        conversations: Optional transcript per subscriber used for segmentation
+
+    Returns:
+        BatchProfile with usage pattern and segment codes, identical to the
+        results of the scalar CustomerProfiler path for each row
+    """
+    usage_codes = classify_usage_patterns(data_usage_gb, voice_minutes, business_user)
+    segment_codes = classify_segments(conversations, len(usage_codes))
+    return BatchProfile(usage_pattern_codes=usage_codes, segment_codes=segment_codes)
@@ -1,9 +1,86 @@
 from typing import Dict, List, Any
-import json
 import re
-from langchain.tools import BaseTool
+from .tool_base import BaseTool
+from ..serialization import dumps
+from ..telemetry import TELEMETRY, SERIALIZATION, TOOL, VALIDATION
 from pydantic import BaseModel, Field
 from ..models.customer_profile import CustomerProfile, CustomerNeeds, UsageData, Priority, UsagePattern, CustomerSegment
+from .keyword_matcher import KeywordMatcher, KeywordScan
+
+
+# Keyword tables, in priority order: the first group with a hit wins
+COST_KEYWORDS = {
+    Priority.CRITICAL: ['expensive', 'too much', 'cant afford', 'budget tight', 'cheaper', 'save money', 'cost cutting'],
+    Priority.HIGH: ['pricey', 'cost', 'budget', 'affordable', 'reasonable price'],
+    Priority.LOW: ['dont care about price', 'money no object', 'premium service', 'best available']
+}
+
+DATA_KEYWORDS = {
+    Priority.CRITICAL: ['unlimited data', 'lots of data', 'stream videos', 'heavy user', 'work from home', 'online gaming'],
+    Priority.HIGH: ['data', 'internet', 'streaming', 'social media', 'apps'],
+    Priority.LOW: ['dont use data', 'wifi mostly', 'basic phone', 'calls only']
+}
+
+VOICE_KEYWORDS = {
+    Priority.CRITICAL: ['unlimited calls', 'talk a lot', 'business calls', 'long conversations'],
+    Priority.HIGH: ['calls', 'talking', 'voice', 'minutes'],
+    Priority.LOW: ['dont call much', 'text mostly', 'rarely call']
+}
+
+NETWORK_KEYWORDS = {
+    Priority.CRITICAL: ['poor coverage', 'dropped calls', 'slow internet', 'need reliability', 'coverage issues'],
+    Priority.HIGH: ['good coverage', 'fast internet', 'reliable', 'network quality'],
+    Priority.LOW: ['coverage ok', 'dont mind slow']
+}
+
+INTERNATIONAL_KEYWORDS = ['international', 'overseas', 'abroad', 'foreign', 'global', 'travel']
+FAMILY_NEEDS_KEYWORDS = ['family plan', 'multiple lines', 'kids', 'spouse', 'shared', 'family']
+BUSINESS_NEEDS_KEYWORDS = ['business', 'work', 'company', 'enterprise', 'professional']
+FLEXIBILITY_KEYWORDS = ['flexible', 'change plans', 'no contract', 'month to month', 'cancel anytime']
+
+SEGMENT_KEYWORDS = {
+    CustomerSegment.ENTERPRISE: ['enterprise', 'corporation', 'company plan', 'bulk lines', 'business account'],
+    CustomerSegment.BUSINESS: ['business', 'work', 'professional', 'office'],
+    CustomerSegment.FAMILY: ['family', 'kids', 'children', 'spouse', 'multiple lines', 'family plan']
+}
+
+PAIN_INDICATORS = {
+    'poor coverage': ['poor coverage', 'no signal', 'dropped calls', 'coverage issues'],
+    'expensive bill': ['expensive', 'high bill', 'too much money', 'overpriced'],
+    'slow internet': ['slow internet', 'slow data', 'poor speed', 'buffering'],
+    'poor customer service': ['bad service', 'poor support', 'unhelpful staff', 'long wait times'],
+    'contract issues': ['locked in', 'cant change', 'stuck with plan', 'contract problems'],
+    'billing issues': ['billing error', 'wrong charge', 'unexpected fees', 'billing confusion'],
+    'overage charges': ['overage', 'extra charges', 'exceeded limit', 'surprise charges']
+}
+
+# All tables compiled once into a single matcher shared by every profiler
+KEYWORD_MATCHER = KeywordMatcher({
+    'cost_sensitivity': COST_KEYWORDS,
+    'data_priority': DATA_KEYWORDS,
+    'voice_priority': VOICE_KEYWORDS,
+    'network_quality': NETWORK_KEYWORDS,
+    'international_needs': {Priority.HIGH: INTERNATIONAL_KEYWORDS},
+    'family_sharing': {Priority.HIGH: FAMILY_NEEDS_KEYWORDS},
+    'business_features': {Priority.HIGH: BUSINESS_NEEDS_KEYWORDS},
+    'flexibility': {Priority.HIGH: FLEXIBILITY_KEYWORDS},
+    'segment': SEGMENT_KEYWORDS,
+    'pain_points': PAIN_INDICATORS,
+})
+
+# Usage pattern thresholds (strictly greater than)
+BUSINESS_DATA_GB = 50
+BUSINESS_VOICE_MINUTES = 1000
+HEAVY_DATA_GB = 30
+HEAVY_VOICE_MINUTES = 800
+MODERATE_DATA_GB = 10
+MODERATE_VOICE_MINUTES = 300
+
+# Fields of CustomerNeeds driven by keyword tables, in evaluation order
+NEEDS_TABLES = [
+    'cost_sensitivity', 'data_priority', 'voice_priority', 'network_quality',
+    'international_needs', 'family_sharing', 'business_features', 'flexibility'
+]
 
 
 class CustomerProfilerInput(BaseModel):
@@ -17,51 +94,69 @@ class CustomerProfiler(BaseTool):
     description: str = "Analyzes customer conversations and usage data to create or update customer needs profile"
     args_schema = CustomerProfilerInput
     
+    @TELEMETRY.traced(TOOL, "customer_profiler._run")
     def _run(self, customer_conversation: str, usage_data: Dict, existing_profile: Dict = None) -> str:
         """Analyze customer conversation and usage data to build comprehensive profile."""
         try:
-            # Extract needs from conversation
-            needs = self._extract_needs_from_conversation(customer_conversation)
-            
-            # Analyze usage patterns
-            usage_pattern = self._analyze_usage_pattern(usage_data)
-            
-            # Determine customer segment
-            segment = self._determine_customer_segment(customer_conversation, usage_data)
-            
-            # Extract pain points
-            pain_points = self._extract_pain_points(customer_conversation)
-            
-            # Build or update profile
-            if existing_profile:
-                profile = CustomerProfile(**existing_profile)
-                # Update with new insights
-                profile.needs = needs
-                profile.usage_pattern = usage_pattern
-                profile.pain_points = pain_points
-                profile.usage_data = UsageData(**usage_data)
-            else:
-                # Create new profile with minimal required info
-                profile = CustomerProfile(
-                    customer_id=usage_data.get('customer_id', 'unknown'),
-                    name=usage_data.get('name', 'Customer'),
-                    location=usage_data.get('location', 'Unknown'),
-                    segment=segment,
-                    usage_pattern=usage_pattern,
-                    current_monthly_spend=usage_data.get('current_spend', 0),
-                    usage_data=UsageData(**usage_data),
-                    needs=needs,
-                    pain_points=pain_points
-                )
+            profile = self.profile(customer_conversation, usage_data, existing_profile)
             
-            return json.dumps(profile.dict(), indent=2, default=str)
+            with TELEMETRY.span(SERIALIZATION, "customer_profiler"):
+                return dumps(profile)
             
         except Exception as e:
             return f"Error profiling customer: {str(e)}"
     
-    def _extract_needs_from_conversation(self, conversation: str) -> CustomerNeeds:
+    def profile(self, customer_conversation: str, usage_data: Dict, existing_profile: Dict = None) -> CustomerProfile:
+        """Build the validated customer profile without serializing it."""
+        # Match every keyword table against the conversation in one scan
+        scan = KEYWORD_MATCHER.scan(customer_conversation)
+        
+        # Extract needs from conversation
+        needs = self._extract_needs_from_conversation(customer_conversation, scan)
+        
+        # Analyze usage patterns
+        usage_pattern = self._analyze_usage_pattern(usage_data)
+        
+        # Determine customer segment
+        segment = self._determine_customer_segment(customer_conversation, usage_data, scan)
+        
+        # Extract pain points
+        pain_points = self._extract_pain_points(customer_conversation, scan)
+        
+        # Build or update profile
+        with TELEMETRY.span(VALIDATION, "customer_profiler"):
+            return self._build_profile(usage_data, existing_profile, needs, usage_pattern, segment, pain_points)
+    
+    def _build_profile(self, usage_data: Dict, existing_profile: Dict, needs: CustomerNeeds,
+                       usage_pattern: UsagePattern, segment: CustomerSegment, pain_points: List[str]) -> CustomerProfile:
+        """Build a new profile, or update an existing one, with the extracted insights."""
+        if existing_profile:
+            # A given segment is kept; a profile without one gets the classified segment
+            profile = CustomerProfile(**{'segment': segment, **existing_profile})
+            # Update with new insights
+            profile.needs = needs
+            profile.usage_pattern = usage_pattern
+            profile.pain_points = pain_points
+            profile.usage_data = UsageData(**usage_data)
+        else:
+            # Create new profile with minimal required info
+            profile = CustomerProfile(
+                customer_id=usage_data.get('customer_id', 'unknown'),
+                name=usage_data.get('name', 'Customer'),
+                location=usage_data.get('location', 'Unknown'),
+                segment=segment,
+                usage_pattern=usage_pattern,
+                current_monthly_spend=usage_data.get('current_spend', 0),
+                usage_data=UsageData(**usage_data),
+                needs=needs,
+                pain_points=pain_points
+            )
+        
+        return profile
+    
+    def _extract_needs_from_conversation(self, conversation: str, scan: KeywordScan = None) -> CustomerNeeds:
         """Extract customer needs and priorities from conversation text."""
-        conversation_lower = conversation.lower()
+        scan = scan or KEYWORD_MATCHER.scan(conversation)
         
         # Initialize with default medium priorities
         needs = CustomerNeeds(
@@ -73,73 +168,11 @@ class CustomerProfiler(BaseTool):
             flexibility=Priority.MEDIUM
         )
         
-        # Cost sensitivity indicators
-        cost_keywords = {
-            Priority.CRITICAL: ['expensive', 'too much', 'cant afford', 'budget tight', 'cheaper', 'save money', 'cost cutting'],
-            Priority.HIGH: ['pricey', 'cost', 'budget', 'affordable', 'reasonable price'],
-            Priority.LOW: ['dont care about price', 'money no object', 'premium service', 'best available']
-        }
-        
-        for priority, keywords in cost_keywords.items():
-            if any(keyword in conversation_lower for keyword in keywords):
-                needs.cost_sensitivity = priority
-                break
-        
-        # Data priority indicators
-        data_keywords = {
-            Priority.CRITICAL: ['unlimited data', 'lots of data', 'stream videos', 'heavy user', 'work from home', 'online gaming'],
-            Priority.HIGH: ['data', 'internet', 'streaming', 'social media', 'apps'],
-            Priority.LOW: ['dont use data', 'wifi mostly', 'basic phone', 'calls only']
-        }
-        
-        for priority, keywords in data_keywords.items():
-            if any(keyword in conversation_lower for keyword in keywords):
-                needs.data_priority = priority
-                break
-        
-        # Voice priority indicators
-        voice_keywords = {
-            Priority.CRITICAL: ['unlimited calls', 'talk a lot', 'business calls', 'long conversations'],
-            Priority.HIGH: ['calls', 'talking', 'voice', 'minutes'],
-            Priority.LOW: ['dont call much', 'text mostly', 'rarely call']
-        }
-        
-        for priority, keywords in voice_keywords.items():
-            if any(keyword in conversation_lower for keyword in keywords):
-                needs.voice_priority = priority
-                break
-        
-        # Network quality indicators
-        network_keywords = {
-            Priority.CRITICAL: ['poor coverage', 'dropped calls', 'slow internet', 'need reliability', 'coverage issues'],
-            Priority.HIGH: ['good coverage', 'fast internet', 'reliable', 'network quality'],
-            Priority.LOW: ['coverage ok', 'dont mind slow']
-        }
-        
-        for priority, keywords in network_keywords.items():
-            if any(keyword in conversation_lower for keyword in keywords):
-                needs.network_quality = priority
-                break
-        
-        # International needs
-        international_keywords = ['international', 'overseas', 'abroad', 'foreign', 'global', 'travel']
-        if any(keyword in conversation_lower for keyword in international_keywords):
-            needs.international_needs = Priority.HIGH
-        
-        # Family sharing needs
-        family_keywords = ['family plan', 'multiple lines', 'kids', 'spouse', 'shared', 'family']
-        if any(keyword in conversation_lower for keyword in family_keywords):
-            needs.family_sharing = Priority.HIGH
-        
-        # Business features
-        business_keywords = ['business', 'work', 'company', 'enterprise', 'professional']
-        if any(keyword in conversation_lower for keyword in business_keywords):
-            needs.business_features = Priority.HIGH
-        
-        # Flexibility needs
-        flexibility_keywords = ['flexible', 'change plans', 'no contract', 'month to month', 'cancel anytime']
-        if any(keyword in conversation_lower for keyword in flexibility_keywords):
-            needs.flexibility = Priority.HIGH
+        # First matching priority group wins; unmatched fields keep their default
+        for field in NEEDS_TABLES:
+            priority = scan.first_match(field)
+            if priority is not None:
+                setattr(needs, field, priority)
         
         return needs
     
@@ -149,60 +182,29 @@ class CustomerProfiler(BaseTool):
         voice_minutes = usage_data.get('voice_minutes', 0)
         
         # Business pattern indicators
-        if (data_gb > 50 and voice_minutes > 1000) or usage_data.get('business_user', False):
+        if (data_gb > BUSINESS_DATA_GB and voice_minutes > BUSINESS_VOICE_MINUTES) or usage_data.get('business_user', False):
             return UsagePattern.BUSINESS
         
         # Heavy user pattern
-        elif data_gb > 30 or voice_minutes > 800:
+        elif data_gb > HEAVY_DATA_GB or voice_minutes > HEAVY_VOICE_MINUTES:
             return UsagePattern.HEAVY
         
         # Moderate user pattern
-        elif data_gb > 10 or voice_minutes > 300:
+        elif data_gb > MODERATE_DATA_GB or voice_minutes > MODERATE_VOICE_MINUTES:
             return UsagePattern.MODERATE
         
         # Light user pattern
         else:
             return UsagePattern.LIGHT
     
-    def _determine_customer_segment(self, conversation: str, usage_data: Dict) -> CustomerSegment:
+    def _determine_customer_segment(self, conversation: str, usage_data: Dict, scan: KeywordScan = None) -> CustomerSegment:
         """Determine customer segment based on conversation and usage."""
-        conversation_lower = conversation.lower()
-        
-        # Enterprise indicators
-        enterprise_keywords = ['enterprise', 'corporation', 'company plan', 'bulk lines', 'business account']
-        if any(keyword in conversation_lower for keyword in enterprise_keywords):
-            return CustomerSegment.ENTERPRISE
+        scan = scan or KEYWORD_MATCHER.scan(conversation)
         
-        # Business indicators
-        business_keywords = ['business', 'work', 'professional', 'office']
-        if any(keyword in conversation_lower for keyword in business_keywords):
-            return CustomerSegment.BUSINESS
-        
-        # Family indicators
-        family_keywords = ['family', 'kids', 'children', 'spouse', 'multiple lines', 'family plan']
-        if any(keyword in conversation_lower for keyword in family_keywords):
-            return CustomerSegment.FAMILY
-        
-        # Default to individual
-        return CustomerSegment.INDIVIDUAL
+        # Enterprise, then business, then family indicators; default to individual
+        return scan.first_match('segment', CustomerSegment.INDIVIDUAL)
     
-    def _extract_pain_points(self, conversation: str) -> List[str]:
+    def _extract_pain_points(self, conversation: str, scan: KeywordScan = None) -> List[str]:
         """Extract current pain points from customer conversation."""
-        pain_points = []
-        conversation_lower = conversation.lower()
-        
-        pain_indicators = {
-            'poor coverage': ['poor coverage', 'no signal', 'dropped calls', 'coverage issues'],
-            'expensive bill': ['expensive', 'high bill', 'too much money', 'overpriced'],
-            'slow internet': ['slow internet', 'slow data', 'poor speed', 'buffering'],
-            'poor customer service': ['bad service', 'poor support', 'unhelpful staff', 'long wait times'],
-            'contract issues': ['locked in', 'cant change', 'stuck with plan', 'contract problems'],
-            'billing issues': ['billing error', 'wrong charge', 'unexpected fees', 'billing confusion'],
-            'overage charges': ['overage', 'extra charges', 'exceeded limit', 'surprise charges']
-        }
-        
-        for pain_point, keywords in pain_indicators.items():
-            if any(keyword in conversation_lower for keyword in keywords):
-                pain_points.append(pain_point)
-        
-        return pain_points
\ No newline at end of file
+        scan = scan or KEYWORD_MATCHER.scan(conversation)
+        return scan.all_matches('pain_points')
@@ -0,0 +1,185 @@
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Alternation regex for ``keywords`` factored into a prefix trie.
+
+    Alternatives at each node start with distinct characters and optional
+    tails are greedy, so a match at any position is the longest keyword
+    starting there.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Keyword index compiled once from all of a tool's keyword tables.
+
+    Each table is an ordered mapping of ``label -> keywords``. Every distinct
+    keyword is stored once, no matter how many tables reference it, together
+    with its substring links (the keywords it contains, as in the output
+    links of an Aho-Corasick automaton). A scan lowercases the transcript
+    once. Transcripts up to ``single_pass_chars`` are resolved in one pass of
+    a precompiled trie regex; longer ones resolve each keyword lazily with
+    one substring search, where the links let a hit on "unlimited data" imply
+    "data" and a miss on "data" rule out "lots of data" without touching the
+    transcript again.
+    """
+
+    # Beyond this length (or with many keywords) per-keyword substring
+    # searches, which stop at the first occurrence, beat stepping the regex
+    # engine through every character
+    single_pass_chars = 1_000
+
+    def __init__(self, tables: Mapping[str, Mapping[Any, Sequence[str]]]):
+        self.tables: Dict[str, List[tuple]] = {}
+        keyword_ids: Dict[str, int] = {}
+
+        for table_name, groups in tables.items():
+            compiled_groups = []
+            for label, keywords in groups.items():
+                ids = []
+                for keyword in keywords:
+                    keyword = keyword.lower()
+                    if keyword not in keyword_ids:
+                        keyword_ids[keyword] = len(keyword_ids)
+                    ids.append(keyword_ids[keyword])
+                compiled_groups.append((label, tuple(ids)))
+            self.tables[table_name] = compiled_groups
+
+        self.keyword_ids = keyword_ids
+        self.keywords: tuple = tuple(keyword_ids)
+        self.pattern = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+        # Substring links between keywords
+        self.contains: List[tuple] = []
+        for keyword in self.keywords:
+            self.contains.append(tuple(
+                other_id for other_id, other in enumerate(self.keywords)
+                if other != keyword and other in keyword
+            ))
+
+        # (keyword id, offset) of keywords that can start inside a regex match
+        # and run past its end; the regex resumes after each match, so these
+        # are checked at the match's position
+        self.straddles: List[tuple] = []
+        for keyword in self.keywords:
+            self.straddles.append(tuple(
+                (other_id, start)
+                for start in range(1, len(keyword))
+                for other_id, other in enumerate(self.keywords)
+                if other not in keyword and other.startswith(keyword[start:])
+            ))
+
+    def scan(self, text: str) -> "KeywordScan":
+        """Scan ``text``: in one regex pass if it is short, otherwise lazily."""
+        scan = KeywordScan(self, text.lower())
+        if self.pattern is not None and len(scan.text) <= self.single_pass_chars:
+            scan.found = self._single_pass(scan.text)
+        return scan
+
+    def _single_pass(self, text_lower: str) -> set:
+        """Ids of every keyword in the text, from one regex pass over it."""
+        matched = set()
+        for match in self.pattern.finditer(text_lower):
+            keyword_id = self.keyword_ids[match.group()]
+            matched.add(keyword_id)
+            start = match.start()
+            for other, offset in self.straddles[keyword_id]:
+                if text_lower.startswith(self.keywords[other], start + offset):
+                    matched.add(other)
+        found = set(matched)
+        for keyword_id in matched:
+            found.update(self.contains[keyword_id])
+        return found
+
+    def from_hits(self, hits: Iterable[str]) -> "KeywordScan":
+        """Build a fully resolved scan from an already known set of keywords."""
+        scan = KeywordScan(self, None)
+        scan.found = {self.keyword_ids[keyword] for keyword in hits if keyword in self.keyword_ids}
+        return scan
+
+
+class KeywordScan:
+    """Result of matching one transcript against a ``KeywordMatcher``."""
+
+    def __init__(self, matcher: KeywordMatcher, text_lower: Optional[str]):
+        self.matcher = matcher
+        self.text = text_lower
+        # None = not resolved yet, True = present, False = absent
+        self.state: List[Optional[bool]] = [None] * len(matcher.keywords)
+        # Ids of the keywords present, once every keyword is resolved
+        self.found: Optional[set] = None
+
+    def has(self, keyword_id: int) -> bool:
+        """Resolve a single keyword, using substring links before scanning."""
+        if self.found is not None:
+            return keyword_id in self.found
+        found = self.state[keyword_id]
+        if found is not None:
+            return found
+
+        matcher = self.matcher
+        state = self.state
+        for other in matcher.contains[keyword_id]:
+            if state[other] is False:
+                # A shorter keyword inside this one is missing, so this one is too
+                found = False
+                break
+        else:
+            found = self.text is not None and matcher.keywords[keyword_id] in self.text
+
+        state[keyword_id] = found
+        if found:
+            for other in matcher.contains[keyword_id]:
+                state[other] = True
+        return found
+
+    def _group_hit(self, keyword_ids: tuple) -> bool:
+        if self.found is not None:
+            return not self.found.isdisjoint(keyword_ids)
+        return any(map(self.has, keyword_ids))
+
+    def first_match(self, table: str, default: Any = None) -> Any:
+        """Return the label of the first group in ``table`` with a hit."""
+        for label, keyword_ids in self.matcher.tables[table]:
+            if self._group_hit(keyword_ids):
+                return label
+        return default
+
+    def any_match(self, table: str) -> bool:
+        """Return True if any keyword of ``table`` occurs in the transcript."""
+        return self.first_match(table) is not None
+
+    def all_matches(self, table: str) -> List[Any]:
+        """Return the labels of every group in ``table`` with a hit, in table order."""
+        return [
+            label for label, keyword_ids in self.matcher.tables[table]
+            if self._group_hit(keyword_ids)
+        ]
+
+    def hits(self) -> FrozenSet[str]:
+        """Resolve every keyword and return the ones present in the transcript."""
+        if self.found is not None:
+            return frozenset(self.matcher.keywords[keyword_id] for keyword_id in self.found)
+        return frozenset(
+            keyword for keyword_id, keyword in enumerate(self.matcher.keywords)
+            if self.has(keyword_id)
+        )
@@ -1,6 +1,7 @@
 from typing import Dict, List, Any
-import json
-from langchain.tools import BaseTool
+from .tool_base import BaseTool
+from ..serialization import dumps
+from ..telemetry import TELEMETRY, SERIALIZATION, TOOL, VALIDATION
 from pydantic import BaseModel, Field
 from ..models.customer_profile import CustomerProfile, PlanComparison, Priority
 
@@ -28,31 +29,37 @@ class PitchGenerator(BaseTool):
     description: str = "Generates personalized sales pitches based on customer profile and plan comparison"
     args_schema = PitchGeneratorInput
     
+    @TELEMETRY.traced(TOOL, "pitch_generator._run")
     def _run(self, customer_profile: Dict, plan_comparison: Dict, sales_context: str = "") -> str:
         """Generate a personalized sales pitch for the customer."""
         try:
             # Parse inputs
-            customer = CustomerProfile(**customer_profile)
-            comparison = PlanComparison(**plan_comparison)
+            with TELEMETRY.span(VALIDATION, "pitch_generator"):
+                customer = CustomerProfile(**customer_profile)
+                comparison = PlanComparison(**plan_comparison)
             
-            # Generate pitch components
-            pitch = PitchResult(
-                opening_hook=self._generate_opening_hook(customer, comparison),
-                pain_point_address=self._address_pain_points(customer, comparison),
-                value_proposition=self._create_value_proposition(customer, comparison),
-                feature_highlights=self._highlight_key_features(customer, comparison),
-                cost_benefit_analysis=self._explain_cost_benefits(customer, comparison),
-                objection_handling=self._prepare_objection_handling(customer, comparison),
-                call_to_action=self._create_call_to_action(customer, comparison),
-                urgency_factors=self._identify_urgency_factors(customer, comparison),
-                personalization_notes=self._add_personal_touches(customer, comparison)
-            )
+            pitch = self.generate(customer, comparison, sales_context)
             
-            return json.dumps(pitch.dict(), indent=2)
+            with TELEMETRY.span(SERIALIZATION, "pitch_generator"):
+                return dumps(pitch)
             
         except Exception as e:
             return f"Error generating pitch: {str(e)}"
     
+    def generate(self, customer: CustomerProfile, comparison: PlanComparison, sales_context: str = "") -> PitchResult:
+        """Generate the pitch from already validated models without serializing it."""
+        return PitchResult(
+            opening_hook=self._generate_opening_hook(customer, comparison),
+            pain_point_address=self._address_pain_points(customer, comparison),
+            value_proposition=self._create_value_proposition(customer, comparison),
+            feature_highlights=self._highlight_key_features(customer, comparison),
+            cost_benefit_analysis=self._explain_cost_benefits(customer, comparison),
+            objection_handling=self._prepare_objection_handling(customer, comparison),
+            call_to_action=self._create_call_to_action(customer, comparison),
+            urgency_factors=self._identify_urgency_factors(customer, comparison),
+            personalization_notes=self._add_personal_touches(customer, comparison)
+        )
+    
     def _generate_opening_hook(self, customer: CustomerProfile, comparison: PlanComparison) -> str:
         """Generate attention-grabbing opening based on customer's top priorities."""
         
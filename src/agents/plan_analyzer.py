@@ -1,8 +1,11 @@
-from typing import Dict, List, Any
-import json
-from langchain.tools import BaseTool
+from typing import Dict, List, Any, NamedTuple, Union
+from .tool_base import BaseTool
+from ..serialization import dumps
+from ..telemetry import TELEMETRY, SERIALIZATION, TOOL, VALIDATION
 from pydantic import BaseModel, Field
 from ..models.customer_profile import CustomerProfile, TelecomPlan, PlanComparison, Priority
+from ..models.plan_record import PlanRecord, UNLIMITED, normalize_allowance
+from .plan_pair_cache import PlanPairDiff, PLAN_PAIR_CACHE
 
 
 class PlanAnalyzerInput(BaseModel):
@@ -11,71 +14,152 @@ class PlanAnalyzerInput(BaseModel):
     customer_profile: Dict[str, Any] = Field(description="Customer profile information")
 
 
+class PlanPair(NamedTuple):
+    """Normalized plan pair with its customer-independent diff (see PlanAnalyzer.analyze_pair)"""
+    current: PlanRecord
+    target: PlanRecord
+    diff: PlanPairDiff
+
+
 class PlanAnalyzer(BaseTool):
     name: str = "plan_analyzer"
     description: str = "Analyzes and compares telecom plans to determine suitability for a customer"
     args_schema = PlanAnalyzerInput
     
+    @TELEMETRY.traced(TOOL, "plan_analyzer._run")
     def _run(self, current_plan: Dict, target_plan: Dict, customer_profile: Dict) -> str:
         """Compare current and target plans for a specific customer."""
         try:
             # Parse inputs
-            current = TelecomPlan(**current_plan)
-            target = TelecomPlan(**target_plan)
-            customer = CustomerProfile(**customer_profile)
-            
-            # Calculate cost differences
-            monthly_savings = current.price - target.price
-            annual_savings = monthly_savings * 12
-            
-            # Apply promotional discount if applicable
-            if target.promotional_discount and target.promotional_duration:
-                promotional_savings = target.price * (target.promotional_discount / 100)
-                effective_target_price = target.price - promotional_savings
-                monthly_savings = current.price - effective_target_price
-            
-            # Compare data allowances
-            data_diff = self._compare_data(current.data_allowance, target.data_allowance)
-            
-            # Compare voice minutes
-            voice_diff = self._compare_voice(current.voice_minutes, target.voice_minutes)
-            
-            # Identify feature improvements
-            feature_improvements = self._identify_improvements(current, target, customer)
+            with TELEMETRY.span(VALIDATION, "plan_analyzer"):
+                current = TelecomPlan(**current_plan)
+                target = TelecomPlan(**target_plan)
+                customer = CustomerProfile(**customer_profile)
             
-            # Identify potential drawbacks
-            drawbacks = self._identify_drawbacks(current, target, customer)
+            comparison = self.compare(current, target, customer)
             
-            # Calculate suitability score
-            suitability = self._calculate_suitability(current, target, customer)
-            
-            comparison = PlanComparison(
-                current_plan=current,
-                target_plan=target,
-                monthly_savings=monthly_savings,
-                annual_savings=annual_savings,
-                data_difference=data_diff,
-                voice_difference=voice_diff,
-                feature_improvements=feature_improvements,
-                potential_drawbacks=drawbacks,
-                suitability_score=suitability
-            )
-            
-            return json.dumps(comparison.dict(), indent=2, default=str)
+            with TELEMETRY.span(SERIALIZATION, "plan_analyzer"):
+                return dumps(comparison)
             
         except Exception as e:
             return f"Error analyzing plans: {str(e)}"
     
+    def compare(self, current: Union[TelecomPlan, PlanRecord], target: Union[TelecomPlan, PlanRecord],
+                customer: CustomerProfile) -> PlanComparison:
+        """Compare already validated plans for an already validated customer profile."""
+        return self.compare_pair(self.analyze_pair(current, target), customer)
+    
+    def analyze_pair(self, current: Union[TelecomPlan, PlanRecord], target: Union[TelecomPlan, PlanRecord]) -> PlanPair:
+        """The plan-only part of a comparison; needs no customer, so it can run alongside profiling."""
+        # Normalize once; catalog plans usually arrive as prebuilt records
+        current = PlanRecord.of(current)
+        target = PlanRecord.of(target)
+        
+        # Customer-independent differences, computed once per plan pair
+        return PlanPair(current, target, self._plan_pair_diff(current, target))
+    
+    def compare_pair(self, pair: PlanPair, customer: CustomerProfile) -> PlanComparison:
+        """Finish a comparison from an analyzed plan pair with the customer-dependent rules."""
+        current, target, diff = pair
+        
+        # Identify feature improvements
+        feature_improvements = self._identify_improvements(current, target, customer, diff)
+        
+        # Identify potential drawbacks
+        drawbacks = self._identify_drawbacks(current, target, customer, diff)
+        
+        # Calculate suitability score
+        suitability = self._calculate_suitability(current, target, customer)
+        
+        return PlanComparison(
+            current_plan=current.plan,
+            target_plan=target.plan,
+            monthly_savings=diff.monthly_savings,
+            annual_savings=diff.annual_savings,
+            data_difference=diff.data_difference,
+            voice_difference=diff.voice_difference,
+            feature_improvements=feature_improvements,
+            potential_drawbacks=drawbacks,
+            suitability_score=suitability
+        )
+    
+    def _plan_pair_diff(self, current: PlanRecord, target: PlanRecord) -> PlanPairDiff:
+        """Look up (or compute and cache) the customer-independent diff of a plan pair."""
+        return PLAN_PAIR_CACHE.get_or_compute(current, target, self._compute_plan_pair_diff)
+    
+    def _compute_plan_pair_diff(self, current: PlanRecord, target: PlanRecord) -> PlanPairDiff:
+        """Compute everything about a plan pair that does not depend on the customer."""
+        # Calculate cost differences
+        monthly_savings = current.price - target.price
+        annual_savings = monthly_savings * 12
+        
+        # Apply promotional discount if applicable
+        if target.promotional_discount and target.promotional_duration:
+            promotional_savings = target.price * (target.promotional_discount / 100)
+            effective_target_price = target.price - promotional_savings
+            monthly_savings = current.price - effective_target_price
+        
+        plan_improvements = []
+        
+        # Check roaming features
+        if not current.roaming_included and target.roaming_included:
+            plan_improvements.append("Roaming services now included")
+        
+        # Check hotspot data
+        if not current.hotspot_gb and target.hotspot_gb:
+            plan_improvements.append(f"Mobile hotspot with {target.hotspot_gb}GB included")
+        elif current.hotspot_gb and target.hotspot_gb > current.hotspot_gb:
+            plan_improvements.append(f"Increased hotspot data ({current.hotspot_gb}GB → {target.hotspot_gb}GB)")
+        
+        # Check additional features (bitset difference)
+        feature_improvements = [f"New feature: {feature}" for feature in target.features_not_in(current)]
+        
+        # Check promotional offers
+        if target.promotional_discount:
+            feature_improvements.append(f"{target.promotional_discount}% discount for {target.promotional_duration} months")
+        
+        plan_drawbacks = []
+        
+        # Check for feature downgrades
+        if current.international_included and not target.international_included:
+            plan_drawbacks.append("Loss of included international calling")
+        
+        if current.roaming_included and not target.roaming_included:
+            plan_drawbacks.append("Loss of included roaming services")
+        
+        if current.hotspot_gb and target.hotspot_gb and target.hotspot_gb < current.hotspot_gb:
+            plan_drawbacks.append(f"Reduced hotspot data ({current.hotspot_gb}GB → {target.hotspot_gb}GB)")
+        
+        return PlanPairDiff(
+            monthly_savings=monthly_savings,
+            annual_savings=annual_savings,
+            data_difference=self._compare_data(current.data_gb, target.data_gb),
+            voice_difference=self._compare_voice(current.voice_minutes, target.voice_minutes),
+            international_added=not current.international_included and target.international_included,
+            plan_improvements=tuple(plan_improvements),
+            network_upgrade=current.network_priority == "standard" and target.network_priority == "premium",
+            feature_improvements=tuple(feature_improvements),
+            plan_drawbacks=tuple(plan_drawbacks),
+            longer_contract=(
+                f"Longer contract commitment ({current.contract_length} → {target.contract_length} months)"
+                if target.contract_length > current.contract_length else None
+            ),
+            setup_fee_drawback=f"Setup fee of ${target.setup_fee}" if target.setup_fee > current.setup_fee else None
+        )
+    
     def _compare_data(self, current_data, target_data) -> str:
         """Compare data allowances between plans."""
-        if current_data == "unlimited" and target_data == "unlimited":
+        current_data = normalize_allowance(current_data, float)
+        target_data = normalize_allowance(target_data, float)
+        
+        if current_data == UNLIMITED and target_data == UNLIMITED:
             return "Both plans offer unlimited data"
-        elif current_data == "unlimited":
+        elif current_data == UNLIMITED:
             return f"Downgrade from unlimited to {target_data}GB"
-        elif target_data == "unlimited":
+        elif target_data == UNLIMITED:
             return f"Upgrade from {current_data}GB to unlimited data"
         else:
-            diff = float(target_data) - float(current_data)
+            diff = target_data - current_data
             if diff > 0:
                 return f"Increase of {diff}GB data ({current_data}GB → {target_data}GB)"
             elif diff < 0:
@@ -85,14 +169,17 @@ class PlanAnalyzer(BaseTool):
     
     def _compare_voice(self, current_voice, target_voice) -> str:
         """Compare voice minutes between plans."""
-        if current_voice == "unlimited" and target_voice == "unlimited":
+        current_voice = normalize_allowance(current_voice, int)
+        target_voice = normalize_allowance(target_voice, int)
+        
+        if current_voice == UNLIMITED and target_voice == UNLIMITED:
             return "Both plans offer unlimited voice minutes"
-        elif current_voice == "unlimited":
+        elif current_voice == UNLIMITED:
             return f"Downgrade from unlimited to {target_voice} minutes"
-        elif target_voice == "unlimited":
+        elif target_voice == UNLIMITED:
             return f"Upgrade from {current_voice} to unlimited voice minutes"
         else:
-            diff = int(target_voice) - int(current_voice)
+            diff = target_voice - current_voice
             if diff > 0:
                 return f"Increase of {diff} voice minutes ({current_voice} → {target_voice})"
             elif diff < 0:
@@ -100,119 +187,101 @@ class PlanAnalyzer(BaseTool):
             else:
                 return "Same voice minutes allowance"
     
-    def _identify_improvements(self, current: TelecomPlan, target: TelecomPlan, customer: CustomerProfile) -> List[str]:
+    def _identify_improvements(self, current: PlanRecord, target: PlanRecord, customer: CustomerProfile,
+                               diff: PlanPairDiff = None) -> List[str]:
         """Identify feature improvements in the target plan."""
+        diff = diff or self._plan_pair_diff(PlanRecord.of(current), PlanRecord.of(target))
         improvements = []
         
         # Check international features
-        if not current.international_included and target.international_included:
+        if diff.international_added:
             if customer.needs.international_needs in [Priority.MEDIUM, Priority.HIGH, Priority.CRITICAL]:
                 improvements.append("International calling now included")
         
-        # Check roaming features
-        if not current.roaming_included and target.roaming_included:
-            improvements.append("Roaming services now included")
-        
-        # Check hotspot data
-        if (not current.hotspot_data or current.hotspot_data == 0) and target.hotspot_data:
-            improvements.append(f"Mobile hotspot with {target.hotspot_data}GB included")
-        elif current.hotspot_data and target.hotspot_data and target.hotspot_data > current.hotspot_data:
-            improvements.append(f"Increased hotspot data ({current.hotspot_data}GB → {target.hotspot_data}GB)")
+        # Roaming and hotspot changes
+        improvements.extend(diff.plan_improvements)
         
         # Check network priority
-        if current.network_priority == "standard" and target.network_priority == "premium":
+        if diff.network_upgrade:
             if customer.needs.network_quality in [Priority.HIGH, Priority.CRITICAL]:
                 improvements.append("Premium network priority for faster speeds")
         
-        # Check additional features
-        current_features = set(current.features)
-        target_features = set(target.features)
-        new_features = target_features - current_features
-        for feature in new_features:
-            improvements.append(f"New feature: {feature}")
-        
-        # Check promotional offers
-        if target.promotional_discount:
-            improvements.append(f"{target.promotional_discount}% discount for {target.promotional_duration} months")
+        # New features and promotional offers
+        improvements.extend(diff.feature_improvements)
         
         return improvements
     
-    def _identify_drawbacks(self, current: TelecomPlan, target: TelecomPlan, customer: CustomerProfile) -> List[str]:
+    def _identify_drawbacks(self, current: PlanRecord, target: PlanRecord, customer: CustomerProfile,
+                            diff: PlanPairDiff = None) -> List[str]:
         """Identify potential drawbacks in the target plan."""
-        drawbacks = []
+        diff = diff or self._plan_pair_diff(PlanRecord.of(current), PlanRecord.of(target))
         
-        # Check for feature downgrades
-        if current.international_included and not target.international_included:
-            drawbacks.append("Loss of included international calling")
-        
-        if current.roaming_included and not target.roaming_included:
-            drawbacks.append("Loss of included roaming services")
-        
-        if current.hotspot_data and target.hotspot_data and target.hotspot_data < current.hotspot_data:
-            drawbacks.append(f"Reduced hotspot data ({current.hotspot_data}GB → {target.hotspot_data}GB)")
+        # Feature downgrades
+        drawbacks = list(diff.plan_drawbacks)
         
         # Check contract length
-        if target.contract_length > current.contract_length:
+        if diff.longer_contract:
             if customer.needs.flexibility in [Priority.HIGH, Priority.CRITICAL]:
-                drawbacks.append(f"Longer contract commitment ({current.contract_length} → {target.contract_length} months)")
+                drawbacks.append(diff.longer_contract)
         
         # Check setup fees
-        if target.setup_fee > current.setup_fee:
-            drawbacks.append(f"Setup fee of ${target.setup_fee}")
+        if diff.setup_fee_drawback:
+            drawbacks.append(diff.setup_fee_drawback)
         
         return drawbacks
     
-    def _calculate_suitability(self, current: TelecomPlan, target: TelecomPlan, customer: CustomerProfile) -> float:
+    def _calculate_suitability(self, current: PlanRecord, target: PlanRecord, customer: CustomerProfile) -> float:
         """Calculate how suitable the target plan is for the customer (1-10 scale)."""
+        current = PlanRecord.of(current)
+        target = PlanRecord.of(target)
+        needs = customer.needs
+        usage = customer.usage_data
         score = 5.0  # Base score
         
         # Cost sensitivity evaluation
         monthly_savings = current.price - target.price
-        if customer.needs.cost_sensitivity == Priority.CRITICAL:
+        if needs.cost_sensitivity == Priority.CRITICAL:
             if monthly_savings > 0:
                 score += min(2.0, monthly_savings / 10)  # Up to 2 points for savings
             else:
                 score -= min(2.0, abs(monthly_savings) / 10)  # Deduct for higher cost
-        elif customer.needs.cost_sensitivity == Priority.HIGH:
+        elif needs.cost_sensitivity == Priority.HIGH:
             if monthly_savings > 0:
                 score += min(1.5, monthly_savings / 15)
             else:
                 score -= min(1.5, abs(monthly_savings) / 15)
         
         # Data needs evaluation
-        if customer.needs.data_priority in [Priority.HIGH, Priority.CRITICAL]:
-            current_data = 0 if current.data_allowance == "unlimited" else float(current.data_allowance) if current.data_allowance != "unlimited" else 1000
-            target_data = 0 if target.data_allowance == "unlimited" else float(target.data_allowance) if target.data_allowance != "unlimited" else 1000
-            
-            if target.data_allowance == "unlimited":
+        if needs.data_priority in [Priority.HIGH, Priority.CRITICAL]:
+            if target.data_gb == UNLIMITED:
                 score += 1.5
-            elif isinstance(target.data_allowance, (int, float)) and customer.usage_data.data_usage_gb <= target.data_allowance:
+            elif usage.data_usage_gb <= target.data_gb:
                 score += 1.0
-            elif isinstance(target.data_allowance, (int, float)) and customer.usage_data.data_usage_gb > target.data_allowance:
+            elif usage.data_usage_gb > target.data_gb:
                 score -= 1.5
         
         # Voice needs evaluation
-        if customer.needs.voice_priority in [Priority.HIGH, Priority.CRITICAL]:
-            if target.voice_minutes == "unlimited":
+        if needs.voice_priority in [Priority.HIGH, Priority.CRITICAL]:
+            if target.voice_minutes == UNLIMITED:
                 score += 1.0
-            elif isinstance(target.voice_minutes, int) and customer.usage_data.voice_minutes <= target.voice_minutes:
+            elif usage.voice_minutes <= target.voice_minutes:
                 score += 0.5
-            elif isinstance(target.voice_minutes, int) and customer.usage_data.voice_minutes > target.voice_minutes:
+            elif usage.voice_minutes > target.voice_minutes:
                 score -= 1.0
         
         # International needs
-        if customer.needs.international_needs in [Priority.HIGH, Priority.CRITICAL]:
+        if needs.international_needs in [Priority.HIGH, Priority.CRITICAL]:
             if target.international_included:
                 score += 1.0
             else:
                 score -= 0.5
         
         # Network quality
-        if customer.needs.network_quality in [Priority.HIGH, Priority.CRITICAL]:
+        if needs.network_quality in [Priority.HIGH, Priority.CRITICAL]:
             if target.network_priority == "premium":
                 score += 1.0
             elif target.network_priority == "standard":
                 score -= 0.5
         
         # Ensure score is within 1-10 range
-        return max(1.0, min(10.0, score))
\ No newline at end of file
+        return max(1.0, min(10.0, score))
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from ..models.plan_record import PlanRecord
+
+
+class PlanPairDiff(NamedTuple):
+    """
+    The customer-independent part of comparing two plans.
+
+    Items that depend on the customer's needs (international calling, network
+    priority and contract length) are stored as flags/text and only included
+    by PlanAnalyzer when the customer's priorities call for them.
+    """
+    monthly_savings: float
+    annual_savings: float
+    data_difference: str
+    voice_difference: str
+    international_added: bool
+    plan_improvements: Tuple[str, ...]
+    network_upgrade: bool
+    feature_improvements: Tuple[str, ...]
+    plan_drawbacks: Tuple[str, ...]
+    longer_contract: Optional[str]
+    setup_fee_drawback: Optional[str]
+
+
+class PlanPairCache:
+    """
+    Bounded, thread-safe LRU cache of PlanPairDiffs.
+
+    Keys are the content fingerprints of the (current, target) plans, so an
+    edited plan never hits a stale entry; invalidate() additionally evicts
+    every entry involving a plan as soon as it changes.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], PlanPairDiff]" = OrderedDict()
+        self._plan_ids: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, current: PlanRecord, target: PlanRecord,
+                       compute: Callable[[PlanRecord, PlanRecord], PlanPairDiff]) -> PlanPairDiff:
+        """Return the cached diff for a plan pair, computing it on a miss."""
+        key = (current.fingerprint, target.fingerprint)
+        with self._lock:
+            diff = self._entries.get(key)
+            if diff is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return diff
+            self.misses += 1
+
+        # Computed outside the lock; a concurrent miss may compute the same diff twice
+        diff = compute(current, target)
+
+        with self._lock:
+            self._entries[key] = diff
+            self._entries.move_to_end(key)
+            self._plan_ids[key] = (current.plan_id, target.plan_id)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._plan_ids.pop(evicted, None)
+                self.evictions += 1
+        return diff
+
+    def invalidate(self, plan_id: str) -> int:
+        """Evict every cached pair involving `plan_id`; returns the number evicted."""
+        with self._lock:
+            stale = [key for key, ids in self._plan_ids.items() if plan_id in ids]
+            for key in stale:
+                self._entries.pop(key, None)
+                del self._plan_ids[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._plan_ids.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache used by PlanAnalyzer
+PLAN_PAIR_CACHE = PlanPairCache()
@@ -0,0 +1,165 @@
+from typing import Any, Dict, List, NamedTuple, Sequence, Union
+
+import numpy as np
+
+from ..models.customer_profile import CustomerProfile, TelecomPlan, PlanComparison, Priority
+from ..models.catalog_snapshot import CatalogSnapshot
+from ..models.plan_record import PlanCatalog, PlanRecord, UNLIMITED
+from .plan_analyzer import PlanAnalyzer
+from .tool_registry import TOOL_REGISTRY
+
+
+_HIGH_PRIORITIES = (Priority.HIGH, Priority.CRITICAL)
+
+
+class PlanRecommendation(NamedTuple):
+    """One recommended plan with its full comparison against the current plan."""
+    plan: TelecomPlan
+    comparison: PlanComparison
+    suitability_score: float
+
+
+class PlanRecommender:
+    """
+    Scores customers against a whole plan catalog and returns the top-k plans.
+
+    Plan-side features come from the catalog's normalized PlanRecord columns, and
+    PlanAnalyzer._calculate_suitability is evaluated as a customers x plans
+    matrix with the same arithmetic (and the same order of operations) as the
+    scalar rules, so scores are identical. Full PlanComparison objects are
+    only built for the plans that make it into the top-k.
+
+    The catalog may also be a memory-mapped CatalogSnapshot; scoring then
+    reads its shared columns and only the top-k plans are ever decoded.
+    """
+
+    def __init__(self, catalog: Union[PlanCatalog, CatalogSnapshot, Sequence[Union[TelecomPlan, Dict[str, Any]]]],
+                 analyzer: PlanAnalyzer = None):
+        self.catalog = catalog if isinstance(catalog, (PlanCatalog, CatalogSnapshot)) else PlanCatalog(catalog)
+        if not len(self.catalog):
+            raise ValueError("Plan catalog is empty")
+        self.analyzer = analyzer or TOOL_REGISTRY.analyzer
+
+        self.plan_ids = np.array(self.catalog.plan_ids, dtype=object)
+
+        # Numeric columns are shared with the catalog's typed arrays (no copy)
+        self.price = np.frombuffer(self.catalog.price, dtype=np.float64)
+        self.data_gb = np.frombuffer(self.catalog.data_gb, dtype=np.float64)
+        self.voice_minutes = np.frombuffer(self.catalog.voice_minutes, dtype=np.float64)
+        self.international = np.frombuffer(self.catalog.international_included, dtype=np.int8).astype(bool)
+        self.network_delta = np.array([
+            1.0 if network_priority == "premium" else -0.5 if network_priority == "standard" else 0.0
+            for network_priority in self.catalog.network_priority
+        ], dtype=np.float64)
+
+    @property
+    def plans(self) -> List[TelecomPlan]:
+        """The catalog's plans, in catalog order."""
+        return list(self.catalog.plans)
+
+    def score_matrix(self, customers: Sequence[CustomerProfile], current_plans: Sequence[Union[TelecomPlan, PlanRecord]]) -> np.ndarray:
+        """
+        Suitability of every catalog plan for every customer.
+
+        Args:
+            customers: Customer profiles
+            current_plans: Each customer's current plan (same length as customers)
+
+        Returns:
+            Array of shape (len(customers), len(catalog)) with 1-10 scores
+        """
+        if len(customers) != len(current_plans):
+            raise ValueError(f"Got {len(customers)} customers but {len(current_plans)} current plans")
+
+        current_price = np.array([plan.price for plan in current_plans], dtype=np.float64)[:, None]
+        cost_critical = np.array([c.needs.cost_sensitivity == Priority.CRITICAL for c in customers])[:, None]
+        cost_high = np.array([c.needs.cost_sensitivity == Priority.HIGH for c in customers])[:, None]
+        data_high = np.array([c.needs.data_priority in _HIGH_PRIORITIES for c in customers])[:, None]
+        voice_high = np.array([c.needs.voice_priority in _HIGH_PRIORITIES for c in customers])[:, None]
+        international_high = np.array([c.needs.international_needs in _HIGH_PRIORITIES for c in customers])[:, None]
+        network_high = np.array([c.needs.network_quality in _HIGH_PRIORITIES for c in customers])[:, None]
+        data_usage = np.array([c.usage_data.data_usage_gb for c in customers], dtype=np.float64)[:, None]
+        voice_usage = np.array([c.usage_data.voice_minutes for c in customers], dtype=np.float64)[:, None]
+
+        score = np.full((len(customers), len(self.plan_ids)), 5.0)
+
+        # Cost sensitivity evaluation
+        monthly_savings = current_price - self.price[None, :]
+        saves = monthly_savings > 0
+        critical_delta = np.where(saves, np.minimum(2.0, monthly_savings / 10), -np.minimum(2.0, np.abs(monthly_savings) / 10))
+        high_delta = np.where(saves, np.minimum(1.5, monthly_savings / 15), -np.minimum(1.5, np.abs(monthly_savings) / 15))
+        score = score + np.where(cost_critical, critical_delta, np.where(cost_high, high_delta, 0.0))
+
+        # Data needs evaluation
+        data_delta = np.where(
+            self.data_gb == UNLIMITED, 1.5,
+            np.where(data_usage <= self.data_gb, 1.0,
+                     np.where(data_usage > self.data_gb, -1.5, 0.0))
+        )
+        score = score + np.where(data_high, data_delta, 0.0)
+
+        # Voice needs evaluation
+        voice_delta = np.where(
+            self.voice_minutes == UNLIMITED, 1.0,
+            np.where(voice_usage <= self.voice_minutes, 0.5,
+                     np.where(voice_usage > self.voice_minutes, -1.0, 0.0))
+        )
+        score = score + np.where(voice_high, voice_delta, 0.0)
+
+        # International needs
+        score = score + np.where(international_high, np.where(self.international, 1.0, -0.5), 0.0)
+
+        # Network quality
+        score = score + np.where(network_high, self.network_delta, 0.0)
+
+        # Ensure score is within 1-10 range
+        return np.clip(score, 1.0, 10.0)
+
+    def top_k_indices(self, scores: np.ndarray, k: int, exclude_plan_ids: Sequence[str] = None) -> np.ndarray:
+        """Catalog indices of the k best plans per row, best first; ties keep catalog order."""
+        scores = np.array(scores, dtype=np.float64, copy=True)
+        if exclude_plan_ids is not None:
+            excluded = np.array(exclude_plan_ids, dtype=object)[:, None] == self.plan_ids[None, :]
+            scores[excluded] = -np.inf
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        return order
+
+    def recommend_batch(self, customers: Sequence[CustomerProfile], current_plans: Sequence[Union[TelecomPlan, PlanRecord]],
+                        k: int = 3, exclude_current: bool = True) -> List[List[PlanRecommendation]]:
+        """Top-k recommendations for many customers at once."""
+        scores = self.score_matrix(customers, current_plans)
+        exclude = [plan.plan_id for plan in current_plans] if exclude_current else None
+        top = self.top_k_indices(scores, k, exclude)
+
+        recommendations = []
+        for row, (customer, current_plan) in enumerate(zip(customers, current_plans)):
+            current_plan = PlanRecord.of(current_plan)
+            customer_recommendations = []
+            for index in top[row].tolist():
+                if exclude and self.plan_ids[index] == exclude[row]:
+                    continue
+                record = self.catalog[index]
+                comparison = self.analyzer.compare(current_plan, record, customer)
+                customer_recommendations.append(PlanRecommendation(record.plan, comparison, float(scores[row, index])))
+            recommendations.append(customer_recommendations)
+        return recommendations
+
+    def recommend(self, customer: Union[CustomerProfile, Dict[str, Any]], current_plan: Union[TelecomPlan, Dict[str, Any]],
+                  k: int = 3, exclude_current: bool = True) -> List[PlanRecommendation]:
+        """
+        Top-k plans of the catalog for a single customer.
+
+        Args:
+            customer: Customer profile (model or dict)
+            current_plan: The customer's current plan (model or dict)
+            k: Number of plans to return
+            exclude_current: Skip catalog plans with the same plan_id as the current plan
+
+        Returns:
+            Recommendations ordered from most to least suitable
+        """
+        if not isinstance(customer, CustomerProfile):
+            customer = CustomerProfile(**customer)
+        if not isinstance(current_plan, TelecomPlan):
+            current_plan = TelecomPlan(**current_plan)
+        return self.recommend_batch([customer], [current_plan], k, exclude_current)[0]
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from ..models.customer_profile import CustomerProfile, CustomerNeeds, CustomerSegment
+from .customer_profiler import CustomerProfiler, KEYWORD_MATCHER, NEEDS_TABLES
+from .keyword_matcher import KeywordMatcher, KeywordScan
+from .tool_registry import TOOL_REGISTRY
+
+
+class ProfileChangeEvent(NamedTuple):
+    """A profile field whose value changed after a transcript chunk."""
+    field: str
+    old_value: Any
+    new_value: Any
+
+
+class StreamingProfilerSession:
+    """
+    Incremental customer profiling for a live call.
+
+    Feed transcript chunks as they arrive. Each chunk is matched only against
+    the keywords not seen yet, plus a short tail of the previous text so that
+    keywords split across chunk boundaries are still found. The work per
+    chunk therefore depends on the chunk size, not on the length of the call.
+    Needs, segment and pain points are re-derived only when a new keyword
+    appears, and a change event is emitted only when a value actually changes.
+
+    The results always equal what CustomerProfiler would produce for the
+    concatenation of all chunks fed so far.
+    """
+
+    def __init__(self, usage_data: Dict[str, Any] = None, existing_profile: Dict[str, Any] = None,
+                 profiler: CustomerProfiler = None, matcher: KeywordMatcher = KEYWORD_MATCHER):
+        self.usage_data = usage_data or {}
+        self.existing_profile = existing_profile or {}
+        self.profiler = profiler or TOOL_REGISTRY.profiler
+        self.matcher = matcher
+
+        # Enough trailing context to complete any keyword started in an earlier chunk
+        self._tail_length = max((len(keyword) for keyword in matcher.keywords), default=1) - 1
+        self._tail = ""
+        self._pending = set(range(len(matcher.keywords)))
+        self._hits: Set[str] = set()
+        self.transcript_length = 0
+
+        scan = matcher.from_hits(())
+        self.needs: CustomerNeeds = self.profiler._extract_needs_from_conversation("", scan)
+        self.segment: CustomerSegment = self.profiler._determine_customer_segment("", self.usage_data, scan)
+        self.pain_points: List[str] = self.profiler._extract_pain_points("", scan)
+
+    def feed(self, chunk: str) -> List[ProfileChangeEvent]:
+        """Add a transcript chunk and return the profile changes it caused."""
+        if not chunk:
+            return []
+
+        window = self._tail + chunk.lower()
+        self.transcript_length += len(chunk)
+        self._tail = window[-self._tail_length:] if self._tail_length else ""
+
+        # Only keywords that have not been seen yet need to be looked for
+        window_scan = KeywordScan(self.matcher, window)
+        new_hits = [keyword_id for keyword_id in self._pending if window_scan.has(keyword_id)]
+        if not new_hits:
+            return []
+
+        for keyword_id in new_hits:
+            self._pending.discard(keyword_id)
+            self._hits.add(self.matcher.keywords[keyword_id])
+
+        return self._refresh()
+
+    def _refresh(self) -> List[ProfileChangeEvent]:
+        """Re-derive needs, segment and pain points from the keywords seen so far."""
+        scan = self.matcher.from_hits(self._hits)
+        needs = self.profiler._extract_needs_from_conversation("", scan)
+        segment = self.profiler._determine_customer_segment("", self.usage_data, scan)
+        pain_points = self.profiler._extract_pain_points("", scan)
+
+        events = []
+        for field in NEEDS_TABLES:
+            old_value, new_value = getattr(self.needs, field), getattr(needs, field)
+            if old_value != new_value:
+                events.append(ProfileChangeEvent(f"needs.{field}", old_value, new_value))
+        if segment != self.segment:
+            events.append(ProfileChangeEvent("segment", self.segment, segment))
+        if pain_points != self.pain_points:
+            events.append(ProfileChangeEvent("pain_points", self.pain_points, pain_points))
+
+        self.needs, self.segment, self.pain_points = needs, segment, pain_points
+        return events
+
+    @property
+    def keyword_hits(self) -> Set[str]:
+        """Keywords heard so far in the call."""
+        return set(self._hits)
+
+    def profile(self, usage_data: Optional[Dict[str, Any]] = None) -> CustomerProfile:
+        """Build the full CustomerProfile from the transcript fed so far."""
+        usage_data = usage_data if usage_data is not None else self.usage_data
+        return self.profiler._build_profile(
+            usage_data,
+            self.existing_profile,
+            self.needs,
+            self.profiler._analyze_usage_pattern(usage_data),
+            self.segment,
+            self.pain_points
+        )
@@ -0,0 +1,31 @@
+from typing import Any, Dict, Union
+
+try:
+    from langchain.tools import BaseTool
+except ImportError:
+    class BaseTool:
+        """
+        Minimal stand-in for langchain's BaseTool on rules-only installs.
+
+        Supports what the deterministic engine needs: class-level name,
+        description and args_schema, keyword construction, and run/invoke
+        dispatching to `_run`.
+        """
+        name: str = ""
+        description: str = ""
+        args_schema = None
+
+        def __init__(self, **kwargs: Any):
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+        def run(self, tool_input: Union[str, Dict[str, Any]], **kwargs: Any) -> Any:
+            if isinstance(tool_input, str):
+                return self._run(tool_input)
+            return self._run(**tool_input)
+
+        def invoke(self, input: Union[str, Dict[str, Any]], config: Any = None, **kwargs: Any) -> Any:
+            return self.run(input)
+
+        def _run(self, *args: Any, **kwargs: Any) -> Any:
+            raise NotImplementedError
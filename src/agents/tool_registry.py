@@ -0,0 +1,59 @@
+from threading import Lock
+from typing import Dict, List, Type, TypeVar
+
+from .customer_profiler import CustomerProfiler
+from .plan_analyzer import PlanAnalyzer
+from .pitch_generator import PitchGenerator
+
+
+ToolT = TypeVar("ToolT")
+
+
+class ToolRegistry:
+    """
+    Process-wide, lazily created tool instances shared by all requests.
+    
+    Thread-safety contract: registered tools must be stateless after
+    construction. Their methods may only read `self` and work on their
+    arguments and locals, so one instance can serve any number of concurrent
+    requests. Shared mutable state they rely on must be guarded on its own,
+    as it is for the existing tools (PLAN_PAIR_CACHE and FEATURE_INDEX take
+    a lock; KEYWORD_MATCHER is read-only once built). Tools that need
+    per-request state (e.g. StreamingProfilerSession) are not registered
+    here and should be created per request instead.
+    """
+    
+    def __init__(self):
+        self._instances: Dict[type, object] = {}
+        self._lock = Lock()
+    
+    def get(self, tool_class: Type[ToolT]) -> ToolT:
+        """Shared instance of `tool_class`, created on first use"""
+        instance = self._instances.get(tool_class)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(tool_class)
+                if instance is None:
+                    instance = self._instances[tool_class] = tool_class()
+        return instance
+    
+    @property
+    def profiler(self) -> CustomerProfiler:
+        return self.get(CustomerProfiler)
+    
+    @property
+    def analyzer(self) -> PlanAnalyzer:
+        return self.get(PlanAnalyzer)
+    
+    @property
+    def pitch_generator(self) -> PitchGenerator:
+        return self.get(PitchGenerator)
+    
+    @property
+    def tools(self) -> List[object]:
+        """The workflow tools, in pipeline order"""
+        return [self.profiler, self.analyzer, self.pitch_generator]
+
+
+# Process-wide registry used by the workflow nodes
+TOOL_REGISTRY = ToolRegistry()
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from typing import Any, Dict, Optional
+
+from .sales_pipeline import SalesPipeline
+from .single_flight import request_key
+
+
+class AnalysisJob:
+    """
+    One customer analysis running in the background.
+
+    `result` is the latest partial result of SalesPipeline.stream_customer_sync
+    (None until the first step finishes), so a UI can poll it and show the
+    profile, comparison and pitch as they arrive.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.steps = 0
+        self._done = Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the job finishes; False if `timeout` passed first"""
+        return self._done.wait(timeout)
+
+
+class AnalysisJobs:
+    """
+    Runs analyses on a background thread pool, keyed by a hash of their inputs.
+
+    Submitting inputs that are already running or finished returns the
+    existing job, so identical requests (a rerun of the same form, or
+    several users with the same inputs) share one run and its result. The
+    `max_results` most recently used finished jobs are kept; failed jobs are
+    dropped so that resubmitting retries them.
+    """
+
+    def __init__(self, agent: SalesPipeline, max_workers: int = 4, max_results: int = 256):
+        self.agent = agent
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="analysis")
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = Lock()
+        self.submitted = 0
+        self.reused = 0
+
+    def submit(self, **request: Any) -> AnalysisJob:
+        """Start (or join) the analysis of stream_customer_sync(**request)"""
+        key = request_key(request)
+        with self._lock:
+            self.submitted += 1
+            job = self._jobs.get(key)
+            if job is not None:
+                self.reused += 1
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = AnalysisJob(key)
+            self._evict()
+        self._executor.submit(self._run, job, request)
+        return job
+
+    def _evict(self) -> None:
+        """Drop the least recently used finished jobs beyond max_results (running jobs stay)"""
+        excess = len(self._jobs) - self.max_results
+        for key in [key for key, job in self._jobs.items() if job.done][:max(0, excess)]:
+            del self._jobs[key]
+
+    def _run(self, job: AnalysisJob, request: Dict[str, Any]) -> None:
+        try:
+            for result in self.agent.stream_customer_sync(**request):
+                job.result = result
+                job.steps += 1
+        except Exception as e:
+            job.error = str(e)
+            with self._lock:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+        finally:
+            job._done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "submitted": self.submitted,
+            "reused": self.reused,
+            "running": sum(not job.done for job in jobs),
+            "finished": sum(job.done for job in jobs)
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
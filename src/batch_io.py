@@ -0,0 +1,380 @@
+"""
+Chunked file input and output for campaign-sized batches.
+
+Input files (CSV or Parquet) hold one customer per row:
+    customer_conversation           the customer's own words
+    current_plan.price, ...         nested fields as dotted columns, or
+    current_plan                    the whole object as a JSON string
+    target_plan.*, usage_data.*     same for the other process_customer arguments
+    existing_profile, target_plans, top_n, timeout (optional)
+Empty cells are left out, so model defaults apply. List-valued fields
+(e.g. `target_plan.features`) are JSON strings.
+
+Rows are read chunk by chunk, run through the agent's batch API and written
+out chunk by chunk, so memory depends on the chunk size and not the file size.
+"""
+
+import csv
+import itertools
+import os
+import threading
+import time
+from typing import IO, Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .langgraph_agent import TelecomSalesAgent
+from .serialization import loads
+
+
+Source = Union[str, os.PathLike, IO[bytes]]
+
+FORMATS = ("csv", "parquet")
+
+# Rows sent to a worker process per task
+PARALLEL_CHUNKSIZE = 64
+
+# Top-level item fields that may arrive as JSON strings
+JSON_FIELDS = ("current_plan", "target_plan", "usage_data", "existing_profile", "target_plans")
+
+# Leaf fields read as text from CSV, so ids like "0042" keep their form
+TEXT_FIELDS = {"customer_conversation", "plan_id", "name", "customer_id", "location", "network_priority"}
+
+# Columns of the output file, in order
+RESULT_COLUMNS = (
+    "row", "success", "error", "customer_id", "name", "segment", "usage_pattern", "target_plan_id",
+    "suitability_score", "monthly_savings", "annual_savings", "opening_hook", "value_proposition",
+    "cost_benefit_analysis", "call_to_action"
+)
+
+
+class BatchProgress(NamedTuple):
+    """Progress of a running batch file"""
+    rows: int
+    succeeded: int
+    failed: int
+    elapsed: float
+    fraction: Optional[float]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# Called after every row that completes the output in order
+BatchProgressCallback = Callable[[BatchProgress], None]
+
+
+def detect_format(name: str) -> str:
+    """File format from a file name's extension"""
+    extension = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    if extension in ("csv", "txt"):
+        return "csv"
+    raise ValueError(f"Unsupported batch file type: {name!r} (expected .csv or .parquet)")
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _parse_json(value: Any) -> Any:
+    """Decode JSON strings; anything else (or invalid JSON) is returned unchanged for validation to report"""
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def row_to_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one flat row into a batch item (process_customer arguments)"""
+    item: Dict[str, Any] = {}
+    for column, value in row.items():
+        if _is_missing(value):
+            continue
+        if hasattr(value, "item"):
+            # numpy scalar from pandas
+            value = value.item()
+        if "." in column:
+            field, leaf = column.split(".", 1)
+            nested = item.setdefault(field, {})
+            if isinstance(nested, dict):
+                nested[leaf] = _parse_json(value)
+        elif column in JSON_FIELDS:
+            parsed = _parse_json(value)
+            if isinstance(parsed, dict) and isinstance(item.get(column), dict):
+                parsed = {**parsed, **item[column]}
+            item[column] = parsed
+        else:
+            item[column] = value
+    return item
+
+
+def _file_size(handle: IO[bytes]) -> Optional[int]:
+    try:
+        position = handle.tell()
+        size = handle.seek(0, os.SEEK_END)
+        handle.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+def _read_csv_chunks(handle: IO[bytes], chunksize: int) -> Iterator[Tuple[List[Dict[str, Any]], Optional[float]]]:
+    """(rows, fraction of the file's bytes read) per chunk"""
+    import pandas as pd
+
+    size = _file_size(handle)
+    start = handle.tell()
+    columns = list(pd.read_csv(handle, nrows=0).columns)
+    handle.seek(start)
+    text_columns = {column: str for column in columns if column.rsplit(".", 1)[-1] in TEXT_FIELDS or column in JSON_FIELDS}
+    for frame in pd.read_csv(handle, chunksize=chunksize, dtype=text_columns):
+        yield frame.to_dict("records"), min(1.0, handle.tell() / size) if size else None
+
+
+def _read_parquet_chunks(handle: IO[bytes], chunksize: int) -> Iterator[Tuple[List[Dict[str, Any]], Optional[float]]]:
+    """(rows, fraction of the file's rows read) per chunk"""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(handle)
+    total, read = parquet.metadata.num_rows, 0
+    for batch in parquet.iter_batches(batch_size=chunksize):
+        read += batch.num_rows
+        yield batch.to_pylist(), read / total if total else None
+
+
+def read_items(source: Source, input_format: str = None, chunksize: int = 1000,
+               progress: Callable[[Optional[float]], None] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Read a batch file as lists of up to `chunksize` items
+
+    Args:
+        source: Path or binary file object
+        input_format: "csv" or "parquet"; detected from the file name if omitted
+        chunksize: Rows per chunk
+        progress: Called with the fraction of the file read (None if unknown) after each chunk
+    """
+    if input_format is None:
+        input_format = detect_format(getattr(source, "name", source))
+    if input_format not in FORMATS:
+        raise ValueError(f"Unsupported batch format: {input_format!r}")
+    reader = _read_parquet_chunks if input_format == "parquet" else _read_csv_chunks
+
+    handle = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        for rows, fraction in reader(handle, chunksize):
+            yield [row_to_item(row) for row in rows]
+            if progress:
+                progress(fraction)
+    finally:
+        if handle is not source:
+            handle.close()
+
+
+def result_row(row: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flat summary of one result for the output file"""
+    profile = result.get("customer_profile") or {}
+    comparison = result.get("plan_comparison") or {}
+    pitch = result.get("personalized_pitch") or {}
+    return {
+        "row": row,
+        "success": bool(result.get("success")),
+        "error": result.get("error", ""),
+        "customer_id": profile.get("customer_id"),
+        "name": profile.get("name"),
+        "segment": profile.get("segment"),
+        "usage_pattern": profile.get("usage_pattern"),
+        "target_plan_id": (comparison.get("target_plan") or {}).get("plan_id"),
+        "suitability_score": comparison.get("suitability_score"),
+        "monthly_savings": comparison.get("monthly_savings"),
+        "annual_savings": comparison.get("annual_savings"),
+        "opening_hook": pitch.get("opening_hook"),
+        "value_proposition": pitch.get("value_proposition"),
+        "cost_benefit_analysis": pitch.get("cost_benefit_analysis"),
+        "call_to_action": pitch.get("call_to_action")
+    }
+
+
+class ResultWriter:
+    """Appends result rows to a CSV or Parquet file (one row group per write)"""
+
+    def __init__(self, path: str, output_format: str = None):
+        self.path = path
+        self.format = output_format or detect_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"Unsupported batch format: {self.format!r}")
+        self._handle = None
+        self._writer = None
+        if self.format == "csv":
+            self._handle = open(path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._handle, fieldnames=RESULT_COLUMNS)
+            self._writer.writeheader()
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._schema = pa.schema([
+                ("row", pa.int64()), ("success", pa.bool_()), ("error", pa.string()),
+                ("customer_id", pa.string()), ("name", pa.string()), ("segment", pa.string()),
+                ("usage_pattern", pa.string()), ("target_plan_id", pa.string()),
+                ("suitability_score", pa.float64()), ("monthly_savings", pa.float64()),
+                ("annual_savings", pa.float64()), ("opening_hook", pa.string()),
+                ("value_proposition", pa.string()), ("cost_benefit_analysis", pa.string()),
+                ("call_to_action", pa.string())
+            ])
+            self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self.format == "csv":
+            self._writer.writerows(rows)
+            self._handle.flush()
+        else:
+            import pyarrow as pa
+
+            self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        if self._writer is not None and self.format == "parquet":
+            self._writer.close()
+        if self._handle is not None:
+            self._handle.close()
+        self._writer = self._handle = None
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def process_file(
+    agent: TelecomSalesAgent,
+    source: Source,
+    output_path: str,
+    input_format: str = None,
+    output_format: str = None,
+    chunksize: int = 1000,
+    concurrency: int = 8,
+    processes: int = 0,
+    progress_callback: BatchProgressCallback = None,
+    stop: threading.Event = None
+) -> BatchProgress:
+    """
+    Run every row of a batch file through `agent` and write the results to `output_path`
+
+    Items are pulled from the file lazily by the agent's batch API and
+    results are written in input order, a chunk at a time. Only the chunk
+    being read, the items in flight and the results waiting for an earlier
+    row are held in memory. The batch API starts no row more than a window
+    of max(chunksize, twice the rows in flight) past the oldest unfinished
+    one, so a stalled row pauses the input instead of letting waiting
+    results pile up.
+
+    Args:
+        agent: Agent whose batch API runs the rows
+        source: Input path or binary file object
+        output_path: Result file (CSV or Parquet, see ResultWriter)
+        input_format / output_format: "csv" or "parquet"; detected from file names if omitted
+        chunksize: Rows read and written at a time
+        concurrency: Threads used when `processes` is 0
+        processes: Worker processes for process_customers_batch_parallel; 0 uses threads
+        progress_callback: Called with a BatchProgress as rows complete
+        stop: Set it to stop after the current chunk
+
+    Returns:
+        Final BatchProgress
+    """
+    started = time.perf_counter()
+    fraction: List[Optional[float]] = [None]
+
+    def on_read(read_fraction: Optional[float]) -> None:
+        fraction[0] = read_fraction
+
+    items = itertools.chain.from_iterable(read_items(source, input_format, chunksize, on_read))
+    if stop is not None:
+        items = itertools.takewhile(lambda _: not stop.is_set(), items)
+    if processes:
+        # Two chunks per worker are in flight
+        window = max(chunksize, 4 * PARALLEL_CHUNKSIZE * processes)
+        results = agent.process_customers_batch_parallel(
+            items, processes=processes, chunksize=PARALLEL_CHUNKSIZE, window=window
+        )
+    else:
+        window = max(chunksize, 2 * concurrency)
+        results = agent.process_customers_batch_sync(items, concurrency=concurrency, window=window)
+
+    # Results arrive in completion order; rows wait here (fewer than `window`)
+    # until all earlier rows are in
+    waiting: Dict[int, Dict[str, Any]] = {}
+    ready: List[Dict[str, Any]] = []
+    next_row = succeeded = failed = 0
+
+    def progress() -> BatchProgress:
+        return BatchProgress(next_row, succeeded, failed, time.perf_counter() - started, fraction[0])
+
+    with ResultWriter(output_path, output_format) as writer:
+        for item_result in results:
+            waiting[item_result.index] = result_row(item_result.index, item_result.result)
+            if next_row not in waiting:
+                continue
+            while next_row in waiting:
+                row = waiting.pop(next_row)
+                ready.append(row)
+                succeeded += row["success"]
+                failed += not row["success"]
+                next_row += 1
+            if len(ready) >= chunksize:
+                writer.write(ready)
+                ready = []
+            if progress_callback:
+                progress_callback(progress())
+        writer.write(ready)
+
+    if stop is None or not stop.is_set():
+        fraction[0] = 1.0
+    final = progress()
+    if progress_callback:
+        progress_callback(final)
+    return final
+
+
+class BatchJob:
+    """
+    process_file on a background thread, for UIs that poll its progress
+
+    `progress` holds the latest BatchProgress; when `done` is set the
+    output file is complete (or `error` says why not).
+    """
+
+    def __init__(self, agent: TelecomSalesAgent, source: Source, output_path: str, **options: Any):
+        self.output_path = output_path
+        self.progress = BatchProgress(0, 0, 0, 0.0, 0.0)
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+        self.stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(agent, source, output_path, options), name="batch-file", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, agent: TelecomSalesAgent, source: Source, output_path: str, options: Dict[str, Any]) -> None:
+        def update(progress: BatchProgress) -> None:
+            self.progress = progress
+
+        try:
+            process_file(agent, source, output_path, progress_callback=update, stop=self.stop, **options)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done.set()
+
+    def cancel(self) -> None:
+        """Stop reading new rows; rows already in flight are still written"""
+        self.stop.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done.wait(timeout)
@@ -0,0 +1,299 @@
+"""
+Monthly per-subscriber UsageData from raw call-detail records (CDRs).
+
+Each CDR event is one row with these columns (rename others via `columns`):
+    subscriber_id     subscriber the event belongs to
+    timestamp         ISO 8601 string or epoch seconds (read as UTC)
+    event_type        "data", "voice" or "sms"
+    bytes             data volume of "data" events
+    duration_seconds  call length of "voice" events
+    international     optional; true for international events
+    roaming           optional; true for events while roaming
+
+Files (CSV, Parquet or JSON Lines) are read in chunks. Every chunk is
+reduced with vectorized group-bys to one row per subscriber and month,
+holding sums, flag counts and a 24-bin hourly event histogram. So memory
+depends on the number of subscribers, not events, and files can be
+aggregated in parallel and merged.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .models.customer_profile import UsageData
+
+
+CDR_FORMATS = ("csv", "parquet", "jsonl")
+
+# Data volumes are billed in decimal gigabytes
+BYTES_PER_GB = 1e9
+
+HOUR_COLUMNS = tuple(f"hour_{hour:02d}" for hour in range(24))
+
+# Columns of an aggregate frame, indexed by (subscriber_id, month)
+AGGREGATE_COLUMNS = ("events", "data_bytes", "voice_seconds", "sms_count", "international_events",
+                     "roaming_events") + HOUR_COLUMNS
+
+_REQUIRED = ("subscriber_id", "timestamp", "event_type")
+_OPTIONAL = ("bytes", "duration_seconds", "international", "roaming")
+
+
+def detect_cdr_format(path: str) -> str:
+    """CDR file format from a file name's extension"""
+    extension = os.path.splitext(str(path))[1].lower().lstrip(".")
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension in ("csv", "txt"):
+        return "csv"
+    raise ValueError(f"Unsupported CDR file type: {path!r} (expected .csv, .parquet or .jsonl)")
+
+
+def read_cdr_chunks(path: str, cdr_format: str = None, chunksize: int = 500_000,
+                    columns: Mapping[str, str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a CDR file as DataFrames of up to `chunksize` events
+
+    Args:
+        path: CSV, Parquet or JSON Lines file
+        cdr_format: "csv", "parquet" or "jsonl"; detected from the extension if omitted
+        chunksize: Events per chunk
+        columns: Renames from the file's column names to the standard ones
+    """
+    cdr_format = cdr_format or detect_cdr_format(path)
+    if cdr_format == "parquet":
+        import pyarrow.parquet as pq
+
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+    elif cdr_format == "jsonl":
+        chunks = pd.read_json(path, lines=True, chunksize=chunksize, dtype={"subscriber_id": str}, convert_dates=False)
+    elif cdr_format == "csv":
+        chunks = pd.read_csv(path, chunksize=chunksize, dtype={"subscriber_id": str})
+    else:
+        raise ValueError(f"Unsupported CDR format: {cdr_format!r}")
+
+    for chunk in chunks:
+        yield chunk.rename(columns=columns) if columns else chunk
+
+
+def _flag(frame: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in frame:
+        return np.zeros(len(frame))
+    values = frame[column]
+    if not (pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values)):
+        values = values.map(lambda v: str(v).strip().lower() in ("1", "true", "t", "yes", "y"), na_action="ignore")
+    return values.fillna(False).astype(bool).to_numpy(dtype=np.float64)
+
+
+def _amount(frame: pd.DataFrame, column: str, mask: np.ndarray) -> np.ndarray:
+    if column not in frame:
+        return np.zeros(len(frame))
+    values = pd.to_numeric(frame[column], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    return np.where(mask, values, 0.0)
+
+
+def _timestamps(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_datetime(values, unit="s", utc=True)
+    return pd.to_datetime(values, utc=True, format="ISO8601")
+
+
+def aggregate_chunk(frame: pd.DataFrame, month: str = None) -> pd.DataFrame:
+    """
+    Reduce one chunk of CDR events to an aggregate frame
+
+    Returns:
+        DataFrame indexed by (subscriber_id, month "YYYY-MM") with AGGREGATE_COLUMNS
+    """
+    missing = [column for column in _REQUIRED if column not in frame]
+    if missing:
+        raise ValueError(f"CDR events are missing columns: {', '.join(missing)}")
+
+    timestamps = _timestamps(frame["timestamp"])
+    valid = timestamps.notna().to_numpy() & frame["subscriber_id"].notna().to_numpy()
+    months = (timestamps.dt.year * 100 + timestamps.dt.month).to_numpy()
+    if month is not None:
+        year, month_number = (int(part) for part in month.split("-"))
+        valid &= months == year * 100 + month_number
+    if not valid.all():
+        frame, timestamps, months = frame[valid], timestamps[valid], months[valid]
+    if frame.empty:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS, index=_empty_index())
+
+    # One integer code per (subscriber, month) group; every column is then a bincount
+    keys = pd.MultiIndex.from_arrays([frame["subscriber_id"].astype(str).to_numpy(), months.astype(np.int64)])
+    codes, groups = keys.factorize()
+    size = len(groups)
+
+    event_type = frame["event_type"].to_numpy()
+    columns = {
+        "events": np.bincount(codes, minlength=size).astype(np.float64),
+        "data_bytes": np.bincount(codes, _amount(frame, "bytes", event_type == "data"), size),
+        "voice_seconds": np.bincount(codes, _amount(frame, "duration_seconds", event_type == "voice"), size),
+        "sms_count": np.bincount(codes, (event_type == "sms").astype(np.float64), size),
+        "international_events": np.bincount(codes, _flag(frame, "international"), size),
+        "roaming_events": np.bincount(codes, _flag(frame, "roaming"), size)
+    }
+    hours = timestamps.dt.hour.to_numpy()
+    histogram = np.bincount(codes * 24 + hours, minlength=size * 24).reshape(size, 24).astype(np.float64)
+    columns.update(zip(HOUR_COLUMNS, histogram.T))
+
+    index = pd.MultiIndex.from_arrays(
+        [groups.get_level_values(0), [f"{m // 100:04d}-{m % 100:02d}" for m in groups.get_level_values(1)]],
+        names=("subscriber_id", "month")
+    )
+    return pd.DataFrame(columns, index=index)
+
+
+def _empty_index() -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([[], []], names=("subscriber_id", "month"))
+
+
+def merge_aggregates(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Combine aggregate frames of the same or different events into one"""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS, index=_empty_index())
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames).groupby(level=[0, 1], sort=False).sum()
+
+
+def usage_frame(aggregates: pd.DataFrame, peak_hours: int = 4) -> pd.DataFrame:
+    """
+    UsageData fields per (subscriber_id, month), computed column-wise
+
+    Peak hours are the `peak_hours` busiest hours of the hourly event
+    histogram (earlier hour first on ties), returned in clock order.
+    """
+    histogram = aggregates[list(HOUR_COLUMNS)].to_numpy()
+    busiest = np.argsort(-histogram, axis=1, kind="stable")[:, :peak_hours]
+    active = np.take_along_axis(histogram, busiest, axis=1) > 0
+    return pd.DataFrame({
+        "data_usage_gb": (aggregates["data_bytes"].to_numpy() / BYTES_PER_GB).round(3),
+        "voice_minutes": np.rint(aggregates["voice_seconds"].to_numpy() / 60).astype(np.int64),
+        "sms_count": aggregates["sms_count"].to_numpy().astype(np.int64),
+        "international_usage": aggregates["international_events"].to_numpy() > 0,
+        "roaming_usage": aggregates["roaming_events"].to_numpy() > 0,
+        "peak_usage_hours": [sorted(hours[keep].tolist()) for hours, keep in zip(busiest, active)]
+    }, index=aggregates.index)
+
+
+class CDRAggregator:
+    """
+    Streams CDR events into monthly per-subscriber usage.
+
+    Chunks are reduced as they arrive. The partial aggregates added since
+    the last merge are merged in once they hold `compact_rows` rows or as
+    many rows as the merged frame, whichever is more. Merges therefore get
+    rarer as the subscriber base grows, and the rows re-merged per added row
+    stay bounded on average. Memory stays within about twice the final result
+    however many events are added.
+    """
+
+    def __init__(self, month: str = None, peak_hours: int = 4, columns: Mapping[str, str] = None,
+                 chunksize: int = 500_000, compact_rows: int = 1_000_000):
+        """
+        Args:
+            month: Only aggregate events of this month ("YYYY-MM"); all months if None
+            peak_hours: Number of peak usage hours per subscriber
+            columns: Renames from the files' column names to the standard ones
+            chunksize: Events read per chunk
+            compact_rows: Merge partial aggregates once they hold at least this
+                many rows (and at least as many as the merged frame)
+        """
+        self.month = month
+        self.peak_hours = peak_hours
+        self.columns = dict(columns) if columns else None
+        self.chunksize = chunksize
+        self.compact_rows = compact_rows
+        self.events = 0
+        self.merges = 0
+        self._partials: List[pd.DataFrame] = []
+        self._merged_rows = 0
+        self._unmerged_rows = 0
+
+    def add_frame(self, frame: pd.DataFrame) -> None:
+        """Aggregate a DataFrame of events"""
+        if self.columns:
+            frame = frame.rename(columns=self.columns)
+        self.events += len(frame)
+        self.add_aggregate(aggregate_chunk(frame, self.month))
+
+    def add_file(self, path: str, cdr_format: str = None) -> None:
+        """Aggregate every event of a CSV, Parquet or JSON Lines file, a chunk at a time"""
+        for chunk in read_cdr_chunks(path, cdr_format, self.chunksize, self.columns):
+            self.events += len(chunk)
+            self.add_aggregate(aggregate_chunk(chunk, self.month))
+
+    def add_aggregate(self, aggregate: pd.DataFrame) -> None:
+        """Merge an aggregate frame (e.g. from another process) into this one"""
+        self._partials.append(aggregate)
+        self._unmerged_rows += len(aggregate)
+        if self._unmerged_rows >= max(self.compact_rows, self._merged_rows) and len(self._partials) > 1:
+            self._compact()
+
+    def _compact(self) -> None:
+        if len(self._partials) > 1:
+            self.merges += 1
+        merged = merge_aggregates(self._partials)
+        self._partials, self._merged_rows, self._unmerged_rows = [merged], len(merged), 0
+
+    @property
+    def aggregates(self) -> pd.DataFrame:
+        """The merged aggregate frame, indexed by (subscriber_id, month)"""
+        self._compact()
+        return self._partials[0]
+
+    def usage_frame(self) -> pd.DataFrame:
+        """UsageData fields per (subscriber_id, month) as a DataFrame"""
+        return usage_frame(self.aggregates, self.peak_hours)
+
+    def iter_usage(self) -> Iterator[Tuple[str, str, UsageData]]:
+        """(subscriber_id, month, UsageData) for every subscriber and month"""
+        frame = self.usage_frame()
+        for (subscriber_id, month), fields in zip(frame.index, frame.to_dict("records")):
+            yield subscriber_id, month, UsageData(**fields)
+
+    def usage(self) -> Dict[Tuple[str, str], UsageData]:
+        """UsageData keyed by (subscriber_id, month)"""
+        return {(subscriber_id, month): usage for subscriber_id, month, usage in self.iter_usage()}
+
+
+def _aggregate_file(path: str, options: Dict[str, Any]) -> Tuple[int, pd.DataFrame]:
+    """Process pool task: the events count and aggregate frame of one file"""
+    aggregator = CDRAggregator(**options)
+    aggregator.add_file(path)
+    return aggregator.events, aggregator.aggregates
+
+
+def aggregate_files(paths: Sequence[str], processes: Optional[int] = None, **options: Any) -> CDRAggregator:
+    """
+    Aggregate many CDR files, one file per worker process, and merge the results
+
+    Args:
+        paths: CSV, Parquet or JSON Lines files
+        processes: Worker processes (defaults to the CPU count, at most one per
+            file); 0 aggregates the files in this process
+        **options: CDRAggregator arguments
+
+    Returns:
+        CDRAggregator holding the merged aggregates of every file
+    """
+    merged = CDRAggregator(**options)
+    processes = min(len(paths), os.cpu_count() or 1) if processes is None else processes
+    if not processes:
+        for path in paths:
+            merged.add_file(path)
+        return merged
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for events, aggregate in executor.map(_aggregate_file, paths, [options] * len(paths)):
+            merged.events += events
+            merged.add_aggregate(aggregate)
+    return merged
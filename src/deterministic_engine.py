@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+from typing import Iterator
+
+from .node_cache import NodeCache
+from .profile_store import ProfileStore
+from .sales_pipeline import AgentState, SalesPipeline, merge_state_update
+from .single_flight import SingleFlight
+
+
+class DeterministicPipeline:
+    """
+    Plain-function equivalent of the compiled LangGraph workflow.
+    
+    Runs validate_inputs, then either analyze_plan_pair + analyze_customer ->
+    compare_plans -> generate_pitch (or, with target_plans, one compare_candidate per plan ->
+    rank_candidates -> pitch_candidates) or error_handler, merging each
+    node's partial update into the state with the same reducers LangGraph
+    uses. Like the graph, the single-target path does not short-circuit when
+    a node sets `error`, so the final state is identical.
+    """
+    
+    def __init__(self, pipeline: SalesPipeline):
+        self.pipeline = pipeline
+        self.validate = pipeline._validate_inputs
+        self.route = pipeline._route_after_validation
+        self.error_path = (pipeline._handle_error,)
+        self.single_target_path = (pipeline._compare_plans, pipeline._generate_pitch)
+        self.multi_target_path = (pipeline._rank_candidates, pipeline._pitch_candidates)
+    
+    def invoke(self, state: AgentState) -> AgentState:
+        """Run the pipeline on a copy of `state` and return the final state"""
+        for state in self.stream(state):
+            pass
+        return state
+    
+    def stream(self, state: AgentState, stream_mode: str = "values") -> Iterator[AgentState]:
+        """
+        Run the pipeline on a copy of `state`, yielding the state after each step
+        
+        Mirrors the compiled graph's stream(..., stream_mode="values"). The
+        same dictionary is yielded every time, updated in place, so read what
+        you need from it before advancing.
+        """
+        if stream_mode != "values":
+            raise ValueError(f"Unsupported stream_mode: {stream_mode}")
+        pipeline = self.pipeline
+        state = merge_state_update(dict(state), self.validate(state))
+        yield state
+        if self.route(state) != "analyze":
+            for node in self.error_path:
+                merge_state_update(state, node(state))
+                yield state
+            return
+        
+        if pipeline._analyzes_plan_pair(state):
+            merge_state_update(state, pipeline._analyze_plan_pair(state))
+        merge_state_update(state, pipeline._analyze_customer(state))
+        yield state
+        route = pipeline._route_after_analysis(state)
+        if route == "compare":
+            path = self.single_target_path
+        elif route == "compare_candidates":
+            # The graph runs these branches in parallel; each only reads its own input
+            for branch in pipeline._candidate_branches(state):
+                merge_state_update(state, pipeline._compare_candidate(branch))
+            yield state
+            path = self.multi_target_path
+        else:
+            path = ()
+        for node in path:
+            merge_state_update(state, node(state))
+            yield state
+    
+    async def ainvoke(self, state: AgentState) -> AgentState:
+        """Run the pipeline in the default executor so the event loop stays free"""
+        # Carry the caller's context over so node spans nest under the request span
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, self.invoke, state)
+
+
+class DeterministicEngine(SalesPipeline):
+    """
+    Rules-only telecom sales agent without LangGraph or an LLM client.
+    
+    Produces the same results as TelecomSalesAgent with much lower per-request
+    overhead, and only needs pydantic to import: the tools fall back to a
+    minimal BaseTool when langchain is not installed.
+    """
+    
+    def __init__(self, typed_state: bool = False, node_cache: NodeCache = None,
+                 single_flight: SingleFlight = None, profile_store: ProfileStore = None):
+        """
+        Args:
+            typed_state: Pass validated pydantic models between nodes instead of
+                JSON strings/dicts; results are serialized once when returned
+            node_cache: Optional NodeCache; nodes whose inputs are unchanged
+                are then served from it instead of running again
+            single_flight: Optional SingleFlight; concurrent identical
+                process_customer calls then share one workflow run
+            profile_store: Optional ProfileStore; stored profiles are then
+                loaded for each customer and updated profiles saved back
+        """
+        super().__init__(typed_state, node_cache, single_flight, profile_store)
+        self.app = DeterministicPipeline(self)
@@ -1,384 +1,469 @@
-import json
-from typing import Dict, List, Any, TypedDict, Annotated
-from datetime import datetime
-import operator
+import os
+import asyncio
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, AsyncIterator, Callable, Iterable, Iterator, NamedTuple, Tuple
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.tools import BaseTool
+# langchain_openai and langgraph take over a second to import, so they are
+# imported where they are first used rather than at module import time
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from langgraph.graph import StateGraph
+    from langgraph.prebuilt import ToolNode
 
-from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-from langchain.schema import BaseMessage
-from typing import Annotated
-import operator
+from .agents.tool_registry import TOOL_REGISTRY
+from .node_cache import NodeCache
+from .profile_store import MEMORY, ProfileStore
+from .sales_pipeline import AgentState, SalesPipeline
+from .single_flight import SingleFlight
 
-from .agents.customer_profiler import CustomerProfiler
-from .agents.plan_analyzer import PlanAnalyzer
-from .agents.pitch_generator import PitchGenerator
-from .models.customer_profile import CustomerProfile, TelecomPlan
 
+# Keys of a batch item, matching the process_customer arguments
+BATCH_ITEM_FIELDS = (
+    "customer_conversation", "current_plan", "target_plan", "usage_data", "existing_profile", "target_plans", "top_n",
+    "timeout"
+)
 
-class AgentState(TypedDict):
-    """State shared across the LangGraph agent"""
-    messages: Annotated[List[Dict], operator.add]
-    customer_conversation: str
-    current_plan: Dict[str, Any]
-    target_plan: Dict[str, Any]
-    usage_data: Dict[str, Any]
-    customer_profile: Dict[str, Any]
-    plan_comparison: Dict[str, Any]
-    personalized_pitch: Dict[str, Any]
-    step: str
-    error: str
+# Called after every finished batch item with (completed, total); total is None for unsized inputs
+ProgressCallback = Callable[[int, Optional[int]], None]
 
 
-class TelecomSalesAgent:
-    """LangGraph-based telecom sales agent for personalized plan pitches"""
+class BatchItemResult(NamedTuple):
+    """Result of one batch item; `index` is the item's position in the input"""
+    index: int
+    result: Dict[str, Any]
+
+
+# Agent owned by a batch worker process, built once by _init_batch_worker
+_BATCH_WORKER_AGENT: Optional["TelecomSalesAgent"] = None
+
+
+def _init_batch_worker(openai_api_key: Optional[str], typed_state: bool, profile_store_path: str = None) -> None:
+    """Process pool initializer: build the agent, tools and compiled graph once per worker"""
+    global _BATCH_WORKER_AGENT
+    profile_store = ProfileStore(profile_store_path) if profile_store_path else None
+    _BATCH_WORKER_AGENT = TelecomSalesAgent(openai_api_key=openai_api_key, typed_state=typed_state,
+                                            profile_store=profile_store)
+    _BATCH_WORKER_AGENT.app
+
+
+def _process_batch_chunk(chunk: List[tuple], compact: bool) -> List[BatchItemResult]:
+    """Process a chunk of (index, item) pairs in a batch worker process"""
+    results = []
+    for index, item in chunk:
+        item_result = _BATCH_WORKER_AGENT._process_batch_item(index, item)
+        if compact:
+            item_result.result.pop("messages", None)
+        results.append(item_result)
+    if _BATCH_WORKER_AGENT.profile_store is not None:
+        # Workers exit without cleanup, so profiles are made durable per chunk
+        _BATCH_WORKER_AGENT.profile_store.flush()
+    return results
+
+
+def build_workflow(pipeline: SalesPipeline) -> "StateGraph":
+    """Build the LangGraph workflow over the node methods of `pipeline`"""
+    from langgraph.graph import StateGraph, END
+    from langgraph.types import Send
     
-    def __init__(self, openai_api_key: str = None):
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0.7,
-            openai_api_key=openai_api_key
-        )
-        
-        # Initialize tools
-        self.tools = [
-            CustomerProfiler(),
-            PlanAnalyzer(),
-            PitchGenerator()
-        ]
-        
-        self.tool_node = ToolNode(self.tools)
-        
-        # Build the graph
-        self.workflow = self._build_workflow()
-        self.app = self.workflow.compile()
+    workflow = StateGraph(AgentState)
     
-    def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow"""
-        workflow = StateGraph(AgentState)
-        
-        # Add nodes
-        workflow.add_node("analyze_customer", self._analyze_customer)
-        workflow.add_node("compare_plans", self._compare_plans)
-        workflow.add_node("generate_pitch", self._generate_pitch)
-        workflow.add_node("validate_inputs", self._validate_inputs)
-        workflow.add_node("error_handler", self._handle_error)
-        
-        # Define the flow
-        workflow.set_entry_point("validate_inputs")
-        
-        # Conditional routing from validation
-        workflow.add_conditional_edges(
-            "validate_inputs",
-            self._route_after_validation,
-            {
-                "analyze": "analyze_customer",
-                "error": "error_handler"
-            }
-        )
+    # Add nodes
+    workflow.add_node("analyze_customer", pipeline._analyze_customer)
+    workflow.add_node("compare_plans", pipeline._compare_plans)
+    workflow.add_node("generate_pitch", pipeline._generate_pitch)
+    workflow.add_node("validate_inputs", pipeline._validate_inputs)
+    workflow.add_node("error_handler", pipeline._handle_error)
+    workflow.add_node("analyze_plan_pair", pipeline._analyze_plan_pair)
+    
+    # Multi-target nodes
+    workflow.add_node("compare_candidate", pipeline._compare_candidate)
+    workflow.add_node("rank_candidates", pipeline._rank_candidates)
+    workflow.add_node("pitch_candidates", pipeline._pitch_candidates)
+    
+    # Define the flow
+    workflow.set_entry_point("validate_inputs")
+    
+    # Conditional routing from validation; single-target requests analyze the
+    # plan pair in the same step as the customer profile
+    def route_after_validation(state: AgentState):
+        route = pipeline._route_after_validation(state)
+        if route == "analyze" and pipeline._analyzes_plan_pair(state):
+            return ["analyze_customer", "analyze_plan_pair"]
+        return {"analyze": "analyze_customer", "error": "error_handler"}[route]
+    
+    workflow.add_conditional_edges(
+        "validate_inputs",
+        route_after_validation,
+        ["analyze_customer", "analyze_plan_pair", "error_handler"]
+    )
+    
+    # After profiling: one comparison, or one parallel branch per candidate plan
+    def route_after_analysis(state: AgentState):
+        route = pipeline._route_after_analysis(state)
+        if route == "compare_candidates":
+            return [Send("compare_candidate", branch) for branch in pipeline._candidate_branches(state)]
+        return {"compare": "compare_plans", "end": END}[route]
+    
+    workflow.add_conditional_edges(
+        "analyze_customer",
+        route_after_analysis,
+        ["compare_plans", "compare_candidate", END]
+    )
+    
+    # Sequential flow through main process; compare_plans joins the profile
+    # with the plan pair analyzed in the same step
+    workflow.add_edge("analyze_plan_pair", "compare_plans")
+    workflow.add_edge("compare_plans", "generate_pitch")
+    workflow.add_edge("generate_pitch", END)
+    workflow.add_edge("error_handler", END)
+    
+    # The branches join in rank_candidates, which keeps the top_n to pitch
+    workflow.add_edge("compare_candidate", "rank_candidates")
+    workflow.add_edge("rank_candidates", "pitch_candidates")
+    workflow.add_edge("pitch_candidates", END)
+    
+    return workflow
+
+
+# Process-wide (workflow, compiled graph) per state mode and node cache, see get_shared_workflow
+_SHARED_WORKFLOWS: Dict[Tuple[bool, Optional[NodeCache]], Tuple["StateGraph", Any]] = {}
+_SHARED_WORKFLOWS_LOCK = Lock()
+
+
+def get_shared_workflow(typed_state: bool = False, node_cache: NodeCache = None) -> Tuple["StateGraph", Any]:
+    """
+    The process-wide workflow and compiled graph for a state mode and node cache.
+    
+    The graph is built over a plain SalesPipeline, whose nodes only use
+    `typed_state`, `node_cache` and the shared TOOL_REGISTRY tools, so one
+    compiled graph can serve every agent (and every thread) in the process.
+    """
+    key = (bool(typed_state), node_cache)
+    shared = _SHARED_WORKFLOWS.get(key)
+    if shared is None:
+        with _SHARED_WORKFLOWS_LOCK:
+            shared = _SHARED_WORKFLOWS.get(key)
+            if shared is None:
+                workflow = build_workflow(SalesPipeline(typed_state, node_cache))
+                shared = _SHARED_WORKFLOWS[key] = (workflow, workflow.compile())
+    return shared
+
+
+class TelecomSalesAgent(SalesPipeline):
+    """
+    LangGraph-based telecom sales agent for personalized plan pitches
+    
+    Agents are cheap to create: tools come from the process-wide
+    TOOL_REGISTRY and the compiled graph is shared by all agents with the
+    same `typed_state`. Subclasses that override node methods must set
+    `shares_workflow = False` to get a graph built over their own nodes.
+    """
+    
+    # Use the process-wide compiled graph from get_shared_workflow
+    shares_workflow = True
+    
+    def __init__(self, openai_api_key: str = None, typed_state: bool = False, node_cache: NodeCache = None,
+                 single_flight: SingleFlight = None, profile_store: ProfileStore = None):
+        """
+        Args:
+            openai_api_key: OpenAI API key for the LLM client
+            typed_state: Pass validated pydantic models between nodes instead of
+                JSON strings/dicts; results are serialized once when returned
+            node_cache: Optional NodeCache; nodes whose inputs are unchanged
+                are then served from it instead of running again
+            single_flight: Optional SingleFlight; concurrent identical
+                process_customer calls then share one workflow run
+            profile_store: Optional ProfileStore; stored profiles are then
+                loaded for each customer and updated profiles saved back
+        """
+        super().__init__(typed_state, node_cache, single_flight, profile_store)
+        self.openai_api_key = openai_api_key
         
-        # Sequential flow through main process
-        workflow.add_edge("analyze_customer", "compare_plans")
-        workflow.add_edge("compare_plans", "generate_pitch")
-        workflow.add_edge("generate_pitch", END)
-        workflow.add_edge("error_handler", END)
+        # Shared, warm tool instances
+        self.tools = TOOL_REGISTRY.tools
         
-        return workflow
+        # The LLM client, tool node and compiled graph are built on first use
+        self._llm: Optional["ChatOpenAI"] = None
+        self._tool_node: Optional["ToolNode"] = None
+        self._workflow: Optional["StateGraph"] = None
+        self._app = None
+        self._build_lock = Lock()
     
-    def _validate_inputs(self, state: AgentState) -> AgentState:
-        """Validate required inputs before processing"""
-        try:
-            required_fields = [
-                "customer_conversation",
-                "current_plan", 
-                "target_plan",
-                "usage_data"
-            ]
-            
-            missing_fields = []
-            for field in required_fields:
-                if field not in state or not state[field]:
-                    missing_fields.append(field)
-            
-            if missing_fields:
-                state["error"] = f"Missing required fields: {', '.join(missing_fields)}"
-                state["step"] = "error"
-            else:
-                state["step"] = "validation_passed"
-                state["error"] = ""
-                
-            return state
-            
-        except Exception as e:
-            state["error"] = f"Validation error: {str(e)}"
-            state["step"] = "error"
-            return state
+    @property
+    def llm(self) -> "ChatOpenAI":
+        """LLM client, created on first access"""
+        if self._llm is None:
+            with self._build_lock:
+                if self._llm is None:
+                    from langchain_openai import ChatOpenAI
+                    
+                    self._llm = ChatOpenAI(
+                        model="gpt-4",
+                        temperature=0.7,
+                        openai_api_key=self.openai_api_key
+                    )
+        return self._llm
     
-    def _route_after_validation(self, state: AgentState) -> str:
-        """Route based on validation results"""
-        if state.get("error"):
-            return "error"
-        return "analyze"
+    @property
+    def tool_node(self) -> "ToolNode":
+        """LangGraph ToolNode over the agent's tools, created on first access"""
+        if self._tool_node is None:
+            with self._build_lock:
+                if self._tool_node is None:
+                    from langgraph.prebuilt import ToolNode
+                    
+                    self._tool_node = ToolNode(self.tools)
+        return self._tool_node
     
-    def _analyze_customer(self, state: AgentState) -> AgentState:
-        """Analyze customer conversation and usage to build profile"""
-        try:
-            profiler = CustomerProfiler()
-            
-            # Run customer profiling
-            profile_result = profiler._run(
-                customer_conversation=state["customer_conversation"],
-                usage_data=state["usage_data"],
-                existing_profile=state.get("customer_profile", {})
-            )
-            
-            if profile_result.startswith("Error"):
-                state["error"] = profile_result
-                state["step"] = "error"
-            else:
-                state["customer_profile"] = json.loads(profile_result)
-                state["step"] = "customer_analyzed"
-                state["messages"].append({
-                    "role": "assistant",
-                    "content": f"✅ Customer profile analyzed successfully. Identified as {state['customer_profile']['segment']} segment with {state['customer_profile']['usage_pattern']} usage pattern."
-                })
-            
-            return state
-            
-        except Exception as e:
-            state["error"] = f"Customer analysis error: {str(e)}"
-            state["step"] = "error"
-            return state
+    @property
+    def workflow(self) -> "StateGraph":
+        """The LangGraph workflow definition, built on first access"""
+        if self._workflow is None:
+            self._load_workflow()
+        return self._workflow
     
-    def _compare_plans(self, state: AgentState) -> AgentState:
-        """Compare current and target plans"""
-        try:
-            analyzer = PlanAnalyzer()
-            
-            # Run plan comparison
-            comparison_result = analyzer._run(
-                current_plan=state["current_plan"],
-                target_plan=state["target_plan"],
-                customer_profile=state["customer_profile"]
-            )
-            
-            if comparison_result.startswith("Error"):
-                state["error"] = comparison_result
-                state["step"] = "error"
-            else:
-                state["plan_comparison"] = json.loads(comparison_result)
-                state["step"] = "plans_compared"
-                
-                # Extract key insights for message
-                comparison = state["plan_comparison"]
-                savings = comparison["monthly_savings"]
-                suitability = comparison["suitability_score"]
-                
-                if savings > 0:
-                    savings_msg = f"saves ${savings:.2f}/month"
-                elif savings < 0:
-                    savings_msg = f"costs ${abs(savings):.2f}/month more"
-                else:
-                    savings_msg = "same cost"
-                
-                state["messages"].append({
-                    "role": "assistant", 
-                    "content": f"📊 Plan comparison completed. Target plan {savings_msg} with {suitability:.1f}/10 suitability score."
-                })
-            
-            return state
-            
-        except Exception as e:
-            state["error"] = f"Plan comparison error: {str(e)}"
-            state["step"] = "error"
-            return state
+    @property
+    def app(self):
+        """The compiled workflow, compiled on the first request"""
+        if self._app is None:
+            self._load_workflow()
+        return self._app
     
-    def _generate_pitch(self, state: AgentState) -> AgentState:
-        """Generate personalized sales pitch"""
+    def _load_workflow(self) -> None:
+        """Attach the shared compiled graph, or compile one for this agent's own nodes"""
+        if self.shares_workflow:
+            self._workflow, self._app = get_shared_workflow(self.typed_state, self.node_cache)
+            return
+        with self._build_lock:
+            if self._app is None:
+                workflow = self._build_workflow()
+                self._workflow, self._app = workflow, workflow.compile()
+    
+    def _build_workflow(self) -> "StateGraph":
+        """Build the LangGraph workflow over this agent's node methods"""
+        return build_workflow(self)
+    
+    def _batch_item_kwargs(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """process_customer arguments for a batch item; missing fields are reported by validation"""
+        return {field: item.get(field) for field in BATCH_ITEM_FIELDS}
+    
+    def _batch_error_result(self, error: Exception) -> Dict[str, Any]:
+        """Result dictionary for a batch item that raised instead of completing"""
+        return self._build_result({"error": f"Batch item error: {str(error)}", "messages": []})
+    
+    def _process_batch_item(self, index: int, item: Dict[str, Any]) -> BatchItemResult:
+        """Run one batch item synchronously, turning exceptions into an unsuccessful result"""
         try:
-            pitch_generator = PitchGenerator()
-            
-            # Generate personalized pitch
-            pitch_result = pitch_generator._run(
-                customer_profile=state["customer_profile"],
-                plan_comparison=state["plan_comparison"],
-                sales_context=""
-            )
-            
-            if pitch_result.startswith("Error"):
-                state["error"] = pitch_result
-                state["step"] = "error"
-            else:
-                state["personalized_pitch"] = json.loads(pitch_result)
-                state["step"] = "pitch_generated"
-                state["messages"].append({
-                    "role": "assistant",
-                    "content": "🎯 Personalized sales pitch generated successfully!"
-                })
-            
-            return state
-            
+            result = self.process_customer_sync(**self._batch_item_kwargs(item))
         except Exception as e:
-            state["error"] = f"Pitch generation error: {str(e)}"
-            state["step"] = "error"
-            return state
+            result = self._batch_error_result(e)
+        return BatchItemResult(index, result)
     
-    def _handle_error(self, state: AgentState) -> AgentState:
-        """Handle errors in processing"""
-        state["messages"].append({
-            "role": "assistant",
-            "content": f"❌ Error occurred: {state['error']}"
-        })
-        return state
-    
-    async def process_customer(
+    async def process_customers_batch(
         self,
-        customer_conversation: str,
-        current_plan: Dict[str, Any],
-        target_plan: Dict[str, Any],
-        usage_data: Dict[str, Any],
-        existing_profile: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
+        items: Iterable[Dict[str, Any]],
+        concurrency: int = 8,
+        progress_callback: ProgressCallback = None
+    ) -> AsyncIterator[BatchItemResult]:
         """
-        Process a customer interaction and generate personalized pitch
+        Process many customers with at most `concurrency` workflows in flight
+        
+        Results are yielded as soon as each customer finishes, so they arrive
+        out of order; use `BatchItemResult.index` to match them to the input.
+        Items are pulled from `items` lazily, so large campaign lists (or
+        generators) are never materialized. A failing item produces an
+        unsuccessful result instead of stopping the batch.
         
         Args:
-            customer_conversation: Text from customer interaction
-            current_plan: Current telecom plan details
-            target_plan: Target plan to pitch
-            usage_data: Customer usage statistics
-            existing_profile: Optional existing customer profile
+            items: Dictionaries with the process_customer arguments
+            concurrency: Maximum number of customers processed at once
+            progress_callback: Called with (completed, total) after each item
             
-        Returns:
-            Dictionary containing analysis results and personalized pitch
+        Yields:
+            BatchItemResult for every item, in completion order
         """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
         
-        # Initialize state
-        initial_state = AgentState(
-            messages=[],
-            customer_conversation=customer_conversation,
-            current_plan=current_plan,
-            target_plan=target_plan,
-            usage_data=usage_data,
-            customer_profile=existing_profile or {},
-            plan_comparison={},
-            personalized_pitch={},
-            step="start",
-            error=""
-        )
+        total = len(items) if hasattr(items, "__len__") else None
+        pending = enumerate(items)
+        finished: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
         
-        # Run the workflow
-        result = await self.app.ainvoke(initial_state)
+        input_errors: List[Exception] = []
         
-        return {
-            "customer_profile": result.get("customer_profile", {}),
-            "plan_comparison": result.get("plan_comparison", {}),
-            "personalized_pitch": result.get("personalized_pitch", {}),
-            "messages": result.get("messages", []),
-            "success": not bool(result.get("error")),
-            "error": result.get("error", "")
-        }
+        async def worker():
+            # The shared iterator is only advanced from the event loop thread
+            try:
+                for index, item in pending:
+                    try:
+                        result = await self.process_customer(**self._batch_item_kwargs(item))
+                    except Exception as e:
+                        result = self._batch_error_result(e)
+                    await finished.put(BatchItemResult(index, result))
+            except Exception as e:
+                # Raised by the input iterable itself; re-raised to the caller
+                input_errors.append(e)
+            await finished.put(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        running, completed = len(workers), 0
+        try:
+            while running:
+                item_result = await finished.get()
+                if item_result is None:
+                    running -= 1
+                    continue
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total)
+                yield item_result
+            if input_errors:
+                raise input_errors[0]
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
     
-    def process_customer_sync(
+    def process_customers_batch_sync(
         self,
-        customer_conversation: str,
-        current_plan: Dict[str, Any], 
-        target_plan: Dict[str, Any],
-        usage_data: Dict[str, Any],
-        existing_profile: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
-        """
-        Synchronous version of process_customer
+        items: Iterable[Dict[str, Any]],
+        concurrency: int = 8,
+        progress_callback: ProgressCallback = None,
+        window: int = None
+    ) -> Iterator[BatchItemResult]:
         """
+        Synchronous version of process_customers_batch
         
-        # Initialize state
-        initial_state = AgentState(
-            messages=[],
-            customer_conversation=customer_conversation,
-            current_plan=current_plan,
-            target_plan=target_plan,
-            usage_data=usage_data,
-            customer_profile=existing_profile or {},
-            plan_comparison={},
-            personalized_pitch={},
-            step="start",
-            error=""
-        )
+        Runs the workflows on a pool of `concurrency` threads and yields
+        results in completion order. With `window`, no item is started more
+        than `window` positions past the oldest unfinished one, so a caller
+        restoring input order never holds more than `window` results even
+        when one item stalls.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
         
-        # Run the workflow synchronously
-        result = self.app.invoke(initial_state)
+        total = len(items) if hasattr(items, "__len__") else None
+        pending = enumerate(items)
         
-        return {
-            "customer_profile": result.get("customer_profile", {}),
-            "plan_comparison": result.get("plan_comparison", {}),
-            "personalized_pitch": result.get("personalized_pitch", {}),
-            "messages": result.get("messages", []),
-            "success": not bool(result.get("error")),
-            "error": result.get("error", "")
-        }
+        completed = submitted = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # Index of every submitted, unfinished item
+            in_flight: Dict[Any, int] = {}
+            
+            def submit_more() -> None:
+                # Keep at most `concurrency` items submitted at a time
+                nonlocal submitted
+                allowed = concurrency - len(in_flight)
+                if window is not None:
+                    allowed = min(allowed, min(in_flight.values(), default=submitted) + window - submitted)
+                for index, item in itertools.islice(pending, max(allowed, 0)):
+                    in_flight[executor.submit(self._process_batch_item, index, item)] = index
+                    submitted = index + 1
+            
+            submit_more()
+            try:
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del in_flight[future]
+                        completed += 1
+                        if progress_callback:
+                            progress_callback(completed, total)
+                        yield future.result()
+                    submit_more()
+            finally:
+                for future in in_flight:
+                    future.cancel()
     
-    def format_pitch_for_sales_rep(self, result: Dict[str, Any]) -> str:
-        """
-        Format the generated pitch for easy use by sales representatives
+    def process_customers_batch_parallel(
+        self,
+        items: Iterable[Dict[str, Any]],
+        processes: int = None,
+        chunksize: int = 64,
+        progress_callback: ProgressCallback = None,
+        compact: bool = True,
+        window: int = None
+    ) -> Iterator[BatchItemResult]:
         """
-        if not result["success"]:
-            return f"❌ Error generating pitch: {result['error']}"
+        Process many customers on a pool of worker processes
         
-        pitch = result["personalized_pitch"]
-        customer = result["customer_profile"]
-        comparison = result["plan_comparison"]
+        The profiling, comparison and pitch rules are CPU-bound Python, so a
+        thread or asyncio batch is limited to one core by the GIL. Each worker
+        process builds its own agent once at startup and receives items in
+        chunks of `chunksize` to amortize pickling. At most two chunks per
+        worker are in flight, so inputs are still consumed lazily. Workers
+        open the agent's profile_store by path, which must be a database file.
         
-        formatted_pitch = f"""
-🎯 PERSONALIZED SALES PITCH FOR {customer['name'].upper()}
-
-📞 OPENING:
-{pitch['opening_hook']}
-
-💡 ADDRESS THEIR CONCERNS:
-{pitch['pain_point_address']}
-
-🌟 VALUE PROPOSITION:
-{pitch['value_proposition']}
-
-⭐ KEY FEATURES TO HIGHLIGHT:
-"""
-        for feature in pitch['feature_highlights']:
-            formatted_pitch += f"• {feature}\n"
-        
-        formatted_pitch += f"""
-💰 COST BENEFITS:
-{pitch['cost_benefit_analysis']}
-
-🛡️ OBJECTION HANDLING:
-"""
-        for objection, response in pitch['objection_handling'].items():
-            formatted_pitch += f"• {objection.replace('_', ' ').title()}: {response}\n"
-        
-        formatted_pitch += f"""
-🚀 CALL TO ACTION:
-{pitch['call_to_action']}
-
-⏰ URGENCY FACTORS:
-"""
-        for factor in pitch['urgency_factors']:
-            formatted_pitch += f"• {factor}\n"
+        Args:
+            items: Dictionaries with the process_customer arguments
+            processes: Number of worker processes (defaults to the CPU count)
+            chunksize: Items sent to a worker per task
+            progress_callback: Called with (completed, total) after each item
+            compact: Drop the workflow `messages` from results to shrink what
+                is sent back from the workers
+            window: If given, no item is sent more than `window` positions
+                past the oldest unfinished one, bounding what a caller
+                restoring input order must hold
+            
+        Yields:
+            BatchItemResult for every item, chunk by chunk in completion order
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
         
-        formatted_pitch += f"""
-👤 PERSONAL TOUCHES:
-"""
-        for note in pitch['personalization_notes']:
-            formatted_pitch += f"• {note}\n"
+        profile_store_path = None
+        if self.profile_store is not None:
+            if self.profile_store.path == MEMORY:
+                raise ValueError("An in-memory ProfileStore cannot be shared with worker processes")
+            # Workers read the database, so buffered profiles must be in it first
+            self.profile_store.flush()
+            profile_store_path = self.profile_store.path
         
-        formatted_pitch += f"""
-📊 PLAN COMPARISON SUMMARY:
-• Monthly savings: ${comparison['monthly_savings']:.2f}
-• Annual savings: ${comparison['annual_savings']:.2f}
-• Data: {comparison['data_difference']}
-• Voice: {comparison['voice_difference']}
-• Suitability Score: {comparison['suitability_score']:.1f}/10
-"""
+        processes = processes or os.cpu_count() or 1
+        total = len(items) if hasattr(items, "__len__") else None
+        pending = enumerate(items)
         
-        return formatted_pitch
\ No newline at end of file
+        completed = submitted = 0
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_batch_worker,
+            initargs=(self.openai_api_key, self.typed_state, profile_store_path)
+        ) as executor:
+            # First index of every submitted, unfinished chunk
+            in_flight: Dict[Any, int] = {}
+            
+            def submit_more() -> None:
+                # Keep at most two chunks per worker in flight
+                nonlocal submitted
+                while len(in_flight) < 2 * processes:
+                    size = chunksize
+                    if window is not None:
+                        size = min(size, min(in_flight.values(), default=submitted) + window - submitted)
+                    chunk = list(itertools.islice(pending, max(size, 0)))
+                    if not chunk:
+                        return
+                    in_flight[executor.submit(_process_batch_chunk, chunk, compact)] = chunk[0][0]
+                    submitted = chunk[-1][0] + 1
+            
+            submit_more()
+            try:
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del in_flight[future]
+                        for item_result in future.result():
+                            completed += 1
+                            if progress_callback:
+                                progress_callback(completed, total)
+                            yield item_result
+                        submit_more()
+            finally:
+                for future in in_flight:
+                    future.cancel()
@@ -0,0 +1,207 @@
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from threading import Lock
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .customer_profile import TelecomPlan
+from .plan_record import PlanCatalog, PlanRecord
+
+
+# File layout (native byte order, recorded by the byte-order mark):
+#   header   magic, format version, byte-order mark, plan count, string count
+#   float64  price, data_gb, voice_minutes, hotspot_gb columns (count values each)
+#   int8     international_included, roaming_included columns, padded to 8 bytes
+#   uint64   string offsets (string count + 1) into the UTF-8 blob that follows
+# Strings are stored column by column: plan_id, network_priority, plan JSON.
+SNAPSHOT_MAGIC = b"TPLNSNAP"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("=8sIIQQ")
+_BYTE_ORDER_MARK = 0x01020304
+_FLOAT_COLUMNS = ("price", "data_gb", "voice_minutes", "hotspot_gb")
+_FLAG_COLUMNS = ("international_included", "roaming_included")
+_STRING_COLUMNS = 3
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _snapshot_bytes(catalog: PlanCatalog) -> bytes:
+    """Serialize a normalized catalog into the snapshot layout"""
+    count = len(catalog)
+    chunks = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _BYTE_ORDER_MARK, count, _STRING_COLUMNS * count)]
+    for column in _FLOAT_COLUMNS:
+        chunks.append(getattr(catalog, column).tobytes())
+    flags = b"".join(getattr(catalog, column).tobytes() for column in _FLAG_COLUMNS)
+    chunks.append(flags + b"\0" * (_padded(len(flags)) - len(flags)))
+
+    strings = [record.plan_id.encode("utf-8") for record in catalog]
+    strings += [record.network_priority.encode("utf-8") for record in catalog]
+    strings += [record.plan.model_dump_json().encode("utf-8") for record in catalog]
+    offsets = array("Q", [0])
+    for string in strings:
+        offsets.append(offsets[-1] + len(string))
+    chunks.append(offsets.tobytes())
+    chunks.extend(strings)
+    return b"".join(chunks)
+
+
+def publish_snapshot(plans: Iterable[Union[PlanRecord, TelecomPlan, Dict]], path: str) -> int:
+    """
+    Validate and compile a plan catalog into a snapshot file at `path`.
+
+    The file is written next to `path` and moved over it with os.replace,
+    so readers see either the old snapshot or the new one, never a partial
+    file. Processes that still map the old snapshot keep reading it until
+    they switch (see LiveCatalog).
+
+    Returns:
+        Number of plans written
+    """
+    catalog = plans if isinstance(plans, PlanCatalog) else PlanCatalog(plans)
+    data = _snapshot_bytes(catalog)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".catalog-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return len(catalog)
+
+
+class CatalogSnapshot:
+    """
+    Read-only, memory-mapped plan catalog.
+
+    Exposes the same numeric columns as PlanCatalog, as memoryviews over the
+    mapping, so every process that opens the same file shares one copy in
+    the page cache (``numpy.frombuffer(snapshot.price)`` does not copy).
+    Plan ids and network priorities are decoded when the snapshot opens.
+    The TelecomPlan and PlanRecord of a plan are only built when it is first
+    accessed, since a request touches only its top-k plans.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        # (device, inode, mtime) of the mapped file; LiveCatalog compares it with the path's
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+        view = memoryview(self._mmap)
+        magic, version, byte_order_mark, count, string_count = _HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a plan catalog snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot version {version} in {path}")
+        if byte_order_mark != _BYTE_ORDER_MARK:
+            raise ValueError(f"Catalog snapshot {path} was written on a machine with a different byte order")
+
+        offset = _HEADER.size
+        for column in _FLOAT_COLUMNS:
+            setattr(self, column, view[offset:offset + 8 * count].cast("d"))
+            offset += 8 * count
+        for column in _FLAG_COLUMNS:
+            setattr(self, column, view[offset:offset + count].cast("b"))
+            offset += count
+        offset = _padded(offset)
+        offsets = view[offset:offset + 8 * (string_count + 1)].cast("Q")
+        self._offsets = offsets
+        self._blob = offset + 8 * (string_count + 1)
+        self._count = count
+
+        self.plan_ids: Tuple[str, ...] = tuple(self._string(index) for index in range(count))
+        self.network_priority: Tuple[str, ...] = tuple(self._string(count + index) for index in range(count))
+        self._index = {plan_id: index for index, plan_id in enumerate(self.plan_ids)}
+        self._records: Dict[int, PlanRecord] = {}
+        self._lock = Lock()
+
+    def _string_bytes(self, index: int) -> bytes:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._mmap[self._blob + start:self._blob + end]
+
+    def _string(self, index: int) -> str:
+        return self._string_bytes(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> PlanRecord:
+        record = self._records.get(index)
+        if record is None:
+            if not -self._count <= index < self._count:
+                raise IndexError("catalog snapshot index out of range")
+            index %= self._count
+            plan = TelecomPlan.model_validate_json(self._string_bytes(2 * self._count + index))
+            with self._lock:
+                record = self._records.setdefault(index, PlanRecord.from_plan(plan))
+        return record
+
+    def __iter__(self) -> Iterator[PlanRecord]:
+        return (self[index] for index in range(self._count))
+
+    def get(self, plan_id: str) -> Optional[PlanRecord]:
+        """Look up a record by plan_id."""
+        index = self._index.get(plan_id)
+        return None if index is None else self[index]
+
+    @property
+    def records(self) -> Tuple[PlanRecord, ...]:
+        """Every plan's record, in catalog order (builds all of them)."""
+        return tuple(self)
+
+    @property
+    def plans(self) -> Tuple[TelecomPlan, ...]:
+        """The TelecomPlan models, in catalog order (builds all of them)."""
+        return tuple(record.plan for record in self)
+
+
+class LiveCatalog:
+    """
+    The current CatalogSnapshot at a path that is republished over time.
+
+    current() checks the path at most every `check_interval` seconds and,
+    after publish_snapshot has replaced the file, maps the new snapshot and
+    swaps it in. Readers are never blocked: while one thread maps the new
+    file, the others keep getting the previous snapshot, which stays
+    readable until its last user drops it.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = CatalogSnapshot(path)
+        self._checked_at = time.monotonic()
+        self._reload_lock = Lock()
+        self.reloads = 0
+
+    def current(self) -> CatalogSnapshot:
+        """The newest published snapshot (checked at most every check_interval seconds)"""
+        snapshot = self._snapshot
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+        if not self._reload_lock.acquire(blocking=False):
+            return snapshot
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return snapshot
+            if (stat.st_dev, stat.st_ino, stat.st_mtime_ns) != snapshot.identity:
+                self._snapshot = snapshot = CatalogSnapshot(self.path)
+                self.reloads += 1
+        finally:
+            self._reload_lock.release()
+        return snapshot
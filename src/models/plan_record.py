@@ -0,0 +1,174 @@
+import hashlib
+from array import array
+from threading import Lock
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from .customer_profile import TelecomPlan
+
+
+# Numeric sentinel for "unlimited" allowances; compares greater than any usage
+UNLIMITED = float("inf")
+
+
+class FeatureIndex:
+    """Interns plan feature names to bit positions so feature sets become int bitsets."""
+
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._names: list = []
+        self._lock = Lock()
+
+    def bit(self, feature: str) -> int:
+        """Bit mask for a feature, assigning a new bit the first time it is seen."""
+        position = self._bits.get(feature)
+        if position is None:
+            with self._lock:
+                position = self._bits.get(feature)
+                if position is None:
+                    position = len(self._names)
+                    self._names.append(feature)
+                    self._bits[feature] = position
+        return 1 << position
+
+    def mask(self, features: Iterable[str]) -> int:
+        """Bitset for a collection of features."""
+        bits = 0
+        for feature in features:
+            bits |= self.bit(feature)
+        return bits
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# Shared by all plan records so bitsets are comparable across catalogs
+FEATURE_INDEX = FeatureIndex()
+
+
+def normalize_allowance(value: Union[float, int, str], kind: type = float) -> Union[float, int]:
+    """Convert an allowance to a number, with UNLIMITED for 'unlimited'."""
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text == "unlimited":
+            return UNLIMITED
+        value = float(text)
+    if value == UNLIMITED:
+        return UNLIMITED
+    return kind(value)
+
+
+def plan_fingerprint(fields: tuple) -> str:
+    """Stable content hash of a plan's normalized fields; changes whenever any field changes."""
+    return hashlib.blake2b(repr(fields).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PlanRecord(NamedTuple):
+    """
+    Normalized, immutable view of a TelecomPlan for the analyzer hot paths.
+
+    Allowances are plain numbers (UNLIMITED for unlimited) and features are an
+    int bitset, so comparisons need no string checks or conversions. Records
+    are built once per plan when a catalog is loaded; `plan` keeps the source
+    model for outputs that embed it.
+    """
+    plan_id: str
+    name: str
+    price: float
+    data_gb: float
+    voice_minutes: Union[int, float]
+    sms_allowance: Union[int, float]
+    international_included: bool
+    roaming_included: bool
+    hotspot_gb: float
+    network_priority: str
+    feature_bits: int
+    features: Tuple[str, ...]
+    contract_length: int
+    setup_fee: float
+    promotional_discount: Optional[float]
+    promotional_duration: Optional[int]
+    fingerprint: str
+    plan: TelecomPlan
+
+    @classmethod
+    def from_plan(cls, plan: TelecomPlan) -> "PlanRecord":
+        """Normalize a validated TelecomPlan."""
+        features = tuple(dict.fromkeys(plan.features))
+        fields = (
+            plan.plan_id,
+            plan.name,
+            float(plan.price),
+            normalize_allowance(plan.data_allowance, float),
+            normalize_allowance(plan.voice_minutes, int),
+            normalize_allowance(plan.sms_allowance, int),
+            bool(plan.international_included),
+            bool(plan.roaming_included),
+            float(plan.hotspot_data or 0.0),
+            plan.network_priority,
+            FEATURE_INDEX.mask(features),
+            features,
+            plan.contract_length,
+            float(plan.setup_fee),
+            plan.promotional_discount,
+            plan.promotional_duration
+        )
+        # Feature bits depend on interning order, so only the names are hashed
+        return cls(*fields, plan_fingerprint(fields[:10] + fields[11:]), plan)
+
+    @classmethod
+    def of(cls, plan: Union["PlanRecord", TelecomPlan, Dict]) -> "PlanRecord":
+        """Return `plan` as a record, normalizing it only if needed."""
+        if isinstance(plan, PlanRecord):
+            return plan
+        if not isinstance(plan, TelecomPlan):
+            plan = TelecomPlan(**plan)
+        return cls.from_plan(plan)
+
+    def features_not_in(self, other: "PlanRecord") -> Tuple[str, ...]:
+        """Features of this plan missing from `other`, in this plan's feature order."""
+        new_bits = self.feature_bits & ~other.feature_bits
+        if not new_bits:
+            return ()
+        return tuple(feature for feature in self.features if FEATURE_INDEX.bit(feature) & new_bits)
+
+
+class PlanCatalog:
+    """
+    A plan catalog normalized once at load time.
+
+    Holds one PlanRecord per plan plus contiguous typed-array columns of the
+    numeric fields, which vectorized scorers can wrap without copying
+    (e.g. ``numpy.frombuffer(catalog.price)``).
+    """
+
+    def __init__(self, plans: Iterable[Union[PlanRecord, TelecomPlan, Dict]]):
+        self.records: Tuple[PlanRecord, ...] = tuple(PlanRecord.of(plan) for plan in plans)
+        self._by_id = {record.plan_id: record for record in self.records}
+
+        records = self.records
+        self.plan_ids: Tuple[str, ...] = tuple(record.plan_id for record in records)
+        self.network_priority: Tuple[str, ...] = tuple(record.network_priority for record in records)
+        self.price = array("d", (record.price for record in records))
+        self.data_gb = array("d", (record.data_gb for record in records))
+        self.voice_minutes = array("d", (record.voice_minutes for record in records))
+        self.hotspot_gb = array("d", (record.hotspot_gb for record in records))
+        self.international_included = array("b", (record.international_included for record in records))
+        self.roaming_included = array("b", (record.roaming_included for record in records))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[PlanRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, index: int) -> PlanRecord:
+        return self.records[index]
+
+    def get(self, plan_id: str) -> Optional[PlanRecord]:
+        """Look up a record by plan_id."""
+        return self._by_id.get(plan_id)
+
+    @property
+    def plans(self) -> Tuple[TelecomPlan, ...]:
+        """The source TelecomPlan models, in catalog order."""
+        return tuple(record.plan for record in self.records)
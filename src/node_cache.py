@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Protocol
+
+from .serialization import canonical_bytes
+
+
+# Bump whenever a rule in the profiler, analyzer or pitch generator changes the
+# output for the same inputs; every cached node result is keyed by it
+RULES_VERSION = "4"
+
+
+class NodeCacheBackend(Protocol):
+    """Storage for pickled node updates, keyed by hex digests"""
+    
+    def get(self, key: str) -> Optional[bytes]: ...
+    
+    def set(self, key: str, value: bytes) -> None: ...
+    
+    def clear(self) -> None: ...
+    
+    def __len__(self) -> int: ...
+
+
+class MemoryNodeCacheBackend:
+    """Bounded, thread-safe in-process LRU backend"""
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = Lock()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskNodeCacheBackend:
+    """
+    One file per entry in `directory`, shared by processes and restarts.
+    
+    Writes go to a temporary file that is renamed into place, so readers
+    never see a partial entry. Nothing is evicted; clear() or delete the
+    directory to reclaim space.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+    
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+    
+    def set(self, key: str, value: bytes) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(value)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                os.unlink(os.path.join(self.directory, name))
+    
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".pkl"))
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable digest of JSON-like values (dict key order does not matter)"""
+    return hashlib.blake2b(canonical_bytes(parts), digest_size=16).hexdigest()
+
+
+class NodeCache:
+    """
+    Memoizes workflow node updates under a hash of the node's inputs.
+    
+    The key covers the node name, RULES_VERSION, the state mode and the
+    state keys the node reads, so an unchanged node is skipped while any
+    node whose inputs changed runs again. Updates are stored pickled, which
+    keeps cached entries safe from callers mutating returned results.
+    """
+    
+    def __init__(self, backend: NodeCacheBackend = None, rules_version: str = RULES_VERSION):
+        self.backend = backend if backend is not None else MemoryNodeCacheBackend()
+        self.rules_version = rules_version
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = Lock()
+    
+    def _count(self, node: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(node, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+    
+    def get_or_run(self, node: str, typed_state: bool, inputs: list, run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached update for these inputs, running the node on a miss"""
+        key = content_hash(self.rules_version, node, typed_state, inputs)
+        cached = self.backend.get(key)
+        if cached is not None:
+            self._count(node, "hits")
+            return pickle.loads(cached)
+        
+        self._count(node, "misses")
+        update = run()
+        self.backend.set(key, pickle.dumps(update, protocol=pickle.HIGHEST_PROTOCOL))
+        return update
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        self.backend.clear()
+        with self._lock:
+            self._counts.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters overall and per node, plus the number of stored entries"""
+        with self._lock:
+            nodes = {node: dict(counts) for node, counts in self._counts.items()}
+        hits = sum(counts["hits"] for counts in nodes.values())
+        misses = sum(counts["misses"] for counts in nodes.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": len(self.backend),
+            "nodes": nodes
+        }
+
+
+def memoized_node(*input_keys: str):
+    """
+    Decorate a SalesPipeline node so it is served from `self.node_cache`.
+    
+    `input_keys` must list every state key the node reads; without a cache
+    the node runs as usual.
+    """
+    def decorator(node: Callable[[Any, Dict[str, Any]], Dict[str, Any]]):
+        name = node.__name__.lstrip("_")
+        
+        @functools.wraps(node)
+        def wrapper(self, state: Dict[str, Any]) -> Dict[str, Any]:
+            cache = self.node_cache
+            if cache is None:
+                return node(self, state)
+            inputs = [state.get(key) for key in input_keys]
+            return cache.get_or_run(name, self.typed_state, inputs, lambda: node(self, state))
+        
+        return wrapper
+    return decorator
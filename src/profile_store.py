@@ -0,0 +1,247 @@
+"""
+Embedded SQLite store of customer profiles, keyed by customer_id.
+
+Profiles are stored as compact JSON next to indexed columns for segment,
+usage_pattern, contract_end_date and satisfaction_score, so point lookups
+and segment queries never scan the table. Writes are buffered and upserted
+in batches of `batch_size` in one transaction when batching is enabled
+(the default writes through); reads check the buffer first, so a profile
+is visible to the writing process as soon as put() returns. A file-backed
+store (WAL journal) can be shared by several processes; each sees the
+others' writes once they are flushed.
+"""
+
+import sqlite3
+import time
+import weakref
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .models.customer_profile import CustomerProfile
+from .serialization import dumps, loads
+
+
+MEMORY = ":memory:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    customer_id TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    usage_pattern TEXT NOT NULL,
+    contract_end_date TEXT,
+    satisfaction_score REAL,
+    updated_at REAL NOT NULL,
+    profile TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_segment ON profiles (segment, customer_id);
+CREATE INDEX IF NOT EXISTS profiles_usage_pattern ON profiles (usage_pattern, customer_id);
+CREATE INDEX IF NOT EXISTS profiles_contract_end_date ON profiles (contract_end_date);
+CREATE INDEX IF NOT EXISTS profiles_satisfaction_score ON profiles (satisfaction_score);
+"""
+
+_UPSERT = """
+INSERT INTO profiles (customer_id, segment, usage_pattern, contract_end_date, satisfaction_score, updated_at, profile)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (customer_id) DO UPDATE SET
+    segment = excluded.segment,
+    usage_pattern = excluded.usage_pattern,
+    contract_end_date = excluded.contract_end_date,
+    satisfaction_score = excluded.satisfaction_score,
+    updated_at = excluded.updated_at,
+    profile = excluded.profile
+"""
+
+ProfileLike = Union[CustomerProfile, Dict[str, Any]]
+
+
+def _date_key(value: Union[datetime, str, None]) -> Optional[str]:
+    """ISO text of a contract end date, which sorts chronologically"""
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _write(connection: sqlite3.Connection, pending: Dict[str, tuple]) -> None:
+    """Upsert the buffered rows in one transaction and empty the buffer"""
+    if not pending:
+        return
+    with connection:
+        connection.execute("BEGIN")
+        connection.executemany(_UPSERT, list(pending.values()))
+    pending.clear()
+
+
+def _close(connection: sqlite3.Connection, pending: Dict[str, tuple], lock: Lock) -> None:
+    """Flush and close a store's connection; runs once, from close(), garbage collection or interpreter exit"""
+    with lock:
+        try:
+            _write(connection, pending)
+        finally:
+            connection.close()
+
+
+class ProfileStore:
+    """
+    Customer profiles persisted in a local SQLite database.
+
+    Thread-safe: one connection is shared under a lock. With batching
+    enabled, call flush() to make buffered writes visible to other
+    processes. Owners should close() the store (or use it in a `with`
+    block); buffered writes are also flushed when the store is garbage
+    collected or the interpreter exits normally.
+    """
+
+    def __init__(self, path: str = MEMORY, batch_size: int = 1):
+        """
+        Args:
+            path: Database file, created if missing; ":memory:" for a private
+                in-process store
+            batch_size: Buffered profiles that trigger an upsert transaction;
+                1 (the default) writes every put() through immediately, larger
+                values batch bulk loads
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: Dict[str, tuple] = {}
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != MEMORY:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.executescript(_SCHEMA)
+        self._finalizer = weakref.finalize(self, _close, self._connection, self._pending, self._lock)
+
+    def _row(self, profile: ProfileLike) -> tuple:
+        """Validate a profile and build its table row"""
+        if not isinstance(profile, CustomerProfile):
+            profile = CustomerProfile(**profile)
+        return (
+            profile.customer_id,
+            profile.segment.value,
+            profile.usage_pattern.value,
+            _date_key(profile.contract_end_date),
+            profile.satisfaction_score,
+            time.time(),
+            dumps(profile)
+        )
+
+    def put(self, profile: ProfileLike) -> None:
+        """Insert or replace a profile (a CustomerProfile or its dict form)"""
+        self.put_many([profile])
+
+    def put_many(self, profiles: Iterable[ProfileLike]) -> None:
+        """Insert or replace several profiles, upserting once `batch_size` are buffered"""
+        rows = [self._row(profile) for profile in profiles]
+        with self._lock:
+            for row in rows:
+                self._pending[row[0]] = row
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write every buffered profile in one transaction"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        _write(self._connection, self._pending)
+
+    def get(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """The profile dict of a customer, or None if there is none"""
+        with self._lock:
+            row = self._pending.get(customer_id)
+            if row is not None:
+                return loads(row[-1])
+            row = self._connection.execute(
+                "SELECT profile FROM profiles WHERE customer_id = ?", (customer_id,)
+            ).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    def get_many(self, customer_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Profiles of the customers that have one, keyed by customer_id"""
+        return {
+            customer_id: profile
+            for customer_id in dict.fromkeys(customer_ids)
+            if (profile := self.get(customer_id)) is not None
+        }
+
+    def find(
+        self,
+        segment: str = None,
+        usage_pattern: str = None,
+        contract_end_before: Union[datetime, str] = None,
+        contract_end_after: Union[datetime, str] = None,
+        min_satisfaction: float = None,
+        max_satisfaction: float = None,
+        limit: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Profiles matching every given condition, answered from the indexes
+
+        Args:
+            segment: CustomerSegment value, e.g. "family"
+            usage_pattern: UsagePattern value, e.g. "heavy"
+            contract_end_before: Contracts ending before this date (exclusive)
+            contract_end_after: Contracts ending on or after this date
+            min_satisfaction: Lowest satisfaction_score (inclusive)
+            max_satisfaction: Highest satisfaction_score (inclusive)
+            limit: Maximum number of profiles
+
+        Returns:
+            Profile dicts ordered by customer_id
+        """
+        conditions = [
+            ("segment = ?", getattr(segment, "value", segment)),
+            ("usage_pattern = ?", getattr(usage_pattern, "value", usage_pattern)),
+            ("contract_end_date < ?", _date_key(contract_end_before)),
+            ("contract_end_date >= ?", _date_key(contract_end_after)),
+            ("satisfaction_score >= ?", min_satisfaction),
+            ("satisfaction_score <= ?", max_satisfaction)
+        ]
+        conditions = [(clause, value) for clause, value in conditions if value is not None]
+        query = "SELECT profile FROM profiles"
+        if conditions:
+            query += " WHERE " + " AND ".join(clause for clause, _ in conditions)
+        query += " ORDER BY customer_id"
+        parameters = [value for _, value in conditions]
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            self._flush()
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [loads(profile) for profile, in rows]
+
+    def delete(self, customer_id: str) -> bool:
+        """Remove a customer's profile; False if there was none"""
+        with self._lock:
+            pending = self._pending.pop(customer_id, None) is not None
+            cursor = self._connection.execute("DELETE FROM profiles WHERE customer_id = ?", (customer_id,))
+        return pending or cursor.rowcount > 0
+
+    def __contains__(self, customer_id: str) -> bool:
+        with self._lock:
+            if customer_id in self._pending:
+                return True
+            return self._connection.execute(
+                "SELECT 1 FROM profiles WHERE customer_id = ?", (customer_id,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush()
+            return self._connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def close(self) -> None:
+        """Flush buffered profiles and close the database"""
+        self._finalizer()
+
+    def __enter__(self) -> "ProfileStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,804 @@
+import functools
+import operator
+import time
+from typing import Dict, Iterator, List, Any, Optional, TypedDict, Annotated, get_type_hints
+
+from .agents.pitch_generator import PitchResult
+from .agents.plan_analyzer import PlanPair
+from .agents.tool_registry import TOOL_REGISTRY
+from .models.customer_profile import CustomerProfile, TelecomPlan, PlanComparison
+from .node_cache import NodeCache, memoized_node
+from .profile_store import ProfileStore
+from .serialization import loads, to_jsonable
+from .single_flight import SingleFlight, request_key
+from .telemetry import TELEMETRY, NODE, REQUEST, SERIALIZATION, VALIDATION
+
+
+class AgentState(TypedDict):
+    """State shared across the workflow nodes"""
+    messages: Annotated[List[Dict], operator.add]
+    customer_conversation: str
+    current_plan: Dict[str, Any]
+    target_plan: Dict[str, Any]
+    usage_data: Dict[str, Any]
+    customer_profile: Dict[str, Any]
+    plan_comparison: Dict[str, Any]
+    personalized_pitch: Dict[str, Any]
+    step: str
+    error: str
+    
+    # Validated models passed between nodes in typed-state mode
+    profile_model: Optional[CustomerProfile]
+    comparison_model: Optional[PlanComparison]
+    pitch_model: Optional[PitchResult]
+    
+    # Customer-independent plan analysis, computed in parallel with profiling
+    plan_pair: Optional[PlanPair]
+    plan_pair_error: str
+    
+    # Multi-target mode: candidate plans compared in parallel branches, each
+    # branch appending a CandidateComparison; the top_n are ranked and pitched
+    target_plans: List[Dict[str, Any]]
+    top_n: int
+    candidate_comparisons: Annotated[List[Dict[str, Any]], operator.add]
+    candidates: List[Dict[str, Any]]
+    
+    # Per-request deadline as a time.monotonic() value (None: no deadline);
+    # nodes starting after it are skipped and listed in deadline_skipped
+    deadline: Optional[float]
+    deadline_skipped: Annotated[List[str], operator.add]
+
+
+class CandidateBranch(TypedDict):
+    """Input of one compare_candidate branch in multi-target mode"""
+    index: int
+    current_plan: Dict[str, Any]
+    target_plan: Dict[str, Any]
+    customer_profile: Dict[str, Any]
+    profile_model: Optional[CustomerProfile]
+    deadline: Optional[float]
+
+
+# Reducers of the Annotated state keys (e.g. messages -> operator.add); all
+# other keys are overwritten by node updates, as in LangGraph
+STATE_REDUCERS = {
+    key: hint.__metadata__[0]
+    for key, hint in get_type_hints(AgentState, include_extras=True).items()
+    if hasattr(hint, "__metadata__")
+}
+
+
+def merge_state_update(state: AgentState, update: Dict[str, Any]) -> AgentState:
+    """Apply a node's partial update to `state` in place, using the key reducers"""
+    for key, value in update.items():
+        reducer = STATE_REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer and key in state else value
+    return state
+
+
+def deadline_checked(node):
+    """
+    Skip a SalesPipeline node that would start after the request deadline.
+    
+    A skipped node only appends its name to `deadline_skipped` (and a
+    message), so whatever earlier nodes produced is returned as a partial
+    result. Nodes are not interrupted once started.
+    """
+    name = node.__name__.lstrip("_")
+    
+    @functools.wraps(node)
+    def wrapper(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        deadline = state.get("deadline")
+        if deadline is not None and time.monotonic() >= deadline:
+            return {
+                "deadline_skipped": [name],
+                "messages": [{"role": "assistant", "content": f"⏱️ Deadline exceeded, skipped {name}."}]
+            }
+        return node(self, state)
+    
+    return wrapper
+
+
+class SalesPipeline:
+    """
+    The validate -> profile -> compare -> pitch rules shared by every runner.
+    
+    Holds the workflow node functions and the state/result conversions but no
+    orchestration, so it imports neither LangGraph nor an LLM client. Nodes
+    use the shared tools from TOOL_REGISTRY and keep no per-request state on
+    `self`, so one pipeline can serve concurrent requests.
+    Subclasses set `self.app` to an object with `invoke(state)` and
+    `ainvoke(state)` that runs the nodes (a compiled LangGraph, or the plain
+    DeterministicPipeline).
+    """
+    
+    # Analyze the plan pair in its own node alongside profiling. The rules are
+    # CPU-bound, so the branches only overlap where nodes can run concurrently;
+    # set to False to fold the plan-pair analysis back into compare_plans and
+    # save a graph step.
+    parallel_plan_analysis = True
+    
+    def __init__(self, typed_state: bool = False, node_cache: NodeCache = None, single_flight: SingleFlight = None,
+                 profile_store: ProfileStore = None):
+        """
+        Args:
+            typed_state: Pass validated pydantic models between nodes instead of
+                JSON strings/dicts; results are serialized once when returned
+            node_cache: Optional NodeCache; nodes whose inputs are unchanged
+                are then served from it instead of running again
+            single_flight: Optional SingleFlight; concurrent identical
+                process_customer calls then share one workflow run
+            profile_store: Optional ProfileStore; a customer's stored profile
+                is then used as existing_profile when none is passed (with the
+                segment re-classified and usage_data's details applied), and
+                the updated profile is saved back after every run
+        """
+        self.typed_state = typed_state
+        self.node_cache = node_cache
+        self.single_flight = single_flight
+        self.profile_store = profile_store
+    
+    # Nodes return only the keys they update; the runner merges them into the
+    # state and the `messages` reducer appends the new messages.
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    def _validate_inputs(self, state: AgentState) -> Dict[str, Any]:
+        """Validate required inputs before processing"""
+        try:
+            required_fields = [
+                "customer_conversation",
+                "current_plan", 
+                "target_plan",
+                "usage_data"
+            ]
+            
+            missing_fields = []
+            for field in required_fields:
+                value = state.get(field)
+                if field == "target_plan" and not value:
+                    # A list of candidate plans stands in for a single target
+                    value = state.get("target_plans")
+                if not value:
+                    missing_fields.append(field)
+            
+            if missing_fields:
+                return {"error": f"Missing required fields: {', '.join(missing_fields)}", "step": "error"}
+            
+            return {"step": "validation_passed", "error": ""}
+            
+        except Exception as e:
+            return {"error": f"Validation error: {str(e)}", "step": "error"}
+    
+    def _route_after_validation(self, state: AgentState) -> str:
+        """Route based on validation results"""
+        if state.get("error"):
+            return "error"
+        return "analyze"
+    
+    def _analyzes_plan_pair(self, state: AgentState) -> bool:
+        """Whether analyze_plan_pair runs alongside analyze_customer (single-target requests)"""
+        return self.parallel_plan_analysis and not state.get("target_plans")
+    
+    def _route_after_analysis(self, state: AgentState) -> str:
+        """Route to the single comparison, the candidate fan-out, or the end on a failed analysis"""
+        if not state.get("target_plans"):
+            return "compare"
+        if state.get("error"):
+            return "end"
+        return "compare_candidates"
+    
+    def _candidate_branches(self, state: AgentState) -> List[CandidateBranch]:
+        """One compare_candidate input per target plan, for the fan-out after profiling"""
+        return [
+            CandidateBranch(
+                index=index,
+                current_plan=state["current_plan"],
+                target_plan=target_plan,
+                customer_profile=state.get("customer_profile", {}),
+                profile_model=state.get("profile_model"),
+                deadline=state.get("deadline")
+            )
+            for index, target_plan in enumerate(state["target_plans"])
+        ]
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    @memoized_node("customer_conversation", "usage_data", "customer_profile")
+    def _analyze_customer(self, state: AgentState) -> Dict[str, Any]:
+        """Analyze customer conversation and usage to build profile"""
+        try:
+            profiler = TOOL_REGISTRY.profiler
+            
+            if self.typed_state:
+                try:
+                    profile = profiler.profile(
+                        customer_conversation=state["customer_conversation"],
+                        usage_data=state["usage_data"],
+                        existing_profile=state.get("customer_profile", {})
+                    )
+                except Exception as e:
+                    return {"error": f"Error profiling customer: {str(e)}", "step": "error"}
+                
+                update = {"profile_model": profile}
+                segment, usage_pattern = profile.segment.value, profile.usage_pattern.value
+            else:
+                # Run customer profiling
+                profile_result = profiler._run(
+                    customer_conversation=state["customer_conversation"],
+                    usage_data=state["usage_data"],
+                    existing_profile=state.get("customer_profile", {})
+                )
+                
+                if profile_result.startswith("Error"):
+                    return {"error": profile_result, "step": "error"}
+                
+                with TELEMETRY.span(SERIALIZATION, "analyze_customer"):
+                    customer_profile = loads(profile_result)
+                update = {"customer_profile": customer_profile}
+                segment, usage_pattern = customer_profile['segment'], customer_profile['usage_pattern']
+            
+            update["step"] = "customer_analyzed"
+            update["messages"] = [{
+                "role": "assistant",
+                "content": f"✅ Customer profile analyzed successfully. Identified as {segment} segment with {usage_pattern} usage pattern."
+            }]
+            return update
+            
+        except Exception as e:
+            return {"error": f"Customer analysis error: {str(e)}", "step": "error"}
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    def _analyze_plan_pair(self, state: AgentState) -> Dict[str, Any]:
+        """Analyze the customer-independent plan differences while the customer is profiled"""
+        # Runs in the same step as analyze_customer, so it only writes its own keys
+        try:
+            with TELEMETRY.span(VALIDATION, "analyze_plan_pair"):
+                current, target = TelecomPlan(**state["current_plan"]), TelecomPlan(**state["target_plan"])
+            plan_pair = TOOL_REGISTRY.analyzer.analyze_pair(current, target)
+        except Exception as e:
+            return {"plan_pair_error": f"Error analyzing plans: {str(e)}"}
+        return {"plan_pair": plan_pair}
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    @memoized_node("current_plan", "target_plan", "customer_profile", "profile_model", "plan_pair_error")
+    def _compare_plans(self, state: AgentState) -> Dict[str, Any]:
+        """Join the plan pair analysis with the customer profile"""
+        try:
+            analyzer = TOOL_REGISTRY.analyzer
+            
+            if state.get("plan_pair_error"):
+                return {"error": state["plan_pair_error"], "step": "error"}
+            
+            try:
+                plan_pair = state.get("plan_pair") or analyzer.analyze_pair(
+                    TelecomPlan(**state["current_plan"]),
+                    TelecomPlan(**state["target_plan"])
+                )
+                if self.typed_state:
+                    customer = state["profile_model"]
+                else:
+                    with TELEMETRY.span(VALIDATION, "compare_plans"):
+                        customer = CustomerProfile(**state["customer_profile"])
+                comparison_model = analyzer.compare_pair(plan_pair, customer)
+            except Exception as e:
+                return {"error": f"Error analyzing plans: {str(e)}", "step": "error"}
+            
+            if self.typed_state:
+                update = {"comparison_model": comparison_model}
+                savings = comparison_model.monthly_savings
+                suitability = comparison_model.suitability_score
+            else:
+                # Same JSON form as PlanAnalyzer._run returns
+                with TELEMETRY.span(SERIALIZATION, "compare_plans"):
+                    comparison = to_jsonable(comparison_model)
+                update = {"plan_comparison": comparison}
+                savings = comparison["monthly_savings"]
+                suitability = comparison["suitability_score"]
+            
+            if savings > 0:
+                savings_msg = f"saves ${savings:.2f}/month"
+            elif savings < 0:
+                savings_msg = f"costs ${abs(savings):.2f}/month more"
+            else:
+                savings_msg = "same cost"
+            
+            update["step"] = "plans_compared"
+            update["messages"] = [{
+                "role": "assistant", 
+                "content": f"📊 Plan comparison completed. Target plan {savings_msg} with {suitability:.1f}/10 suitability score."
+            }]
+            return update
+            
+        except Exception as e:
+            return {"error": f"Plan comparison error: {str(e)}", "step": "error"}
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    @memoized_node("customer_profile", "plan_comparison", "profile_model", "comparison_model")
+    def _generate_pitch(self, state: AgentState) -> Dict[str, Any]:
+        """Generate personalized sales pitch"""
+        try:
+            pitch_generator = TOOL_REGISTRY.pitch_generator
+            
+            if self.typed_state:
+                try:
+                    pitch = pitch_generator.generate(
+                        customer=state["profile_model"],
+                        comparison=state["comparison_model"],
+                        sales_context=""
+                    )
+                except Exception as e:
+                    return {"error": f"Error generating pitch: {str(e)}", "step": "error"}
+                
+                update = {"pitch_model": pitch}
+            else:
+                # Generate personalized pitch
+                pitch_result = pitch_generator._run(
+                    customer_profile=state["customer_profile"],
+                    plan_comparison=state["plan_comparison"],
+                    sales_context=""
+                )
+                
+                if pitch_result.startswith("Error"):
+                    return {"error": pitch_result, "step": "error"}
+                
+                with TELEMETRY.span(SERIALIZATION, "generate_pitch"):
+                    update = {"personalized_pitch": loads(pitch_result)}
+            
+            update["step"] = "pitch_generated"
+            update["messages"] = [{
+                "role": "assistant",
+                "content": "🎯 Personalized sales pitch generated successfully!"
+            }]
+            return update
+            
+        except Exception as e:
+            return {"error": f"Pitch generation error: {str(e)}", "step": "error"}
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    @memoized_node("index", "current_plan", "target_plan", "customer_profile", "profile_model")
+    def _compare_candidate(self, branch: CandidateBranch) -> Dict[str, Any]:
+        """Compare the current plan with one candidate plan (one fan-out branch)"""
+        analyzer = TOOL_REGISTRY.analyzer
+        candidate = {"index": branch["index"], "comparison": None, "error": ""}
+        try:
+            if self.typed_state:
+                candidate["comparison"] = analyzer.compare(
+                    current=TelecomPlan(**branch["current_plan"]),
+                    target=TelecomPlan(**branch["target_plan"]),
+                    customer=branch["profile_model"]
+                )
+            else:
+                comparison_result = analyzer._run(
+                    current_plan=branch["current_plan"],
+                    target_plan=branch["target_plan"],
+                    customer_profile=branch["customer_profile"]
+                )
+                if comparison_result.startswith("Error"):
+                    candidate["error"] = comparison_result
+                else:
+                    candidate["comparison"] = loads(comparison_result)
+        except Exception as e:
+            candidate["error"] = f"Error analyzing plans: {str(e)}"
+        
+        return {"candidate_comparisons": [candidate]}
+    
+    @TELEMETRY.traced(NODE)
+    def _rank_candidates(self, state: AgentState) -> Dict[str, Any]:
+        """Join the compare branches and keep the top_n candidates by suitability"""
+        # A cheap join, so it runs past the deadline to rank what was compared
+        compared = [c for c in state.get("candidate_comparisons", []) if c["comparison"] is not None]
+        if not compared:
+            if state.get("deadline_skipped"):
+                return {}
+            return {"error": "No candidate plan could be compared", "step": "error"}
+        
+        def score(candidate: Dict[str, Any]) -> tuple:
+            comparison = candidate["comparison"]
+            if self.typed_state:
+                return comparison.suitability_score, comparison.monthly_savings
+            return comparison["suitability_score"], comparison["monthly_savings"]
+        
+        # Best suitability first, then savings; ties keep the input order
+        ranked = sorted(compared, key=lambda c: c["index"])
+        ranked.sort(key=score, reverse=True)
+        top = ranked[:max(1, state.get("top_n") or 1)]
+        best = top[0]
+        
+        update = {
+            "candidates": [dict(candidate, pitch=None) for candidate in top],
+            "step": "plans_compared"
+        }
+        if self.typed_state:
+            update["comparison_model"] = best["comparison"]
+        else:
+            update["plan_comparison"] = best["comparison"]
+        
+        suitability, _ = score(best)
+        update["messages"] = [{
+            "role": "assistant",
+            "content": f"📊 Compared {len(state['target_plans'])} candidate plans. Best candidate #{best['index'] + 1} "
+                       f"scores {suitability:.1f}/10 suitability."
+        }]
+        return update
+    
+    @TELEMETRY.traced(NODE)
+    @deadline_checked
+    @memoized_node("error", "candidates", "customer_profile", "profile_model")
+    def _pitch_candidates(self, state: AgentState) -> Dict[str, Any]:
+        """Generate a pitch for each ranked candidate; the best one becomes the main pitch"""
+        if state.get("error"):
+            return {}
+        
+        pitch_generator = TOOL_REGISTRY.pitch_generator
+        candidates = []
+        for candidate in state["candidates"]:
+            candidate = dict(candidate)
+            try:
+                if self.typed_state:
+                    candidate["pitch"] = pitch_generator.generate(
+                        customer=state["profile_model"],
+                        comparison=candidate["comparison"],
+                        sales_context=""
+                    )
+                else:
+                    pitch_result = pitch_generator._run(
+                        customer_profile=state["customer_profile"],
+                        plan_comparison=candidate["comparison"],
+                        sales_context=""
+                    )
+                    if pitch_result.startswith("Error"):
+                        candidate["error"] = pitch_result
+                    else:
+                        candidate["pitch"] = loads(pitch_result)
+            except Exception as e:
+                candidate["error"] = f"Error generating pitch: {str(e)}"
+            candidates.append(candidate)
+        
+        best = candidates[0]
+        if best["pitch"] is None:
+            return {"candidates": candidates, "error": best["error"], "step": "error"}
+        
+        update = {"candidates": candidates, "step": "pitch_generated"}
+        if self.typed_state:
+            update["pitch_model"] = best["pitch"]
+        else:
+            update["personalized_pitch"] = best["pitch"]
+        update["messages"] = [{
+            "role": "assistant",
+            "content": f"🎯 Personalized sales pitches generated for the top {len(candidates)} candidate plan(s)!"
+        }]
+        return update
+    
+    @TELEMETRY.traced(NODE)
+    def _handle_error(self, state: AgentState) -> Dict[str, Any]:
+        """Handle errors in processing"""
+        return {
+            "messages": [{
+                "role": "assistant",
+                "content": f"❌ Error occurred: {state['error']}"
+            }]
+        }
+    
+    def _initial_state(
+        self,
+        customer_conversation: str,
+        current_plan: Dict[str, Any],
+        target_plan: Dict[str, Any],
+        usage_data: Dict[str, Any],
+        existing_profile: Dict[str, Any] = None,
+        target_plans: List[Dict[str, Any]] = None,
+        top_n: int = 1,
+        timeout: float = None
+    ) -> AgentState:
+        """Build the initial workflow state for one customer; the deadline starts now"""
+        if existing_profile is None and self.profile_store is not None:
+            customer_id = self._stored_customer_id(usage_data)
+            stored = self.profile_store.get(customer_id) if customer_id is not None else None
+            if stored is not None:
+                existing_profile = self._returning_profile(stored, usage_data)
+        return AgentState(
+            messages=[],
+            customer_conversation=customer_conversation,
+            current_plan=current_plan,
+            target_plan=target_plan,
+            usage_data=usage_data,
+            customer_profile=existing_profile or {},
+            plan_comparison={},
+            personalized_pitch={},
+            step="start",
+            error="",
+            profile_model=None,
+            comparison_model=None,
+            pitch_model=None,
+            plan_pair=None,
+            plan_pair_error="",
+            target_plans=target_plans or [],
+            top_n=top_n,
+            candidate_comparisons=[],
+            candidates=[],
+            deadline=time.monotonic() + timeout if timeout is not None else None,
+            deadline_skipped=[]
+        )
+    
+    def _flight_key(self, state: AgentState, timeout: float = None) -> str:
+        """Canonical hash of the request inputs in an initial state, for single-flight coalescing"""
+        # Only requests with the same timeout share a run (and so its deadline)
+        return request_key(
+            state["customer_conversation"], state["current_plan"], state["target_plan"], state["usage_data"],
+            state["customer_profile"], state["target_plans"], state["top_n"], timeout
+        )
+    
+    async def _run(self, initial_state: AgentState) -> Dict[str, Any]:
+        """Run the workflow on an initial state and build the result"""
+        # The request span is the root of the nodes' spans
+        with TELEMETRY.span(REQUEST, type(self).__name__):
+            result = await self.app.ainvoke(initial_state)
+            output = self._build_result(result)
+        self._save_profile(initial_state, output)
+        return output
+    
+    def _run_sync(self, initial_state: AgentState) -> Dict[str, Any]:
+        """Synchronous version of _run"""
+        with TELEMETRY.span(REQUEST, type(self).__name__):
+            result = self.app.invoke(initial_state)
+            output = self._build_result(result)
+        self._save_profile(initial_state, output)
+        return output
+    
+    @staticmethod
+    def _stored_customer_id(usage_data: Any) -> Optional[str]:
+        """The profile store key of a request; None for anonymous customers, who are never loaded or saved"""
+        customer_id = usage_data.get("customer_id") if isinstance(usage_data, dict) else None
+        return str(customer_id) if customer_id not in (None, "") else None
+    
+    @staticmethod
+    def _returning_profile(stored: Dict[str, Any], usage_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        A stored profile as the existing_profile of a new interaction
+        
+        The segment is dropped so the profiler classifies it from this
+        conversation, and the name, location and spend in this interaction's
+        usage data replace the stored ones. Profiles passed by the caller
+        are used as given.
+        """
+        profile = {key: value for key, value in stored.items() if key != "segment"}
+        for field, key in (("name", "name"), ("location", "location"), ("current_monthly_spend", "current_spend")):
+            if usage_data.get(key) is not None:
+                profile[field] = usage_data[key]
+        return profile
+    
+    def _save_profile(self, initial_state: AgentState, output: Dict[str, Any]) -> None:
+        """Save the profile a run built or updated to the profile store, if there is one"""
+        profile = output.get("customer_profile")
+        if self.profile_store is None or not profile:
+            return
+        customer_id = self._stored_customer_id(initial_state["usage_data"])
+        if customer_id is None or self.profile_store.get(customer_id) == profile:
+            return
+        self.profile_store.put(profile)
+    
+    def _build_result(self, result: AgentState) -> Dict[str, Any]:
+        """Convert the final workflow state into the public result dictionary"""
+        customer_profile = result.get("customer_profile", {})
+        plan_comparison = result.get("plan_comparison", {})
+        personalized_pitch = result.get("personalized_pitch", {})
+        
+        # In typed-state mode this is the only place models are serialized
+        with TELEMETRY.span(SERIALIZATION, "build_result"):
+            if result.get("profile_model") is not None:
+                customer_profile = to_jsonable(result["profile_model"])
+            if result.get("comparison_model") is not None:
+                plan_comparison = to_jsonable(result["comparison_model"])
+            if result.get("pitch_model") is not None:
+                personalized_pitch = to_jsonable(result["pitch_model"])
+        
+        output = {
+            "customer_profile": customer_profile,
+            "plan_comparison": plan_comparison,
+            "personalized_pitch": personalized_pitch,
+            "messages": result.get("messages", []),
+            "success": not bool(result.get("error")),
+            "error": result.get("error", "")
+        }
+        if result.get("target_plans"):
+            output["candidates"] = [self._candidate_result(result, c) for c in result.get("candidates", [])]
+            output["candidate_errors"] = [
+                {"plan_id": result["target_plans"][c["index"]].get("plan_id"), "error": c["error"]}
+                for c in sorted(result.get("candidate_comparisons", []), key=lambda c: c["index"])
+                if c["error"]
+            ]
+        if result.get("deadline") is not None:
+            # Partial result: whatever ran before the deadline, without the skipped nodes' output
+            skipped = list(dict.fromkeys(result.get("deadline_skipped", [])))
+            output["deadline_exceeded"] = bool(skipped)
+            output["skipped_nodes"] = skipped
+            if skipped and not output["error"]:
+                output["success"] = False
+                output["error"] = f"Deadline exceeded; skipped {', '.join(skipped)}"
+        return output
+    
+    def _candidate_result(self, result: AgentState, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Public form of a ranked candidate in multi-target mode"""
+        comparison, pitch = candidate["comparison"], candidate.get("pitch")
+        if self.typed_state:
+            comparison, pitch = to_jsonable(comparison), to_jsonable(pitch)
+        return {
+            "plan_id": result["target_plans"][candidate["index"]].get("plan_id"),
+            "index": candidate["index"],
+            "plan_comparison": comparison,
+            "personalized_pitch": pitch or {},
+            "error": candidate.get("error", "")
+        }
+    
+    async def process_customer(
+        self,
+        customer_conversation: str,
+        current_plan: Dict[str, Any],
+        target_plan: Dict[str, Any],
+        usage_data: Dict[str, Any],
+        existing_profile: Dict[str, Any] = None,
+        target_plans: List[Dict[str, Any]] = None,
+        top_n: int = 1,
+        timeout: float = None
+    ) -> Dict[str, Any]:
+        """
+        Process a customer interaction and generate personalized pitch
+        
+        Args:
+            customer_conversation: Text from customer interaction
+            current_plan: Current telecom plan details
+            target_plan: Target plan to pitch
+            usage_data: Customer usage statistics
+            existing_profile: Optional existing customer profile, whose segment
+                and details are kept; when omitted, the profile_store's profile
+                for usage_data's customer_id is used, with its segment
+                re-classified and the details in usage_data applied
+            target_plans: Candidate plans to compare instead of a single
+                target_plan; the customer is profiled once, each candidate is
+                compared in its own branch and only the best are pitched
+            top_n: Number of best candidates to pitch in multi-target mode
+            timeout: Seconds the request may take; nodes that would start
+                later are skipped and the result is partial (e.g. profile and
+                comparison without a pitch), with `deadline_exceeded` set
+            
+        Returns:
+            Dictionary containing analysis results and personalized pitch; in
+            multi-target mode plan_comparison/personalized_pitch are the best
+            candidate's and `candidates` lists the ranked top_n
+        """
+        
+        # Initialize state
+        initial_state = self._initial_state(
+            customer_conversation, current_plan, target_plan, usage_data, existing_profile, target_plans, top_n, timeout
+        )
+        
+        # Run the workflow, sharing the run with identical in-flight requests
+        if self.single_flight is None:
+            return await self._run(initial_state)
+        return await self.single_flight.do(
+            self._flight_key(initial_state, timeout), lambda: self._run(initial_state), initial_state["deadline"]
+        )
+    
+    def process_customer_sync(
+        self,
+        customer_conversation: str,
+        current_plan: Dict[str, Any], 
+        target_plan: Dict[str, Any],
+        usage_data: Dict[str, Any],
+        existing_profile: Dict[str, Any] = None,
+        target_plans: List[Dict[str, Any]] = None,
+        top_n: int = 1,
+        timeout: float = None
+    ) -> Dict[str, Any]:
+        """
+        Synchronous version of process_customer
+        """
+        
+        # Initialize state
+        initial_state = self._initial_state(
+            customer_conversation, current_plan, target_plan, usage_data, existing_profile, target_plans, top_n, timeout
+        )
+        
+        # Run the workflow synchronously, sharing the run with identical in-flight requests
+        if self.single_flight is None:
+            return self._run_sync(initial_state)
+        return self.single_flight.do_sync(
+            self._flight_key(initial_state, timeout), lambda: self._run_sync(initial_state), initial_state["deadline"]
+        )
+    
+    def stream_customer_sync(
+        self,
+        customer_conversation: str,
+        current_plan: Dict[str, Any],
+        target_plan: Dict[str, Any],
+        usage_data: Dict[str, Any],
+        existing_profile: Dict[str, Any] = None,
+        target_plans: List[Dict[str, Any]] = None,
+        top_n: int = 1,
+        timeout: float = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Like process_customer_sync, but yields the result as it builds up
+        
+        A partial result dictionary is yielded after each workflow step, so a
+        UI can show the profile, then the comparison, then the pitch as each
+        one finishes. The last one yielded equals what process_customer_sync
+        returns. Streams are not coalesced by single_flight.
+        """
+        initial_state = self._initial_state(
+            customer_conversation, current_plan, target_plan, usage_data, existing_profile, target_plans, top_n, timeout
+        )
+        output = None
+        for state in self.app.stream(initial_state, stream_mode="values"):
+            output = self._build_result(state)
+            yield output
+        if output is not None:
+            self._save_profile(initial_state, output)
+    
+    def format_pitch_for_sales_rep(self, result: Dict[str, Any]) -> str:
+        """
+        Format the generated pitch for easy use by sales representatives
+        """
+        if not result["success"]:
+            return f"❌ Error generating pitch: {result['error']}"
+        
+        pitch = result["personalized_pitch"]
+        customer = result["customer_profile"]
+        comparison = result["plan_comparison"]
+        
+        formatted_pitch = f"""
+🎯 PERSONALIZED SALES PITCH FOR {customer['name'].upper()}
+
+📞 OPENING:
+{pitch['opening_hook']}
+
+💡 ADDRESS THEIR CONCERNS:
+{pitch['pain_point_address']}
+
+🌟 VALUE PROPOSITION:
+{pitch['value_proposition']}
+
+⭐ KEY FEATURES TO HIGHLIGHT:
+"""
+        for feature in pitch['feature_highlights']:
+            formatted_pitch += f"• {feature}\n"
+        
+        formatted_pitch += f"""
+💰 COST BENEFITS:
+{pitch['cost_benefit_analysis']}
+
+🛡️ OBJECTION HANDLING:
+"""
+        for objection, response in pitch['objection_handling'].items():
+            formatted_pitch += f"• {objection.replace('_', ' ').title()}: {response}\n"
+        
+        formatted_pitch += f"""
+🚀 CALL TO ACTION:
+{pitch['call_to_action']}
+
+⏰ URGENCY FACTORS:
+"""
+        for factor in pitch['urgency_factors']:
+            formatted_pitch += f"• {factor}\n"
+        
+        formatted_pitch += f"""
+👤 PERSONAL TOUCHES:
+"""
+        for note in pitch['personalization_notes']:
+            formatted_pitch += f"• {note}\n"
+        
+        formatted_pitch += f"""
+📊 PLAN COMPARISON SUMMARY:
+• Monthly savings: ${comparison['monthly_savings']:.2f}
+• Annual savings: ${comparison['annual_savings']:.2f}
+• Data: {comparison['data_difference']}
+• Voice: {comparison['voice_difference']}
+• Suitability Score: {comparison['suitability_score']:.1f}/10
+"""
+        
+        return formatted_pitch
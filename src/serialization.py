@@ -0,0 +1,113 @@
+"""
+JSON and MessagePack encoding for tool outputs, results and API responses.
+
+Everything the package serializes goes through this module, so the
+backend is chosen in one place: orjson when it is installed, otherwise the
+standard json module, and msgpack for binary API responses when it is
+installed. Output is compact unless `pretty=True`, which is only meant for
+people reading it. Pydantic models are dumped with pydantic's compiled
+serializer instead of `.dict()` plus a `default=str` fallback.
+"""
+
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _default(value: Any) -> Any:
+    """Fallback for values the encoders do not handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def to_jsonable(value: Any) -> Any:
+    """JSON-compatible form of a model (dicts, lists and ISO date strings); other values unchanged"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return value
+
+
+def dumps(value: Any, pretty: bool = False) -> str:
+    """
+    JSON text of a model or JSON-like value
+
+    Args:
+        value: Pydantic model, or dicts/lists/scalars (models, datetimes and
+            enums may be nested)
+        pretty: Indent by two spaces, for human display only
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump_json(indent=2 if pretty else None)
+    if orjson is not None:
+        return dumps_bytes(value, pretty).decode("utf-8")
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False, default=_default)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def dumps_bytes(value: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON of a value, as dumps() but without decoding orjson's bytes"""
+    if orjson is not None and not isinstance(value, BaseModel):
+        options = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if pretty else _ORJSON_OPTIONS
+        return orjson.dumps(value, default=_default, option=options)
+    return dumps(value, pretty).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes; raises ValueError on invalid JSON"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """Compact JSON with sorted keys, so equal values encode (and hash) identically"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS | orjson.OPT_SORT_KEYS)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def encode_response(value: Any, accept: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Body and media type of an API response
+
+    MessagePack when the client accepts application/msgpack and msgpack is
+    installed, compact JSON otherwise.
+    """
+    if msgpack is not None and accept and MSGPACK_MEDIA_TYPE in accept:
+        return msgpack.packb(value, default=_default), MSGPACK_MEDIA_TYPE
+    return dumps_bytes(value), JSON_MEDIA_TYPE
+
+
+def decode_response(body: bytes, media_type: str = JSON_MEDIA_TYPE) -> Any:
+    """Decode a body produced by encode_response"""
+    if media_type.startswith(MSGPACK_MEDIA_TYPE):
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        return msgpack.unpackb(body)
+    return loads(body)
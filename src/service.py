@@ -0,0 +1,197 @@
+"""
+ASGI service exposing the telecom sales agent.
+
+Run with:
+    uvicorn src.service:create_app --factory --host 0.0.0.0 --port 8000
+
+Configuration comes from create_app() arguments or the environment:
+    TELECOM_SERVICE_PROCESSES   worker processes (default: CPU count; 0 = one in-process thread)
+    TELECOM_SERVICE_QUEUE_SIZE  interactive tasks allowed to wait for a worker (default: 256)
+    TELECOM_SERVICE_BATCH_QUEUE_SIZE
+                                batch tasks allowed to wait for a worker (default: the queue size)
+    TELECOM_PLAN_CATALOG        JSON file with the plan catalog used by /recommend
+    TELECOM_PLAN_SNAPSHOT       catalog snapshot file (see publish_snapshot) used instead;
+                                workers map it shared and pick up republished snapshots
+    OPENAI_API_KEY              passed to the workers' agents
+
+Responses are compact JSON (orjson when installed), or MessagePack for
+clients sending `Accept: application/msgpack` when msgpack is installed.
+"""
+
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel, Field
+
+from .serialization import encode_response, loads
+from .single_flight import SingleFlight, request_key
+from .telemetry import TELEMETRY
+from .worker_pool import BATCH, INTERACTIVE, AgentWorkerPool, QueueFullError
+
+
+# Upper bound on the items of one /batch request
+MAX_BATCH_ITEMS = 10000
+
+
+class AnalyzeRequest(BaseModel):
+    """Arguments of TelecomSalesAgent.process_customer"""
+    customer_conversation: str
+    current_plan: Dict[str, Any]
+    target_plan: Optional[Dict[str, Any]] = None
+    usage_data: Dict[str, Any]
+    existing_profile: Optional[Dict[str, Any]] = None
+    target_plans: Optional[List[Dict[str, Any]]] = None
+    top_n: int = Field(default=1, ge=1)
+    timeout: Optional[float] = Field(default=None, gt=0, description="Seconds until the deadline; partial result after it")
+    priority: Literal["interactive", "batch"] = INTERACTIVE
+
+
+class BatchRequest(BaseModel):
+    items: List[AnalyzeRequest] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+    priority: Literal["interactive", "batch"] = BATCH
+
+
+class RecommendRequest(BaseModel):
+    customer_conversation: str
+    usage_data: Dict[str, Any]
+    current_plan: Dict[str, Any]
+    existing_profile: Optional[Dict[str, Any]] = None
+    k: int = Field(default=3, ge=1, le=50)
+    priority: Literal["interactive", "batch"] = INTERACTIVE
+
+
+def load_catalog(path: str) -> List[Dict[str, Any]]:
+    """Read a plan catalog: a JSON list of plans, or an object with a "plans" list"""
+    with open(path, "rb") as handle:
+        catalog = loads(handle.read())
+    return catalog["plans"] if isinstance(catalog, dict) else catalog
+
+
+def create_app(
+    processes: int = None,
+    queue_size: int = None,
+    batch_queue_size: int = None,
+    catalog: Sequence[Dict[str, Any]] = None,
+    catalog_snapshot: str = None,
+    typed_state: bool = True,
+    openai_api_key: str = None
+) -> FastAPI:
+    """
+    Build the service; its worker pool starts (and warms up) with the app's lifespan.
+
+    Arguments left as None are read from the environment (see the module docstring).
+    """
+    if processes is None and os.environ.get("TELECOM_SERVICE_PROCESSES"):
+        processes = int(os.environ["TELECOM_SERVICE_PROCESSES"])
+    if queue_size is None:
+        queue_size = int(os.environ.get("TELECOM_SERVICE_QUEUE_SIZE", "256"))
+    if batch_queue_size is None and os.environ.get("TELECOM_SERVICE_BATCH_QUEUE_SIZE"):
+        batch_queue_size = int(os.environ["TELECOM_SERVICE_BATCH_QUEUE_SIZE"])
+    if catalog_snapshot is None:
+        catalog_snapshot = os.environ.get("TELECOM_PLAN_SNAPSHOT") or None
+    if catalog is None and catalog_snapshot is None and os.environ.get("TELECOM_PLAN_CATALOG"):
+        catalog = load_catalog(os.environ["TELECOM_PLAN_CATALOG"])
+
+    pool = AgentWorkerPool(
+        processes=processes,
+        queue_size=queue_size,
+        batch_queue_size=batch_queue_size,
+        typed_state=typed_state,
+        openai_api_key=openai_api_key or os.environ.get("OPENAI_API_KEY"),
+        catalog=catalog,
+        catalog_snapshot=catalog_snapshot
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        pool.start()
+        try:
+            yield
+        finally:
+            pool.close()
+
+    # Identical concurrent /analyze and /recommend requests share one worker task
+    flights = SingleFlight()
+    
+    app = FastAPI(title="Telecom Sales Agent", lifespan=lifespan)
+    app.state.pool = pool
+    app.state.single_flight = flights
+
+    async def run(path: str, work, key: str = None, deadline: float = None):
+        """Await pool work inside a span, coalesced by `key` if given, shedding with 429 on a full queue"""
+        with TELEMETRY.span("http", path):
+            try:
+                if key is None:
+                    return await work()
+                return await flights.do(key, work, deadline)
+            except QueueFullError as e:
+                raise HTTPException(
+                    status_code=429,
+                    detail={"error": str(e), "lane": e.lane, "queued": e.queued, "limit": e.limit},
+                    headers={"Retry-After": "1"}
+                )
+
+    def respond(content: Any, accept: Optional[str]) -> Response:
+        """Encode a result once, skipping FastAPI's generic JSON encoding"""
+        body, media_type = encode_response(content, accept)
+        return Response(body, media_type=media_type)
+
+    @app.post("/analyze")
+    async def analyze(request: AnalyzeRequest, accept: Optional[str] = Header(default=None)) -> Response:
+        """
+        Profile the customer, compare the plan(s) and generate the pitch.
+
+        With `timeout`, the deadline starts when the request arrives; time
+        spent queued counts against it, and nodes reached after it are
+        skipped (typically the pitch), leaving a partial result.
+        """
+        item = request.model_dump(exclude={"priority", "timeout"})
+        deadline = None if request.timeout is None else time.monotonic() + request.timeout
+        # Only identical requests in the same lane share a run, and only with a
+        # flight whose deadline is no later than this request's
+        key = request_key("/analyze", item, request.priority)
+        work = lambda: pool.analyze(item, lane=request.priority, deadline=deadline)
+        return respond(await run("/analyze", work, key, deadline), accept)
+
+    @app.post("/batch")
+    async def batch(request: BatchRequest, accept: Optional[str] = Header(default=None)) -> Response:
+        """
+        Run /analyze for every item; results keep the input order and omit `messages`.
+
+        An item's `timeout` starts when that item starts running in its worker;
+        time spent queued, or waiting behind earlier items of its chunk, does
+        not count against it.
+        """
+        items = [item.model_dump(exclude={"priority"}) for item in request.items]
+        results = await run("/batch", lambda: pool.analyze_batch(items, lane=request.priority))
+        return respond({"results": results}, accept)
+
+    @app.post("/recommend")
+    async def recommend(request: RecommendRequest, accept: Optional[str] = Header(default=None)) -> Response:
+        """Profile the customer and return the top-k plans of the catalog"""
+        if not pool.has_catalog:
+            raise HTTPException(
+                status_code=503, detail="No plan catalog configured (set TELECOM_PLAN_CATALOG or TELECOM_PLAN_SNAPSHOT)"
+            )
+        arguments = request.model_dump(exclude={"priority"})
+        result = await run(
+            "/recommend",
+            lambda: pool.recommend(**arguments, lane=request.priority),
+            request_key("/recommend", arguments, request.priority)
+        )
+        return respond(result, accept)
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {"status": "ok", **pool.stats(), "single_flight": flights.stats()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> str:
+        """Prometheus text of the HTTP spans, the workers' node/tool spans and coalescing"""
+        return TELEMETRY.prometheus_text() + flights.prometheus_text()
+
+    return app
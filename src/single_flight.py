@@ -0,0 +1,129 @@
+import asyncio
+import pickle
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .node_cache import content_hash
+
+
+def request_key(*parts: Any) -> str:
+    """Canonical hash of a request's inputs (dict key order does not matter)"""
+    return content_hash(*parts)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation.
+
+    The first caller for a key runs the work; callers arriving while it is
+    in flight wait for the same result instead of repeating it. Nothing is
+    cached afterwards: the next call after completion runs again. Each
+    caller gets its own copy of the result (it is pickled once and loaded
+    per caller), so callers may mutate what they receive. Exceptions reach
+    every waiting caller.
+
+    Async callers share one task per event loop and key. The task is
+    shielded, so a cancelled caller does not cancel it for the others.
+
+    Calls may carry a deadline (a time.monotonic() value the work honours).
+    A caller only joins a flight whose deadline is no later than its own,
+    so it never waits past its deadline; callers without a deadline only
+    join flights without one, so they never get a result cut short by
+    another caller's deadline. Otherwise the caller runs its own work.
+    """
+
+    def __init__(self):
+        self._async_flights: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], Tuple[asyncio.Task, Optional[float]]] = {}
+        self._sync_flights: Dict[Hashable, Tuple[Future, Optional[float]]] = {}
+        self._lock = Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def _count(self, coalesced: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.coalesced += coalesced
+
+    @staticmethod
+    def _joinable(flight_deadline: Optional[float], deadline: Optional[float]) -> bool:
+        """Whether a caller with `deadline` may share a flight with `flight_deadline`"""
+        if flight_deadline is None or deadline is None:
+            return flight_deadline is None and deadline is None
+        return flight_deadline <= deadline
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]], deadline: float = None) -> Any:
+        """Await `work()` once for all concurrent callers with the same key (and a compatible deadline)"""
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        flight = self._async_flights.get(flight_key)
+        if flight is not None and not self._joinable(flight[1], deadline):
+            self._count(False)
+            return await work()
+        self._count(flight is not None)
+        if flight is None:
+            task = loop.create_task(self._fly(work))
+            flight = self._async_flights[flight_key] = (task, deadline)
+            task.add_done_callback(lambda _: self._async_flights.pop(flight_key, None))
+        return pickle.loads(await asyncio.shield(flight[0]))
+
+    @staticmethod
+    async def _fly(work: Callable[[], Awaitable[Any]]) -> bytes:
+        return pickle.dumps(await work(), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def do_sync(self, key: Hashable, work: Callable[[], Any], deadline: float = None) -> Any:
+        """Run `work()` once for all threads calling concurrently with the same key (and a compatible deadline)"""
+        with self._lock:
+            entry = self._sync_flights.get(key)
+            alone = entry is not None and not self._joinable(entry[1], deadline)
+            leader = entry is None
+            if leader:
+                entry = self._sync_flights[key] = (Future(), deadline)
+            flight = entry[0]
+            self.calls += 1
+            self.coalesced += not (leader or alone)
+        if alone:
+            return work()
+
+        if leader:
+            try:
+                payload = pickle.dumps(work(), protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException as e:
+                with self._lock:
+                    del self._sync_flights[key]
+                flight.set_exception(e)
+                raise
+            with self._lock:
+                del self._sync_flights[key]
+            flight.set_result(payload)
+        return pickle.loads(flight.result())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._async_flights) + len(self._sync_flights)
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls, how many of them shared another call's computation, and the coalesce rate"""
+        with self._lock:
+            calls, coalesced = self.calls, self.coalesced
+        return {
+            "calls": calls,
+            "coalesced": coalesced,
+            "coalesce_rate": coalesced / calls if calls else 0.0,
+            "in_flight": self.in_flight
+        }
+
+    def prometheus_text(self, name: str = "telecom_agent_single_flight") -> str:
+        """Counters and the in-flight gauge in the Prometheus text format"""
+        stats = self.stats()
+        return "\n".join([
+            f"# HELP {name}_calls_total Calls made through single-flight coalescing",
+            f"# TYPE {name}_calls_total counter",
+            f"{name}_calls_total {stats['calls']}",
+            f"# HELP {name}_coalesced_total Calls that shared an identical in-flight computation",
+            f"# TYPE {name}_coalesced_total counter",
+            f"{name}_coalesced_total {stats['coalesced']}",
+            f"# HELP {name}_in_flight Distinct computations currently in flight",
+            f"# TYPE {name}_in_flight gauge",
+            f"{name}_in_flight {stats['in_flight']}"
+        ]) + "\n"
@@ -0,0 +1,365 @@
+import functools
+import os
+import random
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Upper bounds (seconds) of the latency buckets, from 10µs to 10s
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Span kinds recorded by the pipeline
+REQUEST, NODE, TOOL, VALIDATION, SERIALIZATION = "request", "node", "tool", "validation", "serialization"
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram over integer nanoseconds.
+
+    Not thread-safe on its own: Telemetry only updates and reads it under its lock.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._bounds_ns = [round(bound * 1e9) for bound in buckets]
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum_ns = 0
+        self.count = 0
+
+    def observe(self, value_ns: int) -> None:
+        self.counts[bisect_left(self._bounds_ns, value_ns)] += 1
+        self.sum_ns += value_ns
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile in seconds: the upper bound of the bucket holding it"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def state(self) -> Tuple[List[int], int, int]:
+        """Bucket counts, sum and count, as accepted by merge()"""
+        return self.counts, self.sum_ns, self.count
+
+    def merge(self, counts: List[int], sum_ns: int, count: int) -> None:
+        """Add another histogram's state over the same buckets"""
+        for index, bucket_count in enumerate(counts):
+            self.counts[index] += bucket_count
+        self.sum_ns += sum_ns
+        self.count += count
+
+    def cumulative(self) -> List[int]:
+        """Cumulative bucket counts, ending with the +Inf bucket"""
+        running, cumulative = 0, []
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+# (trace_id, span_id) of the innermost open span in this context, or
+# _UNSAMPLED inside a request that head sampling skipped
+_CURRENT_SPAN: ContextVar[Optional[Tuple[int, int]]] = ContextVar("telecom_current_span", default=None)
+_UNSAMPLED = (0, 0)
+
+# Converts perf_counter_ns() readings to Unix time for exported spans
+_UNIX_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class _Span:
+    """Context manager that times one unit of work; see Telemetry.span"""
+
+    __slots__ = ("telemetry", "kind", "name", "trace_id", "span_id", "parent_id", "start_ns", "start_cpu_ns", "token")
+
+    def __init__(self, telemetry: "Telemetry", kind: str, name: str, parent: Optional[Tuple[int, int]]):
+        self.telemetry = telemetry
+        self.kind = kind
+        self.name = name
+        if parent is None:
+            self.trace_id, self.parent_id = random.getrandbits(128), 0
+        else:
+            self.trace_id, self.parent_id = parent
+
+    def __enter__(self) -> "_Span":
+        self.span_id = random.getrandbits(64)
+        self.token = _CURRENT_SPAN.set((self.trace_id, self.span_id))
+        self.start_cpu_ns = time.thread_time_ns()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall_ns = time.perf_counter_ns() - self.start_ns
+        cpu_ns = time.thread_time_ns() - self.start_cpu_ns
+        _CURRENT_SPAN.reset(self.token)
+        self.telemetry._record((self.trace_id, self.span_id, self.parent_id, self.kind, self.name,
+                                self.start_ns, wall_ns, cpu_ns, exc_type is not None))
+        return False
+
+
+class _UnsampledSpan:
+    """Root of a request skipped by head sampling; its descendants record nothing"""
+
+    __slots__ = ("token",)
+
+    def __enter__(self) -> "_UnsampledSpan":
+        self.token = _CURRENT_SPAN.set(_UNSAMPLED)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _CURRENT_SPAN.reset(self.token)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span used while telemetry is disabled"""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Telemetry:
+    """
+    In-process latency telemetry for the sales pipeline.
+
+    Every span records its wall and CPU time into per-(kind, name)
+    histograms and is kept in a bounded buffer for trace export. Spans nest
+    through a context variable, so each request is one trace holding its
+    nodes, tools and the validation/serialization work inside them.
+
+    The hot path is a few clock reads and two deque appends under the lock;
+    records are folded into the histograms every `flush_every` spans and
+    before each read. `sample_rate` < 1 (or TELECOM_TELEMETRY_SAMPLE_RATE)
+    traces only that share of requests, deciding once per trace, and
+    `enabled = False` (or TELECOM_TELEMETRY=0) turns every span into a
+    shared no-op.
+    """
+
+    def __init__(self, enabled: bool = None, sample_rate: float = None, max_spans: int = 4096,
+                 flush_every: int = 1024, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 service_name: str = "telecom-sales-agent"):
+        if enabled is None:
+            enabled = os.environ.get("TELECOM_TELEMETRY", "1").lower() not in ("0", "false", "off")
+        if sample_rate is None:
+            sample_rate = float(os.environ.get("TELECOM_TELEMETRY_SAMPLE_RATE", "1.0"))
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.flush_every = flush_every
+        self.buckets = buckets
+        self.service_name = service_name
+        self._wall: Dict[Tuple[str, str], Histogram] = {}
+        self._cpu: Dict[Tuple[str, str], Histogram] = {}
+        self._spans: deque = deque(maxlen=max_spans)
+        self._pending: deque = deque()
+        self._lock = Lock()
+
+    def span(self, kind: str, name: str):
+        """Context manager timing `name`; nests under the enclosing span, if any"""
+        if not self.enabled:
+            return _NULL_SPAN
+        parent = _CURRENT_SPAN.get()
+        if parent is _UNSAMPLED:
+            return _NULL_SPAN
+        if parent is None and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return _UnsampledSpan()
+        return _Span(self, kind, name, parent)
+
+    def traced(self, kind: str, name: str = None):
+        """Decorator running the function inside a span (named after it by default)"""
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__name__.lstrip("_")
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(kind, span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    def _record(self, record: tuple) -> None:
+        # The hot path only appends; histograms are updated in batches
+        with self._lock:
+            self._spans.append(record)
+            self._pending.append(record)
+            flush = len(self._pending) >= self.flush_every
+        if flush:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Fold pending span records into the histograms"""
+        with self._lock:
+            pending, wall_histograms, cpu_histograms = self._pending, self._wall, self._cpu
+            for _ in range(len(pending)):
+                _, _, _, kind, name, _, wall_ns, cpu_ns, _ = pending.popleft()
+                key = (kind, name)
+                wall = wall_histograms.get(key)
+                if wall is None:
+                    wall = wall_histograms[key] = Histogram(self.buckets)
+                    cpu_histograms[key] = Histogram(self.buckets)
+                wall.observe(wall_ns)
+                cpu_histograms[key].observe(cpu_ns)
+
+    def drain(self) -> Dict[Tuple[str, str], tuple]:
+        """
+        Histogram state recorded since the last drain, removed from this instance.
+
+        Worker processes return it with their results so the parent can
+        merge() it; buffered spans stay where they were recorded.
+        """
+        self._flush()
+        with self._lock:
+            drained = {key: (wall.state(), self._cpu[key].state()) for key, wall in self._wall.items()}
+            self._wall.clear()
+            self._cpu.clear()
+        return drained
+
+    def merge(self, drained: Dict[Tuple[str, str], tuple]) -> None:
+        """Add histogram state drained from another Telemetry, e.g. a worker process's"""
+        with self._lock:
+            for key, (wall_state, cpu_state) in drained.items():
+                if key not in self._wall:
+                    self._wall[key] = Histogram(self.buckets)
+                    self._cpu[key] = Histogram(self.buckets)
+                self._wall[key].merge(*wall_state)
+                self._cpu[key].merge(*cpu_state)
+
+    def reset(self) -> None:
+        """Drop all histograms and buffered spans"""
+        with self._lock:
+            self._pending.clear()
+            self._wall.clear()
+            self._cpu.clear()
+            self._spans.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Per kind and name: count, mean/p50/p99 wall time and mean CPU time in milliseconds"""
+        self._flush()
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with self._lock:
+            for key in sorted(self._wall):
+                wall, cpu = self._wall[key], self._cpu[key]
+                summary.setdefault(key[0], {})[key[1]] = {
+                    "count": wall.count,
+                    "wall_mean_ms": wall.sum_ns / wall.count / 1e6,
+                    "wall_p50_ms": wall.quantile(0.5) * 1000,
+                    "wall_p99_ms": wall.quantile(0.99) * 1000,
+                    "cpu_mean_ms": cpu.sum_ns / cpu.count / 1e6
+                }
+        return summary
+
+    def prometheus_text(self) -> str:
+        """All histograms in the Prometheus text exposition format (version 0.0.4)"""
+        self._flush()
+        lines = []
+        with self._lock:
+            keys = sorted(self._wall)
+            for metric, histograms, help_text in (
+                ("telecom_agent_span_wall_seconds", self._wall, "Wall-clock time per pipeline span"),
+                ("telecom_agent_span_cpu_seconds", self._cpu, "Thread CPU time per pipeline span")
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for kind, name in keys:
+                    labels = f'kind="{kind}",name="{name}"'
+                    histogram = histograms[(kind, name)]
+                    cumulative = histogram.cumulative()
+                    for bound, count in zip(self.buckets, cumulative):
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {cumulative[-1]}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum_ns / 1e9!r}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export_spans(self, clear: bool = True) -> Dict[str, Any]:
+        """
+        Buffered spans as an OTLP/JSON trace export request.
+
+        The result can be POSTed as-is to an OpenTelemetry collector's
+        /v1/traces endpoint. Exported spans are removed unless clear=False.
+        """
+        with self._lock:
+            spans = list(self._spans)
+            if clear:
+                self._spans.clear()
+
+        otlp_spans = []
+        for trace_id, span_id, parent_id, kind, name, start_ns, wall_ns, cpu_ns, failed in spans:
+            start_unix_ns = start_ns + _UNIX_OFFSET_NS
+            otlp_spans.append({
+                "traceId": f"{trace_id:032x}",
+                "spanId": f"{span_id:016x}",
+                "parentSpanId": f"{parent_id:016x}" if parent_id else "",
+                "name": f"{kind} {name}",
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(start_unix_ns),
+                "endTimeUnixNano": str(start_unix_ns + wall_ns),
+                "attributes": [
+                    {"key": "telecom.span.kind", "value": {"stringValue": kind}},
+                    {"key": "telecom.cpu_time_ns", "value": {"intValue": str(cpu_ns)}}
+                ],
+                "status": {"code": 2 if failed else 1}  # STATUS_CODE_ERROR / STATUS_CODE_OK
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "src.telemetry"}, "spans": otlp_spans}]
+            }]
+        }
+
+
+# Process-wide telemetry used by the pipeline, its nodes and the tools
+TELEMETRY = Telemetry()
+
+
+def start_metrics_server(port: int = 9464, host: str = "0.0.0.0", telemetry: Telemetry = TELEMETRY) -> ThreadingHTTPServer:
+    """
+    Serve GET /metrics (Prometheus text) and GET /spans (OTLP/JSON) from a daemon thread.
+
+    Returns the server; call shutdown() on it to stop serving.
+    """
+    from .serialization import JSON_MEDIA_TYPE, dumps
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = telemetry.prometheus_text(), "text/plain; version=0.0.4"
+            elif self.path == "/spans":
+                body, content_type = dumps(telemetry.export_spans()), JSON_MEDIA_TYPE
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    Thread(target=server.serve_forever, name="telemetry-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,279 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import langgraph_agent
+from .agents.tool_registry import TOOL_REGISTRY
+from .serialization import to_jsonable
+from .telemetry import TELEMETRY
+
+
+# Priority lanes: waiting interactive tasks always get the next free worker slot
+INTERACTIVE, BATCH = "interactive", "batch"
+LANES = (INTERACTIVE, BATCH)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a request would overflow its lane's bounded queue (the request is shed)"""
+    
+    def __init__(self, lane: str, queued: int, limit: int):
+        super().__init__(f"The {lane} queue is full ({queued} of {limit} tasks waiting)")
+        self.lane = lane
+        self.queued = queued
+        self.limit = limit
+
+
+# Catalog recommender owned by a service worker, built once by _init_service_worker
+_WORKER_RECOMMENDER = None
+# Memory-mapped catalog of a service worker, when the pool serves a snapshot file
+_WORKER_LIVE_CATALOG = None
+# Whether a service worker returns its telemetry with each result (worker processes do)
+_WORKER_SHIPS_TELEMETRY = False
+
+
+def _init_service_worker(openai_api_key: Optional[str], typed_state: bool, catalog: Optional[List[Dict[str, Any]]],
+                         catalog_snapshot: Optional[str] = None, ships_telemetry: bool = False) -> None:
+    """Pool initializer: build the agent, compiled graph and catalog recommender once per worker"""
+    global _WORKER_RECOMMENDER, _WORKER_LIVE_CATALOG, _WORKER_SHIPS_TELEMETRY
+    if ships_telemetry:
+        # Drop histograms inherited from the parent when the worker was forked
+        TELEMETRY.reset()
+        _WORKER_SHIPS_TELEMETRY = True
+    langgraph_agent._init_batch_worker(openai_api_key, typed_state)
+    if catalog_snapshot:
+        from .models.catalog_snapshot import LiveCatalog
+        _WORKER_LIVE_CATALOG = LiveCatalog(catalog_snapshot)
+        _worker_recommender()
+    elif catalog:
+        from .agents.plan_recommender import PlanRecommender
+        _WORKER_RECOMMENDER = PlanRecommender(catalog)
+
+
+def _worker_recommender():
+    """The worker's recommender, rebuilt over the new mapping after a snapshot is republished"""
+    global _WORKER_RECOMMENDER
+    if _WORKER_LIVE_CATALOG is not None:
+        snapshot = _WORKER_LIVE_CATALOG.current()
+        if _WORKER_RECOMMENDER is None or _WORKER_RECOMMENDER.catalog is not snapshot:
+            from .agents.plan_recommender import PlanRecommender
+            _WORKER_RECOMMENDER = PlanRecommender(snapshot)
+    return _WORKER_RECOMMENDER
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _run_task(fn: Callable, *args: Any) -> Tuple[Any, Optional[Dict[Tuple[str, str], tuple]]]:
+    """Run a pool task in a worker; a worker process also returns the histograms it recorded"""
+    result = fn(*args)
+    return result, TELEMETRY.drain() if _WORKER_SHIPS_TELEMETRY else None
+
+
+def _analyze(item: Dict[str, Any], compact: bool, deadline: Optional[float]) -> Dict[str, Any]:
+    """Run one process_customer request in a worker, within what is left of its deadline"""
+    if deadline is not None:
+        # time.monotonic() is system-wide, so the server's deadline holds here
+        item = dict(item, timeout=max(0.0, deadline - time.monotonic()))
+    return langgraph_agent._process_batch_chunk([(0, item)], compact)[0].result
+
+
+def _analyze_chunk(items: List[Dict[str, Any]], compact: bool) -> List[Dict[str, Any]]:
+    """Run a chunk of process_customer requests in a worker, in input order"""
+    return [item_result.result for item_result in langgraph_agent._process_batch_chunk(list(enumerate(items)), compact)]
+
+
+def _recommend(customer_conversation: str, usage_data: Dict[str, Any], current_plan: Dict[str, Any],
+               existing_profile: Optional[Dict[str, Any]], k: int) -> Dict[str, Any]:
+    """Profile a customer and return the top-k catalog plans in a worker"""
+    profile = TOOL_REGISTRY.profiler.profile(customer_conversation, usage_data, existing_profile)
+    recommendations = _worker_recommender().recommend(profile, current_plan, k=k)
+    return {
+        "customer_profile": to_jsonable(profile),
+        "recommendations": [
+            {
+                "plan": to_jsonable(recommendation.plan),
+                "plan_comparison": to_jsonable(recommendation.comparison),
+                "suitability_score": recommendation.suitability_score
+            }
+            for recommendation in recommendations
+        ]
+    }
+
+
+class AgentWorkerPool:
+    """
+    Warm pool of agent workers for an asyncio server.
+
+    Every worker builds its TelecomSalesAgent, compiled graph and catalog
+    recommender once in start(), so requests never pay for imports or graph
+    compilation. CPU-bound work runs in the pool and the event loop only
+    awaits it.
+
+    At most two tasks per worker are handed to the executor. The rest wait
+    in per-lane queues, and a freed slot always goes to the oldest
+    interactive task before any batch task. Each lane's queue is bounded:
+    a request that would overflow it raises QueueFullError at once (load
+    shedding) instead of waiting behind a backlog.
+
+    Worker processes return the latency histograms they recorded with each
+    result, and the pool merges them into this process's TELEMETRY.
+    """
+
+    def __init__(
+        self,
+        processes: int = None,
+        queue_size: int = 256,
+        batch_queue_size: int = None,
+        typed_state: bool = True,
+        openai_api_key: str = None,
+        catalog: Sequence[Dict[str, Any]] = None,
+        catalog_snapshot: str = None,
+        chunksize: int = 32
+    ):
+        """
+        Args:
+            processes: Worker processes (defaults to the CPU count); 0 runs a
+                single worker thread in-process, which avoids IPC on one-core boxes
+            queue_size: Maximum number of interactive tasks waiting for a worker
+            batch_queue_size: Maximum number of batch tasks waiting for a
+                worker (defaults to queue_size)
+            typed_state: State mode of the workers' agents
+            openai_api_key: OpenAI API key for the workers' agents
+            catalog: Plan catalog for recommend(); without one it is unavailable
+            catalog_snapshot: Path of a catalog snapshot (see publish_snapshot)
+                used instead of `catalog`; workers map it read-only, sharing one
+                copy, and switch to a republished snapshot without restarting
+            chunksize: Batch items sent to a worker per task
+        """
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.limits = {INTERACTIVE: queue_size, BATCH: queue_size if batch_queue_size is None else batch_queue_size}
+        self.typed_state = typed_state
+        self.openai_api_key = openai_api_key
+        self.catalog = list(catalog) if catalog else None
+        self.catalog_snapshot = catalog_snapshot
+        self.chunksize = chunksize
+        self.queued = {lane: 0 for lane in LANES}
+        self.shed = {lane: 0 for lane in LANES}
+        self.in_flight = 0
+        self.worker_pids: List[int] = []
+        self._executor: Optional[Executor] = None
+        self._free_slots = 0
+        self._waiters: Dict[str, deque] = {lane: deque() for lane in LANES}
+
+    @property
+    def workers(self) -> int:
+        return self.processes or 1
+
+    @property
+    def has_catalog(self) -> bool:
+        return bool(self.catalog or self.catalog_snapshot)
+
+    def start(self) -> None:
+        """Start and warm up every worker; blocks until all of them are ready"""
+        initargs = (self.openai_api_key, self.typed_state, self.catalog, self.catalog_snapshot, bool(self.processes))
+        if self.processes:
+            self._executor = ProcessPoolExecutor(self.processes, initializer=_init_service_worker, initargs=initargs)
+        else:
+            self._executor = ThreadPoolExecutor(1, initializer=_init_service_worker, initargs=initargs)
+        # Submitting one task per worker before any is idle starts all of them
+        warmups = [self._executor.submit(_worker_pid) for _ in range(self.workers)]
+        self.worker_pids = sorted({warmup.result() for warmup in warmups})
+        self._free_slots = 2 * self.workers
+
+    def close(self) -> None:
+        """Stop the workers, cancelling tasks that have not started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "worker_pids": self.worker_pids,
+            "queued": dict(self.queued),
+            "queue_limits": dict(self.limits),
+            "shed": dict(self.shed),
+            "in_flight": self.in_flight
+        }
+
+    def _admit(self, lane: str, tasks: int) -> None:
+        """Reserve queue space in `lane` for `tasks` tasks (all of a request's tasks, or none)"""
+        if self.queued[lane] + tasks > self.limits[lane]:
+            self.shed[lane] += 1
+            raise QueueFullError(lane, self.queued[lane], self.limits[lane])
+        self.queued[lane] += tasks
+
+    async def _acquire_slot(self, lane: str) -> None:
+        """Wait for a worker slot; interactive waiters are served before batch waiters"""
+        if self._free_slots and not any(self._waiters.values()):
+            self._free_slots -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as this task was cancelled
+                self._release_slot()
+            else:
+                self._waiters[lane].remove(waiter)
+            raise
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the first live waiter in priority order, or free it"""
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._free_slots += 1
+
+    async def _dispatch(self, lane: str, fn: Callable, *args: Any) -> Any:
+        """Run an admitted task once a worker slot is free"""
+        try:
+            await self._acquire_slot(lane)
+        finally:
+            self.queued[lane] -= 1
+        self.in_flight += 1
+        try:
+            result, histograms = await asyncio.get_running_loop().run_in_executor(self._executor, _run_task, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._release_slot()
+        if histograms:
+            TELEMETRY.merge(histograms)
+        return result
+
+    async def analyze(self, item: Dict[str, Any], compact: bool = False, lane: str = INTERACTIVE,
+                      deadline: float = None) -> Dict[str, Any]:
+        """
+        process_customer for one request dictionary (see BATCH_ITEM_FIELDS)
+
+        `deadline` is a time.monotonic() value; time spent queued counts
+        against it, and the worker runs with whatever is left.
+        """
+        self._admit(lane, 1)
+        return await self._dispatch(lane, _analyze, item, compact, deadline)
+
+    async def analyze_batch(self, items: Sequence[Dict[str, Any]], compact: bool = True,
+                            lane: str = BATCH) -> List[Dict[str, Any]]:
+        """process_customer for many requests, spread over the workers in chunks; results keep input order"""
+        chunks = [list(items[start:start + self.chunksize]) for start in range(0, len(items), self.chunksize)]
+        self._admit(lane, len(chunks))
+        results = await asyncio.gather(*(self._dispatch(lane, _analyze_chunk, chunk, compact) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def recommend(self, customer_conversation: str, usage_data: Dict[str, Any], current_plan: Dict[str, Any],
+                        existing_profile: Dict[str, Any] = None, k: int = 3, lane: str = INTERACTIVE) -> Dict[str, Any]:
+        """Profile a customer and return the top-k plans of the catalog"""
+        if not self.has_catalog:
+            raise RuntimeError("No plan catalog configured")
+        self._admit(lane, 1)
+        return await self._dispatch(lane, _recommend, customer_conversation, usage_data, current_plan, existing_profile, k)
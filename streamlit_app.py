@@ -1,12 +1,27 @@
 import streamlit as st
 import json
 import os
+import tempfile
 from datetime import datetime
 
+from src.analysis_jobs import AnalysisJobs
+from src.batch_io import BatchJob, FORMATS, detect_format
 from src.langgraph_agent import TelecomSalesAgent
 from src.models.customer_profile import CustomerSegment, UsagePattern, Priority
 
 
+@st.cache_resource
+def get_agent(api_key):
+    """One agent per server process, shared by every session"""
+    return TelecomSalesAgent(api_key)
+
+
+@st.cache_resource
+def get_analysis_jobs(api_key):
+    """Background analysis pool shared by every session; identical inputs share one run"""
+    return AnalysisJobs(get_agent(api_key), max_workers=int(os.getenv("TELECOM_UI_WORKERS", "8")))
+
+
 def init_app():
     """Initialize the Streamlit app"""
     st.set_page_config(
@@ -20,12 +35,12 @@ def init_app():
     st.markdown("**Generate personalized sales pitches using AI-powered customer analysis**")
     
     # Initialize session state
-    if 'agent' not in st.session_state:
-        api_key = os.getenv("OPENAI_API_KEY", "demo-key")
-        st.session_state.agent = TelecomSalesAgent(api_key)
+    api_key = os.getenv("OPENAI_API_KEY", "demo-key")
+    st.session_state.agent = get_agent(api_key)
+    st.session_state.jobs = get_analysis_jobs(api_key)
     
-    if 'results' not in st.session_state:
-        st.session_state.results = None
+    if 'job' not in st.session_state:
+        st.session_state.job = None
 
 
 def create_sidebar():
@@ -244,14 +259,14 @@ def create_plan_inputs():
             value=st.session_state.get("target_data_unlimited", False)
         )
         
-        if not target_data_unlimited:
-            target_data = st.number_input(
-                "Target Data Allowance (GB)",
-                min_value=0.0,
-                value=st.session_state.get("target_data", 25.0),
-                step=1.0
-            )
-        else:
+        # Inside the form the checkbox cannot hide this field, so it is ignored when unlimited
+        target_data = st.number_input(
+            "Target Data Allowance (GB, if not unlimited)",
+            min_value=0.0,
+            value=st.session_state.get("target_data", 25.0),
+            step=1.0
+        )
+        if target_data_unlimited:
             target_data = "unlimited"
         
         target_international = st.checkbox(
@@ -276,7 +291,7 @@ def create_plan_inputs():
 
 def process_customer_data(customer_conversation, customer_name, customer_location, data_usage, voice_minutes, 
                          international_usage, current_plan_data, target_plan_data):
-    """Process the customer data through the agent"""
+    """Start the analysis in the background and return its AnalysisJob"""
     
     # Build current plan dict
     current_plan = {
@@ -329,25 +344,83 @@ def process_customer_data(customer_conversation, customer_name, customer_locatio
         "business_user": "business" in customer_conversation.lower()
     }
     
-    # Process through agent
-    with st.spinner("🤖 Analyzing customer and generating personalized pitch..."):
-        try:
-            result = st.session_state.agent.process_customer_sync(
-                customer_conversation=customer_conversation,
-                current_plan=current_plan,
-                target_plan=target_plan,
-                usage_data=usage_data
-            )
-            return result
-        except Exception as e:
-            st.error(f"Error processing customer data: {str(e)}")
-            return None
+    # Process through the shared agent without blocking this script run
+    return st.session_state.jobs.submit(
+        customer_conversation=customer_conversation,
+        current_plan=current_plan,
+        target_plan=target_plan,
+        usage_data=usage_data
+    )
+
+
+@st.fragment(run_every=0.3)
+def display_progress():
+    """Show each part of a running analysis as soon as it is ready"""
+    job = st.session_state.job
+    if job.done:
+        # Re-run the whole app once to show the final results
+        st.rerun()
+    
+    result = job.result or {}
+    st.header("🎯 Generated Sales Pitch")
+    st.info("🤖 Analyzing customer and generating personalized pitch...")
+    
+    if result.get("customer_profile"):
+        st.subheader("👤 Customer Analysis")
+        display_profile(result["customer_profile"])
+    if result.get("plan_comparison"):
+        st.subheader("📊 Plan Comparison Analysis")
+        display_comparison(result["plan_comparison"])
+    if not result.get("personalized_pitch"):
+        st.caption("⏳ Waiting for the personalized pitch...")
+
+
+def display_profile(profile):
+    """Customer profile metrics and pain points"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Segment", profile["segment"])
+        st.metric("Usage Pattern", profile["usage_pattern"])
+    with col2:
+        st.metric("Cost Sensitivity", profile["needs"]["cost_sensitivity"])
+        st.metric("Data Priority", profile["needs"]["data_priority"])
+    with col3:
+        st.metric("Network Quality Priority", profile["needs"]["network_quality"])
+        st.metric("International Needs", profile["needs"]["international_needs"])
+    
+    if profile["pain_points"]:
+        st.subheader("😣 Pain Points Identified")
+        for pain in profile["pain_points"]:
+            st.write(f"• {pain}")
+
+
+def display_comparison(comparison):
+    """Plan comparison metrics, new features and drawbacks"""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Monthly Savings", f"${comparison['monthly_savings']:.2f}", delta=comparison["monthly_savings"])
+    with col2:
+        st.metric("Annual Savings", f"${comparison['annual_savings']:.2f}")
+    with col3:
+        st.metric("Suitability Score", f"{comparison['suitability_score']:.1f}/10")
+    with col4:
+        st.metric("Data Change", comparison["data_difference"])
+    
+    if comparison["feature_improvements"]:
+        st.subheader("✨ New Features")
+        for feature in comparison["feature_improvements"]:
+            st.write(f"• {feature}")
+    
+    if comparison["potential_drawbacks"]:
+        st.subheader("⚠️ Potential Concerns")
+        for drawback in comparison["potential_drawbacks"]:
+            st.write(f"• {drawback}")
 
 
 def display_results(result):
     """Display the analysis results"""
     if not result or not result.get("success"):
-        st.error(f"Analysis failed: {result.get('error', 'Unknown error')}")
+        st.error(f"Analysis failed: {(result or {}).get('error', 'Unknown error')}")
         return
     
     st.header("🎯 Generated Sales Pitch")
@@ -365,83 +438,133 @@ def display_results(result):
     
     with tab2:
         st.subheader("👤 Customer Analysis")
-        profile = result["customer_profile"]
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Segment", profile["segment"])
-            st.metric("Usage Pattern", profile["usage_pattern"])
-        with col2:
-            st.metric("Cost Sensitivity", profile["needs"]["cost_sensitivity"])
-            st.metric("Data Priority", profile["needs"]["data_priority"])
-        with col3:
-            st.metric("Network Quality Priority", profile["needs"]["network_quality"])
-            st.metric("International Needs", profile["needs"]["international_needs"])
-        
-        if profile["pain_points"]:
-            st.subheader("😣 Pain Points Identified")
-            for pain in profile["pain_points"]:
-                st.write(f"• {pain}")
+        display_profile(result["customer_profile"])
     
     with tab3:
         st.subheader("📊 Plan Comparison Analysis")
-        comparison = result["plan_comparison"]
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            savings_color = "normal" if comparison["monthly_savings"] >= 0 else "inverse"
-            st.metric("Monthly Savings", f"${comparison['monthly_savings']:.2f}", delta=comparison["monthly_savings"])
-        with col2:
-            st.metric("Annual Savings", f"${comparison['annual_savings']:.2f}")
-        with col3:
-            st.metric("Suitability Score", f"{comparison['suitability_score']:.1f}/10")
-        with col4:
-            st.metric("Data Change", comparison["data_difference"])
-        
-        if comparison["feature_improvements"]:
-            st.subheader("✨ New Features")
-            for feature in comparison["feature_improvements"]:
-                st.write(f"• {feature}")
-        
-        if comparison["potential_drawbacks"]:
-            st.subheader("⚠️ Potential Concerns")
-            for drawback in comparison["potential_drawbacks"]:
-                st.write(f"• {drawback}")
+        display_comparison(result["plan_comparison"])
     
     with tab4:
         st.subheader("🔧 Raw Analysis Data")
         st.json(result)
 
 
+@st.fragment(run_every=0.5)
+def display_batch_progress():
+    """Live progress bar and throughput of the session's batch job"""
+    job = st.session_state.batch_job
+    progress = job.progress
+    fraction = progress.fraction if progress.fraction is not None else 0.0
+    st.progress(fraction, text=f"{progress.rows:,} rows processed")
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows/s", f"{progress.rows_per_second:,.1f}")
+    col2.metric("Succeeded", f"{progress.succeeded:,}")
+    col3.metric("Failed", f"{progress.failed:,}")
+    
+    if job.done.is_set():
+        st.rerun()
+    if st.button("⏹️ Stop after the current chunk"):
+        job.cancel()
+
+
+def create_batch_tab():
+    """Bulk analysis of a CSV/Parquet file, written incrementally to a downloadable file"""
+    st.header("📦 Batch Processing")
+    st.markdown(
+        "Upload one customer per row: `customer_conversation`, plus `current_plan`, `target_plan` and "
+        "`usage_data` either as JSON columns or as dotted columns such as `usage_data.data_usage_gb`."
+    )
+    
+    uploaded = st.file_uploader("Customers file", type=["csv", "parquet"])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        output_format = st.selectbox("Output format", FORMATS)
+    with col2:
+        chunksize = st.number_input("Rows per chunk", min_value=100, max_value=100000, value=1000, step=100)
+    with col3:
+        processes = st.number_input("Worker processes (0 = threads)", min_value=0, max_value=os.cpu_count() or 1, value=0)
+    
+    job = st.session_state.get("batch_job")
+    running = job is not None and not job.done.is_set()
+    
+    if st.button("🚀 Run Batch", type="primary", disabled=uploaded is None or running):
+        if job is not None and os.path.exists(job.output_path):
+            os.unlink(job.output_path)
+        fd, output_path = tempfile.mkstemp(prefix="telecom-batch-", suffix=f".{output_format}")
+        os.close(fd)
+        job = st.session_state.batch_job = BatchJob(
+            st.session_state.agent, uploaded, output_path,
+            input_format=detect_format(uploaded.name), output_format=output_format,
+            chunksize=int(chunksize), processes=int(processes)
+        )
+        st.session_state.batch_output_name = f"{os.path.splitext(uploaded.name)[0]}_results.{output_format}"
+    
+    if job is None:
+        return
+    if not job.done.is_set():
+        display_batch_progress()
+        return
+    
+    progress = job.progress
+    if job.error:
+        st.error(f"Batch failed after {progress.rows:,} rows: {job.error}")
+    else:
+        st.success(
+            f"Processed {progress.rows:,} rows in {progress.elapsed:.1f}s "
+            f"({progress.rows_per_second:,.1f} rows/s, {progress.failed:,} failed)"
+        )
+    if os.path.exists(job.output_path):
+        with open(job.output_path, "rb") as results:
+            st.download_button("⬇️ Download Results", results, file_name=st.session_state.batch_output_name)
+
+
+def create_single_tab():
+    """One customer through the form, with progressive results"""
+    # Inputs live in a form, so editing them does not re-run the script until submitted
+    with st.form("customer_form"):
+        customer_conversation, customer_name, customer_location, data_usage, voice_minutes, international_usage = create_input_form()
+        
+        # Plan inputs
+        plan_inputs = create_plan_inputs()
+        current_plan_data, target_plan_data = plan_inputs[:5], plan_inputs[5:]
+        
+        # Process button
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            submitted = st.form_submit_button("🚀 Generate Personalized Pitch", type="primary", use_container_width=True)
+    
+    if submitted:
+        if customer_conversation and customer_name:
+            st.session_state.job = process_customer_data(
+                customer_conversation, customer_name, customer_location,
+                data_usage, voice_minutes, international_usage,
+                current_plan_data, target_plan_data
+            )
+        else:
+            st.error("Please provide customer conversation and name.")
+    
+    # Display results as they arrive
+    job = st.session_state.job
+    if job is not None:
+        if not job.done:
+            display_progress()
+        elif job.error:
+            st.error(f"Error processing customer data: {job.error}")
+        else:
+            display_results(job.result)
+
+
 def main():
     """Main application function"""
     init_app()
     create_sidebar()
     
-    # Main form
-    customer_conversation, customer_name, customer_location, data_usage, voice_minutes, international_usage = create_input_form()
-    
-    # Plan inputs
-    current_plan_data, target_plan_data = create_plan_inputs()[:6], create_plan_inputs()[6:]
-    
-    # Process button
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        if st.button("🚀 Generate Personalized Pitch", type="primary", use_container_width=True):
-            if customer_conversation and customer_name:
-                result = process_customer_data(
-                    customer_conversation, customer_name, customer_location, 
-                    data_usage, voice_minutes, international_usage,
-                    current_plan_data, target_plan_data
-                )
-                if result:
-                    st.session_state.results = result
-            else:
-                st.error("Please provide customer conversation and name.")
-    
-    # Display results if available
-    if st.session_state.results:
-        display_results(st.session_state.results)
+    single_tab, batch_tab = st.tabs(["👤 Single Customer", "📦 Batch"])
+    with single_tab:
+        create_single_tab()
+    with batch_tab:
+        create_batch_tab()
     
     # Footer
     st.markdown("---")